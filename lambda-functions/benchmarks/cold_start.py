@@ -0,0 +1,254 @@
+"""
+Cold Start Benchmark
+
+Measures the startup cost a cold invocation of each Lambda function pays:
+
+- importMs: importing lambda_function, including all module-level init
+- firstApiCallMs: from the start of the first invocation until its first
+  AWS request leaves the process (boto3 import and client construction
+  happen here since clients are built lazily)
+- coldStartToFirstCallMs: importMs + firstApiCallMs
+- processMs: wall time of the whole sample, interpreter startup included
+
+Every sample runs in a fresh interpreter. AWS requests go to a local
+endpoint (AWS_ENDPOINT_URL) that records their arrival and answers with an
+error, so no AWS account is needed and network latency is excluded. The
+report also lists the modules that were deferred at import (boto3, numpy)
+and the clients each invocation actually built.
+
+Usage (from lambda-functions/):
+    python benchmarks/cold_start.py --runs 10
+    python benchmarks/cold_start.py --runs 10 --output cold-start-baseline.json
+    python benchmarks/cold_start.py --baseline cold-start-baseline.json --max-regression-percent 25
+
+With --baseline, the exit status is 1 when the median coldStartToFirstCallMs
+of any function regressed by more than the allowed percentage.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+FUNCTIONS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGET_GROUP_ARN = 'arn:aws:elasticloadbalancing:us-east-1:123456789012:targetgroup/benchmark-tg/0123456789abcdef'
+
+# Representative first invocation of each function
+FUNCTION_EVENTS = {
+    'get-target-instance': {'autoScalingGroupName': 'benchmark-asg'},
+    'inject-failure': {'instanceId': 'i-0123456789abcdef0', 'dryRun': True},
+    'validate-system-health': {'targetGroupArn': TARGET_GROUP_ARN},
+    'experiment-runner': {'autoScalingGroupName': 'benchmark-asg', 'targetGroupArn': TARGET_GROUP_ARN, 'dryRun': True}
+}
+
+DEFERRED_MODULES = ['boto3', 'botocore.session', 'numpy']
+METRICS = ['importMs', 'firstApiCallMs', 'coldStartToFirstCallMs', 'invocationMs', 'processMs', 'peakRssMb']
+DEFAULT_RUNS = 5
+DEFAULT_MAX_REGRESSION_PERCENT = 20
+
+ERROR_BODY = (
+    b'<ErrorResponse><Error><Type>Sender</Type><Code>BenchmarkEndpoint</Code>'
+    b'<Message>cold start benchmark endpoint</Message></Error></ErrorResponse>'
+)
+
+
+def run_child(function_name):
+    """
+    Measure one cold start in this (fresh) interpreter and print it as JSON
+
+    Args:
+        function_name: Function directory name
+    """
+    import resource
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    requests = []
+
+    class Endpoint(BaseHTTPRequestHandler):
+        def do_POST(self):
+            requests.append(time.perf_counter())
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.send_response(400)
+            self.send_header('Content-Type', 'text/xml')
+            self.send_header('Content-Length', str(len(ERROR_BODY)))
+            self.end_headers()
+            self.wfile.write(ERROR_BODY)
+
+        do_GET = do_POST
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Endpoint)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+
+    os.environ.update({
+        'AWS_ENDPOINT_URL': f"http://127.0.0.1:{server.server_address[1]}",
+        'AWS_DEFAULT_REGION': 'us-east-1',
+        'AWS_ACCESS_KEY_ID': 'benchmark',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        'AWS_CONFIG_FILE': os.devnull,
+        'AWS_SHARED_CREDENTIALS_FILE': os.devnull,
+        'CLIENT_MAX_ATTEMPTS': '1'
+    })
+    sys.path[:0] = [os.path.join(FUNCTIONS_DIR, function_name), FUNCTIONS_DIR]
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    started = time.perf_counter()
+    import lambda_function
+    imported = time.perf_counter()
+
+    deferred = [name for name in DEFERRED_MODULES if name not in sys.modules]
+
+    response = lambda_function.lambda_handler(dict(FUNCTION_EVENTS[function_name]), None)
+    finished = time.perf_counter()
+
+    from chaos_common import clients
+
+    first_call = requests[0] if requests else None
+    server.shutdown()
+
+    print(json.dumps({
+        'importMs': (imported - started) * 1000,
+        'firstApiCallMs': (first_call - imported) * 1000 if first_call else None,
+        'coldStartToFirstCallMs': (first_call - started) * 1000 if first_call else None,
+        'invocationMs': (finished - imported) * 1000,
+        'peakRssMb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'apiCalls': len(requests),
+        'deferredAtImport': deferred,
+        'clientsBuilt': sorted({key[0] for key in clients._clients}),
+        'statusCode': response.get('statusCode')
+    }))
+
+
+def measure(function_name, runs):
+    """
+    Collect cold start samples of one function
+
+    Args:
+        function_name: Function directory name
+        runs: Number of fresh interpreters to start
+
+    Returns:
+        dict: Median, p90 and max of every metric plus the last sample's details
+    """
+    samples = []
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', function_name],
+            capture_output=True, text=True, check=True
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        sample['processMs'] = (time.perf_counter() - started) * 1000
+        samples.append(sample)
+
+    summary = {'runs': runs}
+
+    for metric in METRICS:
+        values = sorted(sample[metric] for sample in samples if sample[metric] is not None)
+        if not values:
+            summary[metric] = None
+            continue
+        summary[metric] = {
+            'median': round(statistics.median(values), 1),
+            'p90': round(values[min(len(values) - 1, int(round(0.9 * (len(values) - 1))))], 1),
+            'max': round(values[-1], 1)
+        }
+
+    for key in ('apiCalls', 'deferredAtImport', 'clientsBuilt', 'statusCode'):
+        summary[key] = samples[-1][key]
+
+    return summary
+
+
+def compare_with_baseline(report, baseline, max_regression_percent):
+    """
+    Find functions whose median cold start regressed against a baseline
+
+    Args:
+        report: Report produced by this run
+        baseline: Report loaded from --baseline
+        max_regression_percent: Allowed slowdown in percent
+
+    Returns:
+        list: Human-readable regression descriptions
+    """
+    regressions = []
+
+    for function_name, summary in report['functions'].items():
+        previous = baseline.get('functions', {}).get(function_name)
+        if not previous or not previous.get('coldStartToFirstCallMs') or not summary.get('coldStartToFirstCallMs'):
+            continue
+
+        before = previous['coldStartToFirstCallMs']['median']
+        after = summary['coldStartToFirstCallMs']['median']
+        change = (after - before) / before * 100 if before else 0.0
+        summary['changePercent'] = round(change, 1)
+
+        if change > max_regression_percent:
+            regressions.append(
+                f"{function_name}: cold start to first API call {before}ms -> {after}ms "
+                f"(+{change:.1f}%, limit {max_regression_percent}%)"
+            )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Lambda handler cold starts')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='fresh interpreters per function')
+    parser.add_argument('--functions', nargs='+', choices=sorted(FUNCTION_EVENTS), default=list(FUNCTION_EVENTS))
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--max-regression-percent', type=float, default=DEFAULT_MAX_REGRESSION_PERCENT)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return 0
+
+    report = {
+        'python': sys.version.split()[0],
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'functions': {}
+    }
+
+    for function_name in args.functions:
+        summary = measure(function_name, args.runs)
+        report['functions'][function_name] = summary
+        print(
+            f"{function_name:24} import {summary['importMs']['median']:7.1f}ms  "
+            f"first call {summary['firstApiCallMs']['median'] if summary['firstApiCallMs'] else float('nan'):7.1f}ms  "
+            f"process {summary['processMs']['median']:7.1f}ms  "
+            f"clients {','.join(summary['clientsBuilt']) or '-'}  "
+            f"deferred {','.join(summary['deferredAtImport']) or '-'}"
+        )
+
+    status = 0
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare_with_baseline(report, json.load(handle), args.max_regression_percent)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        status = 1 if regressions else 0
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
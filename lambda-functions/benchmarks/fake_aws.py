@@ -0,0 +1,873 @@
+"""
+Fake AWS
+
+In-process stand-in for the AWS APIs the handlers call, for benchmarks and
+local runs without an AWS account:
+
+- Auto Scaling: DescribeAutoScalingGroups, DescribeAutoScalingInstances
+- EC2: DescribeInstances (instance-id, instance-state-name and tag filters),
+  TerminateInstances
+- ELBv2: DescribeTargetGroups, DescribeTargetHealth
+- CloudWatch: GetMetricData (MetricStat queries; HealthyHostCount and
+  UnHealthyHostCount follow the simulated target health)
+- DynamoDB: PutItem, GetItem, DeleteItem on tables created with add_table()
+  (condition expressions built from attribute_exists/attribute_not_exists
+  and comparisons, joined with AND/OR)
+
+Install it with chaos_common.clients.install_backend(FakeAWS(...)). Clients
+then answer every call from the backend's state through botocore's
+before-call event, like botocore.stub.Stubber: parameters are still
+validated by botocore and responses still pass through the client's event
+hooks (instrumentation), but nothing is serialized or sent.
+
+Every call can be slowed down (latency_seconds, operation_latency) and
+throttled (throttle_rates: a server-side token bucket per service;
+throttle_probability: random throttles). Throttled attempts are retried
+inside the backend with exponential backoff, the way the clients' retry
+mode would, and the client gets a throttling error only when all
+max_attempts attempts were throttled. Pass the clients' rate_limiter to
+make every attempt take a client-side token as a real request would.
+
+Terminated instances go through shutting-down to terminated, leave their
+Auto Scaling Group and target group, and (with replace_terminated) are
+replaced by a new instance that turns InService and healthy after the
+configured delays. Metric math (Expression) queries return no datapoints.
+
+Lifecycle changes are applied when a call comes in, or continuously after
+start(). With an event_sink, every change is also delivered to it as the
+EventBridge event AWS would send (EC2 state-change notifications, Auto
+Scaling launch and terminate events), e.g. to the recovery-events handler.
+"""
+
+import re
+import time
+import heapq
+import random
+import itertools
+import threading
+from datetime import datetime, timezone
+from chaos_common.rate_limit import TokenBucket
+from chaos_common.recovery_events import build_autoscaling_event, build_state_change_event
+
+DEFAULT_REGION = 'us-east-1'
+DEFAULT_AVAILABILITY_ZONES = ['us-east-1a', 'us-east-1b', 'us-east-1c']
+ACCOUNT_ID = '123456789012'
+VPC_ID = 'vpc-0fake0000000000000'
+
+# Simulated instance lifecycle (seconds)
+TERMINATION_SECONDS = 1.0  # shutting-down -> terminated
+REPLACEMENT_LAUNCH_SECONDS = 2.0  # Termination request -> replacement pending
+REPLACEMENT_READY_SECONDS = 5.0  # Replacement pending -> InService and healthy
+
+# Default values of simulated CloudWatch metrics (per datapoint)
+DEFAULT_METRIC_VALUES = {
+    'RequestCount': 1000.0,
+    'HTTPCode_Target_5XX_Count': 0.0,
+    'TargetResponseTime': 0.05
+}
+
+# Retries of throttled attempts
+DEFAULT_MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 0.05
+RETRY_MAX_BACKOFF_SECONDS = 2.0
+
+ASG_MAX_RECORDS = 100  # DescribeAutoScalingGroups page size limit
+TARGET_GROUP_PAGE_SIZE = 400  # DescribeTargetGroups page size limit
+
+STATE_CODES = {'pending': 0, 'running': 16, 'shutting-down': 32, 'terminated': 48, 'stopping': 64, 'stopped': 80}
+THROTTLING_CODES = {'ec2': 'RequestLimitExceeded'}  # Other services answer 'Throttling'
+
+
+class FakeAWSError(Exception):
+    """Error answered to the client as an AWS error response"""
+
+    def __init__(self, code, message, status_code=400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status_code = status_code
+
+
+class FakeAWS:
+    """
+    Simulated Auto Scaling, EC2, ELBv2, CloudWatch and DynamoDB backend
+
+    Args:
+        latency_seconds: Latency added to every call
+        operation_latency: Latency overrides per 'service.Operation' or service
+        latency_jitter: Random +/- fraction applied to every latency
+        throttle_rates: Server-side limits per service: requests per second
+                        or (requests per second, burst size)
+        throttle_probability: Share of attempts throttled at random
+        max_attempts: Attempts per call before a throttling error is returned
+        rate_limiter: Optional chaos_common RateLimiter every attempt takes a token from
+        replace_terminated: If true, Auto Scaling replaces terminated instances
+        clock: Wall clock function (overridable for tests)
+        sleep: Sleep function (overridable for tests)
+        seed: Random seed for jitter and random throttles
+        region: Region reported to the client factory
+        event_sink: Optional callable receiving the EventBridge event of
+                    every lifecycle change
+        termination_seconds: shutting-down -> terminated delay
+        replacement_launch_seconds: Termination request -> replacement pending delay
+        replacement_ready_seconds: Replacement pending -> InService delay
+    """
+
+    def __init__(self, latency_seconds=0.0, operation_latency=None, latency_jitter=0.0,
+                 throttle_rates=None, throttle_probability=0.0, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 rate_limiter=None, replace_terminated=True, clock=time.time, sleep=time.sleep,
+                 seed=None, region=DEFAULT_REGION, event_sink=None,
+                 termination_seconds=TERMINATION_SECONDS,
+                 replacement_launch_seconds=REPLACEMENT_LAUNCH_SECONDS,
+                 replacement_ready_seconds=REPLACEMENT_READY_SECONDS):
+        self.latency_seconds = latency_seconds
+        self.operation_latency = dict(operation_latency or {})
+        self.latency_jitter = latency_jitter
+        self.throttle_probability = throttle_probability
+        self.max_attempts = max_attempts
+        self.rate_limiter = rate_limiter
+        self.replace_terminated = replace_terminated
+        self.region = region
+        self.event_sink = event_sink
+        self.termination_seconds = termination_seconds
+        self.replacement_launch_seconds = replacement_launch_seconds
+        self.replacement_ready_seconds = replacement_ready_seconds
+        self.metric_values = dict(DEFAULT_METRIC_VALUES)
+
+        self._clock = clock
+        self._sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._outbox = []
+        self._delivery_lock = threading.Lock()
+        self._ticker = None
+        self._stopped = threading.Event()
+
+        self.buckets = {}
+        for service, rate in (throttle_rates or {}).items():
+            rate, burst = rate if isinstance(rate, (tuple, list)) else (rate, rate)
+            self.buckets[service] = TokenBucket(rate, burst, clock=time.monotonic)
+
+        self.reset()
+
+    def reset(self):
+        """Remove every simulated resource and pending lifecycle change, and forget the call counts"""
+        with self._lock:
+            self.instances = {}
+            self.groups = {}
+            self.target_groups = {}
+            self.tables = {}
+            self._events = []
+            self._outbox = []
+        self.reset_stats()
+
+    # ------------------------------------------------------------------
+    # Simulated inventory
+
+    def add_fleet(self, asg_name, size, availability_zones=None, chaos_target_ratio=1.0,
+                  tags=None, instance_type='t3.micro', target_group=True):
+        """
+        Create an Auto Scaling Group of running instances
+
+        Args:
+            asg_name: Auto Scaling Group name
+            size: Number of instances (also the desired capacity)
+            availability_zones: Zones the instances are spread over (round robin)
+            chaos_target_ratio: Share of instances tagged ChaosTarget=true
+            tags: Extra Auto Scaling Group tags (propagated to the instances)
+            instance_type: EC2 instance type
+            target_group: If true, register the instances with a new target
+                          group behind a new load balancer
+
+        Returns:
+            dict: autoScalingGroupName, instanceIds, and targetGroupArn /
+                  loadBalancerArn when a target group was created
+        """
+        availability_zones = list(availability_zones or DEFAULT_AVAILABILITY_ZONES)
+
+        with self._lock:
+            fleet = {'autoScalingGroupName': asg_name}
+            group = {
+                'name': asg_name,
+                'availabilityZones': availability_zones,
+                'desired': size,
+                'tags': dict(tags or {}),
+                'instanceType': instance_type,
+                'instances': {},
+                'targetGroupArns': [],
+                'createdTime': self.now()
+            }
+            self.groups[asg_name] = group
+
+            if target_group:
+                suffix = f"{next(self._ids):016x}"
+                load_balancer_arn = (
+                    f"arn:aws:elasticloadbalancing:{self.region}:{ACCOUNT_ID}:loadbalancer/app/{asg_name}-alb/{suffix}"
+                )
+                target_group_arn = (
+                    f"arn:aws:elasticloadbalancing:{self.region}:{ACCOUNT_ID}:targetgroup/{asg_name}-tg/{suffix}"
+                )
+                self.target_groups[target_group_arn] = {
+                    'arn': target_group_arn,
+                    'name': f"{asg_name}-tg",
+                    'loadBalancerArn': load_balancer_arn,
+                    'targets': {}
+                }
+                group['targetGroupArns'].append(target_group_arn)
+                fleet.update(targetGroupArn=target_group_arn, loadBalancerArn=load_balancer_arn)
+
+            tagged = round(size * chaos_target_ratio)
+            fleet['instanceIds'] = [
+                self._launch(group, availability_zones[index % len(availability_zones)],
+                             chaos_target=index < tagged, state='running')
+                for index in range(size)
+            ]
+
+        return fleet
+
+    def add_table(self, table_name):
+        """Create an empty DynamoDB table keyed by the string attribute 'pk'"""
+        with self._lock:
+            self.tables[table_name] = {}
+
+    def _launch(self, group, availability_zone, chaos_target=True, state='pending'):
+        number = next(self._ids)
+        instance_id = f"i-{number:017x}"
+        tags = {'aws:autoscaling:groupName': group['name'], **group['tags']}
+        if chaos_target:
+            tags['ChaosTarget'] = 'true'
+
+        self.instances[instance_id] = {
+            'id': instance_id,
+            'state': state,
+            'availabilityZone': availability_zone,
+            'instanceType': group['instanceType'],
+            'privateIp': f"10.{(number >> 16) & 255}.{(number >> 8) & 255}.{number & 255}",
+            'launchTime': self.now(),
+            'tags': tags,
+            'group': group['name']
+        }
+
+        in_service = state == 'running'
+        group['instances'][instance_id] = 'InService' if in_service else 'Pending'
+        for target_group_arn in group['targetGroupArns']:
+            if in_service:
+                self.target_groups[target_group_arn]['targets'][instance_id] = 'healthy'
+
+        return instance_id
+
+    def now(self):
+        """Current simulated time as an aware datetime"""
+        return datetime.fromtimestamp(self._clock(), timezone.utc)
+
+    def _schedule(self, delay_seconds, action):
+        heapq.heappush(self._events, (self._clock() + delay_seconds, next(self._ids), action))
+
+    def advance(self):
+        """Apply every lifecycle change that is due, then deliver its events"""
+        with self._lock:
+            while self._events and self._events[0][0] <= self._clock():
+                _, _, action = heapq.heappop(self._events)
+                action()
+
+        self._deliver()
+
+    def start(self, interval_seconds=0.05):
+        """Apply lifecycle changes in a background thread, also while no calls come in"""
+        if self._ticker is not None:
+            return
+
+        self._stopped.clear()
+
+        def tick():
+            while not self._stopped.wait(interval_seconds):
+                self.advance()
+
+        self._ticker = threading.Thread(target=tick, name='fake-aws-lifecycle', daemon=True)
+        self._ticker.start()
+
+    def stop(self):
+        """Stop the background thread started by start()"""
+        if self._ticker is None:
+            return
+
+        self._stopped.set()
+        self._ticker.join()
+        self._ticker = None
+
+    def _emit(self, envelope):
+        if self.event_sink is not None:
+            self._outbox.append(envelope)
+
+    def _deliver(self):
+        # Outside the state lock: the sink may call back into the backend.
+        # One thread delivers at a time so events arrive in order.
+        if self.event_sink is None or not self._delivery_lock.acquire(blocking=False):
+            return
+
+        try:
+            while True:
+                with self._lock:
+                    envelopes, self._outbox = self._outbox, []
+                if not envelopes:
+                    break
+                for envelope in envelopes:
+                    self.event_sink(envelope)
+        finally:
+            self._delivery_lock.release()
+
+    def _finish_termination(self, instance_id):
+        instance = self.instances[instance_id]
+        instance['state'] = 'terminated'
+        self._emit(build_state_change_event(instance_id, 'terminated', self.now()))
+
+        group = self.groups.get(instance['group'])
+        if group is not None and instance_id in group['instances']:
+            group['instances'].pop(instance_id)
+            for target_group_arn in group['targetGroupArns']:
+                self.target_groups[target_group_arn]['targets'].pop(instance_id, None)
+            self._emit(build_autoscaling_event(
+                'terminated', group['name'], instance_id,
+                start_time=instance['terminationRequestedAt'], end_time=self.now(),
+                cause='An instance was taken out of service in response to an EC2 instance status check failure'
+            ))
+
+    def _replace(self, group_name, availability_zone, chaos_target):
+        group = self.groups[group_name]
+        instance_id = self._launch(group, availability_zone, chaos_target=chaos_target)
+        self._emit(build_state_change_event(instance_id, 'pending', self.now()))
+        self._schedule(self.replacement_ready_seconds, lambda: self._put_in_service(instance_id))
+
+    def _put_in_service(self, instance_id):
+        instance = self.instances[instance_id]
+        if instance['state'] != 'pending':
+            return
+
+        instance['state'] = 'running'
+        group = self.groups[instance['group']]
+        group['instances'][instance_id] = 'InService'
+        for target_group_arn in group['targetGroupArns']:
+            self.target_groups[target_group_arn]['targets'][instance_id] = 'healthy'
+
+        self._emit(build_state_change_event(instance_id, 'running', self.now()))
+        self._emit(build_autoscaling_event(
+            'launched', group['name'], instance_id, start_time=instance['launchTime'], end_time=self.now(),
+            cause='An instance was started in response to a difference between desired and actual capacity'
+        ))
+
+    # ------------------------------------------------------------------
+    # Client plumbing
+
+    def attach(self, client):
+        """
+        Answer every call of a boto3 client from this backend
+
+        Args:
+            client: boto3 client
+
+        Returns:
+            The same client
+        """
+        events = client.meta.events
+        events.register('before-parameter-build', self._capture_params, unique_id='fake-aws-params')
+        events.register('before-call', self._before_call, unique_id='fake-aws-call')
+        return client
+
+    def _capture_params(self, params=None, context=None, **kwargs):
+        # before-call only sees the serialized request; keep the API parameters
+        if context is not None:
+            context['fakeAwsParams'] = dict(params or {})
+
+    def _before_call(self, model=None, context=None, **kwargs):
+        from botocore.awsrequest import AWSResponse
+
+        service = model.service_model.service_name
+        operation = f"{service}.{model.name}"
+        params = (context or {}).get('fakeAwsParams', {})
+
+        with self._lock:
+            stats = self.stats.setdefault(operation, {'calls': 0, 'attempts': 0, 'throttles': 0, 'errors': 0})
+            stats['calls'] += 1
+
+        attempt = 0
+
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(service)
+            self._sleep(self._latency(service, operation))
+
+            with self._lock:
+                stats['attempts'] += 1
+                throttled = self._throttled(service)
+                if throttled:
+                    stats['throttles'] += 1
+
+            if not throttled:
+                break
+
+            if attempt >= self.max_attempts:
+                error = FakeAWSError(THROTTLING_CODES.get(service, 'Throttling'), 'Rate exceeded')
+                return self._error_response(AWSResponse, stats, error, attempt)
+
+            self._sleep(min(RETRY_MAX_BACKOFF_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempt - 1)) * self._random.random())
+
+        handler = getattr(self, '_' + _snake_case(model.name), None)
+
+        try:
+            if handler is None:
+                raise FakeAWSError('InvalidAction', f"{operation} is not simulated")
+            self.advance()
+            with self._lock:
+                parsed = handler(params)
+        except FakeAWSError as error:
+            return self._error_response(AWSResponse, stats, error, attempt)
+
+        parsed['ResponseMetadata'] = self._metadata(200, attempt)
+        return AWSResponse(None, 200, {}, None), parsed
+
+    def _error_response(self, response_class, stats, error, attempt):
+        with self._lock:
+            stats['errors'] += 1
+
+        parsed = {
+            'Error': {'Code': error.code, 'Message': error.message},
+            'ResponseMetadata': self._metadata(error.status_code, attempt)
+        }
+        return response_class(None, error.status_code, {}, None), parsed
+
+    def _metadata(self, status_code, attempt):
+        return {
+            'RequestId': f"fake-{next(self._ids):012d}",
+            'HTTPStatusCode': status_code,
+            'HTTPHeaders': {},
+            'RetryAttempts': attempt - 1
+        }
+
+    def _latency(self, service, operation):
+        latency = self.operation_latency.get(operation, self.operation_latency.get(service, self.latency_seconds))
+        if self.latency_jitter:
+            latency *= 1 + self._random.uniform(-self.latency_jitter, self.latency_jitter)
+        return max(latency, 0.0)
+
+    def _throttled(self, service):
+        bucket = self.buckets.get(service)
+        if bucket is not None and not bucket.try_acquire():
+            return True
+        return self.throttle_probability > 0 and self._random.random() < self.throttle_probability
+
+    def reset_stats(self):
+        """Forget the recorded call counts"""
+        with self._lock:
+            self.stats = {}
+
+    def api_calls(self):
+        """Total API calls answered so far (retried attempts count once)"""
+        with self._lock:
+            return sum(stats['calls'] for stats in self.stats.values())
+
+    # ------------------------------------------------------------------
+    # Auto Scaling
+
+    def _describe_auto_scaling_groups(self, params):
+        names = params.get('AutoScalingGroupNames')
+        groups = [self.groups[name] for name in names if name in self.groups] if names else list(self.groups.values())
+
+        for filter_ in params.get('Filters', []):
+            groups = [group for group in groups if _matches_tag_filter(group['tags'], filter_)]
+
+        page_size = min(params.get('MaxRecords', 50), ASG_MAX_RECORDS)
+        page, next_token = _page(groups, params.get('NextToken'), page_size)
+
+        response = {'AutoScalingGroups': [self._group_description(group) for group in page]}
+        if next_token:
+            response['NextToken'] = next_token
+        return response
+
+    def _group_description(self, group):
+        return {
+            'AutoScalingGroupName': group['name'],
+            'AutoScalingGroupARN': (
+                f"arn:aws:autoscaling:{self.region}:{ACCOUNT_ID}:autoScalingGroup:fake:autoScalingGroupName/{group['name']}"
+            ),
+            'MinSize': 0,
+            'MaxSize': max(group['desired'] * 2, 1),
+            'DesiredCapacity': group['desired'],
+            'DefaultCooldown': 300,
+            'AvailabilityZones': list(group['availabilityZones']),
+            'HealthCheckType': 'ELB' if group['targetGroupArns'] else 'EC2',
+            'HealthCheckGracePeriod': 300,
+            'CreatedTime': group['createdTime'],
+            'TargetGroupARNs': list(group['targetGroupArns']),
+            'Instances': [
+                {
+                    'InstanceId': instance_id,
+                    'InstanceType': self.instances[instance_id]['instanceType'],
+                    'AvailabilityZone': self.instances[instance_id]['availabilityZone'],
+                    'LifecycleState': lifecycle_state,
+                    'HealthStatus': 'Healthy',
+                    'ProtectedFromScaleIn': False
+                }
+                for instance_id, lifecycle_state in group['instances'].items()
+            ],
+            'Tags': [
+                {
+                    'ResourceId': group['name'],
+                    'ResourceType': 'auto-scaling-group',
+                    'Key': key,
+                    'Value': value,
+                    'PropagateAtLaunch': True
+                }
+                for key, value in group['tags'].items()
+            ]
+        }
+
+    def _describe_auto_scaling_instances(self, params):
+        instance_ids = params.get('InstanceIds') or [
+            instance_id for group in self.groups.values() for instance_id in group['instances']
+        ]
+        instances = []
+
+        for instance_id in instance_ids:
+            instance = self.instances.get(instance_id)
+            group = self.groups.get(instance['group']) if instance else None
+            if group is None or instance_id not in group['instances']:
+                continue
+
+            instances.append({
+                'InstanceId': instance_id,
+                'InstanceType': instance['instanceType'],
+                'AutoScalingGroupName': group['name'],
+                'AvailabilityZone': instance['availabilityZone'],
+                'LifecycleState': group['instances'][instance_id],
+                'HealthStatus': 'HEALTHY',
+                'ProtectedFromScaleIn': False
+            })
+
+        page, next_token = _page(instances, params.get('NextToken'), min(params.get('MaxRecords', 50), 50))
+
+        response = {'AutoScalingInstances': page}
+        if next_token:
+            response['NextToken'] = next_token
+        return response
+
+    # ------------------------------------------------------------------
+    # EC2
+
+    def _describe_instances(self, params):
+        instance_ids = params.get('InstanceIds')
+
+        if instance_ids:
+            missing = [instance_id for instance_id in instance_ids if instance_id not in self.instances]
+            if missing:
+                raise FakeAWSError('InvalidInstanceID.NotFound', f"The instance IDs '{', '.join(missing)}' do not exist")
+            instances = [self.instances[instance_id] for instance_id in dict.fromkeys(instance_ids)]
+        else:
+            instances = list(self.instances.values())
+
+        for filter_ in params.get('Filters', []):
+            instances = [instance for instance in instances if _matches_instance_filter(instance, filter_)]
+
+        page, next_token = _page(instances, params.get('NextToken'), params.get('MaxResults'))
+
+        response = {
+            'Reservations': [
+                {
+                    'ReservationId': f"r-{instance['id'][2:]}",
+                    'OwnerId': ACCOUNT_ID,
+                    'Instances': [self._instance_description(instance)]
+                }
+                for instance in page
+            ]
+        }
+        if next_token:
+            response['NextToken'] = next_token
+        return response
+
+    def _instance_description(self, instance):
+        description = {
+            'InstanceId': instance['id'],
+            'InstanceType': instance['instanceType'],
+            'State': _state(instance['state']),
+            'Placement': {'AvailabilityZone': instance['availabilityZone'], 'Tenancy': 'default'},
+            'LaunchTime': instance['launchTime'],
+            'Tags': [{'Key': key, 'Value': value} for key, value in instance['tags'].items()]
+        }
+
+        if instance['state'] != 'terminated':
+            description.update({
+                'PrivateIpAddress': instance['privateIp'],
+                'SubnetId': f"subnet-{instance['availabilityZone'][-1]}fake",
+                'VpcId': VPC_ID
+            })
+
+        return description
+
+    def _terminate_instances(self, params):
+        instance_ids = list(dict.fromkeys(params['InstanceIds']))
+        missing = [instance_id for instance_id in instance_ids if instance_id not in self.instances]
+        if missing:
+            raise FakeAWSError('InvalidInstanceID.NotFound', f"The instance IDs '{', '.join(missing)}' do not exist")
+
+        terminating = []
+
+        for instance_id in instance_ids:
+            instance = self.instances[instance_id]
+            previous = instance['state']
+
+            if previous not in ('shutting-down', 'terminated'):
+                instance['state'] = 'shutting-down'
+                instance['terminationRequestedAt'] = self.now()
+                self._emit(build_state_change_event(instance_id, 'shutting-down', self.now()))
+                group = self.groups.get(instance['group'])
+
+                if group is not None and instance_id in group['instances']:
+                    group['instances'][instance_id] = 'Terminating'
+                    for target_group_arn in group['targetGroupArns']:
+                        targets = self.target_groups[target_group_arn]['targets']
+                        if instance_id in targets:
+                            targets[instance_id] = 'draining'
+
+                    if self.replace_terminated:
+                        self._schedule(
+                            self.replacement_launch_seconds,
+                            lambda group_name=group['name'], zone=instance['availabilityZone'],
+                            chaos_target='ChaosTarget' in instance['tags']: self._replace(group_name, zone, chaos_target)
+                        )
+
+                self._schedule(self.termination_seconds, lambda instance_id=instance_id: self._finish_termination(instance_id))
+
+            terminating.append({
+                'InstanceId': instance_id,
+                'PreviousState': _state(previous),
+                'CurrentState': _state(instance['state'])
+            })
+
+        return {'TerminatingInstances': terminating}
+
+    # ------------------------------------------------------------------
+    # ELBv2
+
+    def _describe_target_groups(self, params):
+        target_groups = list(self.target_groups.values())
+
+        if params.get('TargetGroupArns'):
+            missing = [arn for arn in params['TargetGroupArns'] if arn not in self.target_groups]
+            if missing:
+                raise FakeAWSError('TargetGroupNotFound', f"One or more target groups not found: {', '.join(missing)}")
+            target_groups = [self.target_groups[arn] for arn in params['TargetGroupArns']]
+        if params.get('LoadBalancerArn'):
+            target_groups = [tg for tg in target_groups if tg['loadBalancerArn'] == params['LoadBalancerArn']]
+        if params.get('Names'):
+            target_groups = [tg for tg in target_groups if tg['name'] in params['Names']]
+
+        page, next_marker = _page(target_groups, params.get('Marker'), params.get('PageSize', TARGET_GROUP_PAGE_SIZE))
+
+        response = {
+            'TargetGroups': [
+                {
+                    'TargetGroupArn': tg['arn'],
+                    'TargetGroupName': tg['name'],
+                    'Protocol': 'HTTP',
+                    'Port': 80,
+                    'VpcId': VPC_ID,
+                    'TargetType': 'instance',
+                    'LoadBalancerArns': [tg['loadBalancerArn']]
+                }
+                for tg in page
+            ]
+        }
+        if next_marker:
+            response['NextMarker'] = next_marker
+        return response
+
+    def _describe_target_health(self, params):
+        target_group = self.target_groups.get(params['TargetGroupArn'])
+        if target_group is None:
+            raise FakeAWSError('TargetGroupNotFound', f"Target group '{params['TargetGroupArn']}' not found")
+
+        descriptions = []
+
+        for instance_id, state in target_group['targets'].items():
+            health = {'State': state}
+            if state == 'draining':
+                health.update(Reason='Target.DeregistrationInProgress', Description='Target deregistration is in progress')
+            descriptions.append({
+                'Target': {'Id': instance_id, 'Port': 80},
+                'HealthCheckPort': '80',
+                'TargetHealth': health
+            })
+
+        return {'TargetHealthDescriptions': descriptions}
+
+    # ------------------------------------------------------------------
+    # CloudWatch
+
+    def _get_metric_data(self, params):
+        start = _epoch(params['StartTime'])
+        end = _epoch(params['EndTime'])
+        descending = params.get('ScanBy', 'TimestampDescending') == 'TimestampDescending'
+        results = []
+
+        for query in params['MetricDataQueries']:
+            result = {'Id': query['Id'], 'Label': query.get('Label', query['Id']), 'StatusCode': 'Complete'}
+            stat = query.get('MetricStat')
+
+            if stat is None:
+                result.update(Timestamps=[], Values=[])
+                results.append(result)
+                continue
+
+            period = stat['Period']
+            value = self._metric_value(stat['Metric'])
+            first = -(-int(start) // period) * period
+            timestamps = list(range(first, int(end), period))
+            if descending:
+                timestamps.reverse()
+
+            result['Timestamps'] = [datetime.fromtimestamp(timestamp, timezone.utc) for timestamp in timestamps]
+            result['Values'] = [value] * len(timestamps)
+            results.append(result)
+
+        return {'MetricDataResults': results, 'Messages': []}
+
+    def _metric_value(self, metric):
+        name = metric['MetricName']
+
+        if name in ('HealthyHostCount', 'UnHealthyHostCount'):
+            dimensions = {dimension['Name']: dimension['Value'] for dimension in metric.get('Dimensions', [])}
+            for target_group in self.target_groups.values():
+                if target_group['arn'].endswith(dimensions.get('TargetGroup', '\0')):
+                    states = list(target_group['targets'].values())
+                    if name == 'HealthyHostCount':
+                        return float(states.count('healthy'))
+                    return float(states.count('unhealthy'))
+            return 0.0
+
+        return float(self.metric_values.get(name, 0.0))
+
+    # ------------------------------------------------------------------
+    # DynamoDB
+
+    def _table(self, params):
+        table = self.tables.get(params['TableName'])
+        if table is None:
+            raise FakeAWSError('ResourceNotFoundException', 'Requested resource not found')
+        return table
+
+    def _check_condition(self, item, params):
+        expression = params.get('ConditionExpression')
+        if expression and not _condition_holds(item or {}, expression, params.get('ExpressionAttributeNames', {}),
+                                               params.get('ExpressionAttributeValues', {})):
+            raise FakeAWSError('ConditionalCheckFailedException', 'The conditional request failed')
+
+    def _put_item(self, params):
+        table = self._table(params)
+        key = params['Item']['pk']['S']
+        self._check_condition(table.get(key), params)
+        table[key] = dict(params['Item'])
+        return {}
+
+    def _get_item(self, params):
+        item = self._table(params).get(params['Key']['pk']['S'])
+        return {'Item': dict(item)} if item is not None else {}
+
+    def _delete_item(self, params):
+        table = self._table(params)
+        key = params['Key']['pk']['S']
+        self._check_condition(table.get(key), params)
+        table.pop(key, None)
+        return {}
+
+
+def _snake_case(name):
+    """'DescribeInstances' -> 'describe_instances'"""
+    return ''.join('_' + char.lower() if char.isupper() else char for char in name).lstrip('_')
+
+
+def _state(name):
+    return {'Code': STATE_CODES.get(name, 0), 'Name': name}
+
+
+def _epoch(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def _page(items, token, page_size):
+    """Slice a page of items; tokens are stringified offsets"""
+    offset = int(token) if token else 0
+
+    if not page_size:
+        return items[offset:], None
+
+    end = offset + page_size
+    return items[offset:end], str(end) if end < len(items) else None
+
+
+def _matches_tag_filter(tags, filter_):
+    name, values = filter_['Name'], filter_.get('Values', [])
+
+    if name.startswith('tag:'):
+        return tags.get(name[4:]) in values
+    if name == 'tag-key':
+        return any(key in values for key in tags)
+    if name == 'tag-value':
+        return any(value in values for value in tags.values())
+
+    raise FakeAWSError('ValidationError', f"Filter '{name}' is not simulated")
+
+
+def _matches_instance_filter(instance, filter_):
+    name, values = filter_['Name'], filter_.get('Values', [])
+
+    if name == 'instance-id':
+        return instance['id'] in values
+    if name == 'instance-state-name':
+        return instance['state'] in values
+    if name == 'availability-zone':
+        return instance['availabilityZone'] in values
+
+    try:
+        return _matches_tag_filter(instance['tags'], filter_)
+    except FakeAWSError:
+        raise FakeAWSError('InvalidParameterValue', f"The filter '{name}' is invalid")
+
+
+def _condition_holds(item, expression, names, values):
+    """Evaluate a DynamoDB condition expression (OR of ANDs of simple terms) against an item"""
+    return any(
+        all(_term_holds(item, term.strip(), names, values) for term in re.split(r'\s+AND\s+', alternative))
+        for alternative in re.split(r'\s+OR\s+', expression)
+    )
+
+
+def _term_holds(item, term, names, values):
+    match = re.fullmatch(r'attribute_(not_)?exists\((\S+)\)', term)
+    if match:
+        exists = names.get(match.group(2), match.group(2)) in item
+        return exists != bool(match.group(1))
+
+    match = re.fullmatch(r'(\S+)\s*(<>|<=|>=|=|<|>)\s*(\S+)', term)
+    if match is None:
+        raise FakeAWSError('ValidationException', f"Condition '{term}' is not simulated")
+
+    attribute = item.get(names.get(match.group(1), match.group(1)))
+    if attribute is None:
+        return False
+
+    left, right = _attribute_value(attribute), _attribute_value(values[match.group(3)])
+    return {
+        '=': left == right, '<>': left != right,
+        '<': left < right, '<=': left <= right,
+        '>': left > right, '>=': left >= right
+    }[match.group(2)]
+
+
+def _attribute_value(attribute):
+    (kind, value), = attribute.items()
+    return float(value) if kind == 'N' else value
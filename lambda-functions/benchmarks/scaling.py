@@ -0,0 +1,297 @@
+"""
+Scaling Benchmark
+
+Measures how the handlers behave as the fleet grows, against the in-process
+fake AWS backend (fake_aws.py), so no AWS account is needed:
+
+- get-target-instance: select a target from an Auto Scaling Group of N
+  instances (90% tagged ChaosTarget)
+- inject-failure: bulk-terminate 10% of the fleet
+- validate-system-health: validate a target group of N targets, with
+  CloudWatch metrics
+
+For every handler and fleet size (10, 100, 1,000 and 10,000 instances by
+default) it reports:
+
+- wallMs: handler wall time with cold caches (median / p90 / max over --runs)
+- apiCalls: API calls per invocation, per operation (deterministic)
+- throttles: throttled attempts the backend retried
+- peakAllocMb: peak Python memory allocated by one invocation (tracemalloc,
+  measured in an extra run so tracing does not slow the timed runs)
+- peakRssMb: peak resident memory of the process
+
+Every handler runs in a fresh interpreter per fleet size. Each call to the
+backend sleeps --latency-ms (default 10ms) so concurrency shows up in the
+wall time; --throttle-probability and --throttle-rate add throttling.
+
+Usage (from lambda-functions/):
+    python benchmarks/scaling.py
+    python benchmarks/scaling.py --sizes 10 100 1000 --runs 3 --output scaling-baseline.json
+    python benchmarks/scaling.py --baseline scaling-baseline.json --max-regression-percent 25
+
+With --baseline, the exit status is 1 when a handler's median wall time or
+peak allocation at any size regressed by more than the allowed percentage,
+or when it makes more API calls than before.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+FUNCTIONS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FUNCTIONS = ['get-target-instance', 'inject-failure', 'validate-system-health']
+FLEET_SIZES = [10, 100, 1000, 10000]
+ASG_NAME = 'scaling-benchmark-asg'
+CHAOS_TARGET_RATIO = 0.9
+TERMINATE_RATIO = 0.1  # Share of the fleet inject-failure terminates
+
+DEFAULT_RUNS = 3
+DEFAULT_LATENCY_MS = 10
+DEFAULT_MAX_REGRESSION_PERCENT = 20
+REGRESSION_METRICS = ['wallMs', 'peakAllocMb']
+
+
+def build_event(function_name, fleet, size):
+    """
+    Build the benchmark invocation of a handler
+
+    Args:
+        function_name: Function directory name
+        fleet: Fleet created by FakeAWS.add_fleet
+        size: Fleet size
+
+    Returns:
+        dict: Lambda event
+    """
+    if function_name == 'get-target-instance':
+        return {'autoScalingGroupName': fleet['autoScalingGroupName']}
+
+    if function_name == 'inject-failure':
+        return {'instanceIds': fleet['instanceIds'][:max(1, int(size * TERMINATE_RATIO))]}
+
+    return {
+        'targetGroupArn': fleet['targetGroupArn'],
+        'loadBalancerArn': fleet['loadBalancerArn'],
+        'expectedHealthyHosts': size
+    }
+
+
+def run_child(function_name, size, runs, options):
+    """
+    Benchmark one handler at one fleet size in this (fresh) interpreter and print the samples as JSON
+
+    Args:
+        function_name: Function directory name
+        size: Fleet size
+        runs: Timed invocations
+        options: Backend options (latencyMs, throttleProbability, throttleRate)
+    """
+    import logging
+    import resource
+    import tracemalloc
+
+    os.environ['AWS_CALL_METRICS_LOG'] = 'false'
+    sys.path[:0] = [os.path.join(FUNCTIONS_DIR, function_name), FUNCTIONS_DIR]
+    logging.disable(logging.CRITICAL)
+
+    import lambda_function
+    from fake_aws import FakeAWS
+    from chaos_common import clients
+    from chaos_common.inventory_cache import inventory_cache
+    from chaos_common.metric_cache import metric_cache
+
+    fake = FakeAWS(
+        latency_seconds=options['latencyMs'] / 1000,
+        throttle_probability=options['throttleProbability'],
+        throttle_rates={service: options['throttleRate'] for service in ('ec2', 'autoscaling', 'elbv2', 'cloudwatch')}
+        if options['throttleRate'] else None,
+        seed=0
+    )
+    clients.install_backend(fake)
+
+    def invoke():
+        # Fresh fleet and cold caches for every invocation
+        fake.reset()
+        fleet = fake.add_fleet(ASG_NAME, size, chaos_target_ratio=CHAOS_TARGET_RATIO)
+        inventory_cache.clear()
+        metric_cache.clear()
+        event = build_event(function_name, fleet, size)
+
+        started = time.perf_counter()
+        response = lambda_function.lambda_handler(event, None)
+        return response, (time.perf_counter() - started) * 1000
+
+    # Untimed warm-up: boto3 import and client construction are cold start costs (see cold_start.py)
+    invoke()
+
+    samples = []
+    for _ in range(runs):
+        response, wall_ms = invoke()
+        samples.append(wall_ms)
+    api_calls, operations = fake.api_calls(), dict(fake.stats)
+
+    tracemalloc.start()
+    invoke()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(json.dumps({
+        'wallMs': samples,
+        'apiCalls': api_calls,
+        'operations': {operation: stats['calls'] for operation, stats in sorted(operations.items())},
+        'throttles': sum(stats['throttles'] for stats in operations.values()),
+        'peakAllocMb': peak / 1024 / 1024,
+        'peakRssMb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'statusCode': response.get('statusCode')
+    }))
+
+
+def summarize(values):
+    """Median, p90 and max of a list of numbers"""
+    values = sorted(values)
+    return {
+        'median': round(statistics.median(values), 1),
+        'p90': round(values[min(len(values) - 1, int(round(0.9 * (len(values) - 1))))], 1),
+        'max': round(values[-1], 1)
+    }
+
+
+def measure(function_name, size, runs, options):
+    """
+    Benchmark one handler at one fleet size in a fresh interpreter
+
+    Args:
+        function_name: Function directory name
+        size: Fleet size
+        runs: Timed invocations
+        options: Backend options passed to the child
+
+    Returns:
+        dict: Summary of the child's samples
+    """
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', function_name, str(size), str(runs), json.dumps(options)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    sample = json.loads(output.strip().splitlines()[-1])
+
+    return {
+        'wallMs': summarize(sample['wallMs']),
+        'apiCalls': sample['apiCalls'],
+        'operations': sample['operations'],
+        'throttles': sample['throttles'],
+        'peakAllocMb': round(sample['peakAllocMb'], 2),
+        'peakRssMb': round(sample['peakRssMb'], 1),
+        'statusCode': sample['statusCode']
+    }
+
+
+def compare_with_baseline(report, baseline, max_regression_percent):
+    """
+    Find handler and fleet size combinations that regressed against a baseline
+
+    Args:
+        report: Report produced by this run
+        baseline: Report loaded from --baseline
+        max_regression_percent: Allowed growth in percent of wall time and peak allocation
+
+    Returns:
+        list: Human-readable regression descriptions
+    """
+    regressions = []
+
+    for function_name, sizes in report['functions'].items():
+        for size, summary in sizes.items():
+            previous = baseline.get('functions', {}).get(function_name, {}).get(size)
+            if not previous:
+                continue
+
+            if summary['apiCalls'] > previous['apiCalls']:
+                regressions.append(
+                    f"{function_name} @ {size}: API calls {previous['apiCalls']} -> {summary['apiCalls']}"
+                )
+
+            for metric in REGRESSION_METRICS:
+                before = previous[metric]['median'] if metric == 'wallMs' else previous[metric]
+                after = summary[metric]['median'] if metric == 'wallMs' else summary[metric]
+                change = (after - before) / before * 100 if before else 0.0
+
+                if change > max_regression_percent:
+                    regressions.append(
+                        f"{function_name} @ {size}: {metric} {before} -> {after} "
+                        f"(+{change:.1f}%, limit {max_regression_percent}%)"
+                    )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure handler scaling against a simulated fleet')
+    parser.add_argument('--sizes', type=int, nargs='+', default=FLEET_SIZES, help='fleet sizes (instances)')
+    parser.add_argument('--functions', nargs='+', choices=FUNCTIONS, default=FUNCTIONS)
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='timed invocations per handler and size')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS, help='simulated latency per API call')
+    parser.add_argument('--throttle-probability', type=float, default=0.0, help='share of API attempts throttled at random')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='server-side requests per second per service (0: unlimited)')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--max-regression-percent', type=float, default=DEFAULT_MAX_REGRESSION_PERCENT)
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        function_name, size, runs, options = args.child
+        run_child(function_name, int(size), int(runs), json.loads(options))
+        return 0
+
+    options = {
+        'latencyMs': args.latency_ms,
+        'throttleProbability': args.throttle_probability,
+        'throttleRate': args.throttle_rate
+    }
+    report = {
+        'python': sys.version.split()[0],
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'options': options,
+        'functions': {}
+    }
+
+    for function_name in args.functions:
+        report['functions'][function_name] = {}
+
+        for size in args.sizes:
+            summary = measure(function_name, size, args.runs, options)
+            report['functions'][function_name][str(size)] = summary
+            print(
+                f"{function_name:24} {size:>6} instances  "
+                f"wall {summary['wallMs']['median']:9.1f}ms  "
+                f"API calls {summary['apiCalls']:4}  "
+                f"throttles {summary['throttles']:3}  "
+                f"peak alloc {summary['peakAllocMb']:8.2f}MB  "
+                f"rss {summary['peakRssMb']:6.1f}MB  "
+                f"status {summary['statusCode']}"
+            )
+
+    status = 0
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare_with_baseline(report, json.load(handle), args.max_regression_percent)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        status = 1 if regressions else 0
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""
+Chaos Common
+
+Shared helpers for the Chaos Engineering Platform Lambda functions.
+
+This package is bundled next to lambda_function.py in every deployment
+package (see scripts/deploy-lambda-functions.sh).
+"""
@@ -0,0 +1,197 @@
+"""
+Clients
+
+Factory for the boto3 clients used by every handler.
+
+All clients are built with the same settings instead of boto3's defaults:
+
+- adaptive retry mode, which backs off exponentially on Throttling and
+  RequestLimitExceeded and rate-limits the client after a throttle
+- a connection pool sized for the handlers' concurrent probes, with TCP
+  keep-alive so warm containers reuse connections
+- explicit connect and read timeouts, so a hung call fails fast enough to
+  be retried inside the Lambda timeout
+
+Every client also takes a token from the process-wide rate_limiter (one
+bucket per service, see rate_limit.py) before each request. A burst of
+experiments then slows down before the account is throttled. Its calls are
+timed and counted by instrumentation.recorder.
+
+Clients are cached per service and settings, so handlers bundled into one
+process (e.g. the experiment runner) share connections and budgets.
+
+Importing boto3 and building a client take a large part of a cold start,
+so neither happens at import time: handlers hold LazyClient stand-ins
+(lazy_client()) that build the real client on first use, and boto3 is
+only imported then. An invocation that never calls a service never pays
+for its client.
+
+install_backend() swaps AWS for an in-process backend (see
+benchmarks/fake_aws.py): every client built afterwards has its calls
+answered by the backend instead of being sent over the network.
+"""
+
+import os
+import threading
+from chaos_common.rate_limit import RateLimiter
+
+# Client configuration (overridable through environment variables)
+MAX_ATTEMPTS = int(os.environ.get('CLIENT_MAX_ATTEMPTS', '6'))  # Including the first attempt
+MAX_POOL_CONNECTIONS = int(os.environ.get('CLIENT_MAX_POOL_CONNECTIONS', '20'))
+CONNECT_TIMEOUT_SECONDS = float(os.environ.get('CLIENT_CONNECT_TIMEOUT_SECONDS', '5'))
+READ_TIMEOUT_SECONDS = float(os.environ.get('CLIENT_READ_TIMEOUT_SECONDS', '15'))
+
+# Error codes AWS services use for request throttling
+THROTTLING_ERROR_CODES = [
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestLimitExceeded',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'SlowDown'
+]
+
+# Process-wide API budget shared by every client built here
+rate_limiter = RateLimiter()
+
+_clients = {}
+_lock = threading.Lock()
+_backend = None
+
+
+def build_config(**overrides):
+    """
+    Build the botocore Config used for chaos platform clients
+
+    Args:
+        overrides: Config arguments replacing the defaults (e.g.
+                   max_pool_connections, read_timeout)
+
+    Returns:
+        botocore.config.Config: Client configuration
+    """
+    from botocore.config import Config
+
+    settings = {
+        'retries': {'mode': 'adaptive', 'total_max_attempts': MAX_ATTEMPTS},
+        'max_pool_connections': MAX_POOL_CONNECTIONS,
+        'connect_timeout': CONNECT_TIMEOUT_SECONDS,
+        'read_timeout': READ_TIMEOUT_SECONDS,
+        'tcp_keepalive': True
+    }
+    settings.update(overrides)
+
+    return Config(**settings)
+
+
+def get_client(service, endpoint_url=None, **overrides):
+    """
+    Return a shared, rate-limited boto3 client
+
+    Args:
+        service: Service name ('ec2', 'autoscaling', 'elbv2', ...)
+        endpoint_url: Endpoint override (e.g. DynamoDB Local)
+        overrides: Config arguments replacing the defaults
+
+    Returns:
+        boto3 client
+    """
+    key = (service, endpoint_url, repr(sorted(overrides.items())))
+
+    with _lock:
+        client = _clients.get(key)
+
+        if client is None:
+            import boto3
+            from chaos_common.instrumentation import recorder
+
+            params = {'config': build_config(**overrides)}
+            if endpoint_url:
+                params['endpoint_url'] = endpoint_url
+            if _backend is not None:
+                # No request leaves the process, so any region and credentials do
+                params.update(region_name=_backend.region, aws_access_key_id='offline', aws_secret_access_key='offline')
+
+            client = recorder.attach(rate_limiter.attach(boto3.client(service, **params)))
+            if _backend is not None:
+                client = _backend.attach(client)
+            _clients[key] = client
+
+    return client
+
+
+def install_backend(backend):
+    """
+    Answer every AWS call from an in-process backend instead of AWS
+
+    Cached clients are dropped, so clients (and LazyClient stand-ins) pick
+    up the change with their next call.
+
+    Args:
+        backend: Object with a 'region' attribute and an attach(client)
+                 method returning the client (e.g. benchmarks.fake_aws.FakeAWS),
+                 or None to talk to AWS again
+    """
+    global _backend
+
+    with _lock:
+        _backend = backend
+        _clients.clear()
+
+
+class LazyClient:
+    """
+    Stand-in for a boto3 client that is built on first attribute access
+
+    Args:
+        service: Service name ('ec2', 'autoscaling', 'elbv2', ...)
+        endpoint_url: Endpoint override
+        overrides: Config arguments replacing the defaults
+    """
+
+    def __init__(self, service, endpoint_url=None, **overrides):
+        self._service = service
+        self._endpoint_url = endpoint_url
+        self._overrides = overrides
+
+    @property
+    def client(self):
+        """The real client (cached by get_client)"""
+        return get_client(self._service, self._endpoint_url, **self._overrides)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def __repr__(self):
+        return f"LazyClient({self._service!r})"
+
+
+def lazy_client(service, endpoint_url=None, **overrides):
+    """
+    Return a client stand-in that defers boto3 until the first API call
+
+    Args:
+        service: Service name ('ec2', 'autoscaling', 'elbv2', ...)
+        endpoint_url: Endpoint override
+        overrides: Config arguments replacing the defaults
+
+    Returns:
+        LazyClient: Proxy forwarding every attribute to the shared client
+    """
+    return LazyClient(service, endpoint_url, **overrides)
+
+
+def is_throttling_error(error):
+    """
+    Check whether a botocore ClientError reports request throttling
+
+    Args:
+        error: botocore.exceptions.ClientError
+
+    Returns:
+        bool: True if AWS throttled the request (after all retries)
+    """
+    return error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
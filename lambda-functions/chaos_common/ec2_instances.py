@@ -0,0 +1,116 @@
+"""
+EC2 Instances
+
+Single-fetch helpers that return the ChaosTarget tag verdict and the instance
+description from the same DescribeInstances response, so no handler has to
+describe an instance twice.
+"""
+
+import logging
+from botocore.exceptions import ClientError
+from chaos_common.inventory_cache import (
+    inventory_cache, instance_key, NOT_A_CHAOS_TARGET
+)
+from chaos_common.structured_logging import verbose_fields
+
+logger = logging.getLogger()
+
+CHAOS_TARGET_TAG_KEY = 'ChaosTarget'
+INSTANCE_ID_CHUNK_SIZE = 200  # Instance IDs per DescribeInstances filter
+NOT_FOUND_ERROR_CODES = ('InvalidInstanceID.NotFound', 'InvalidInstanceID.Malformed')
+
+
+def has_chaos_target_tag(instance):
+    """
+    Check if an EC2 instance description is tagged as a chaos target
+
+    Args:
+        instance: Instance dictionary from DescribeInstances
+
+    Returns:
+        bool: True if instance is tagged with ChaosTarget=true
+    """
+    for tag in instance.get('Tags', []):
+        if tag['Key'] == CHAOS_TARGET_TAG_KEY and tag['Value'].lower() == 'true':
+            return True
+
+    return False
+
+
+def verify_and_describe(ec2, instance_id, use_cache=True):
+    """
+    Fetch an instance once and return both its tag verdict and its description
+
+    Args:
+        ec2: boto3 EC2 client
+        instance_id: EC2 instance ID
+        use_cache: If true, serve the description from the inventory cache when possible
+
+    Returns:
+        tuple: (is_chaos_target, instance) where instance is the raw
+               DescribeInstances entry, or None if the instance does not exist
+    """
+    cached = inventory_cache.get(instance_key(instance_id)) if use_cache else None
+
+    if cached is not None and cached is not NOT_A_CHAOS_TARGET:
+        logger.info("Using cached description for instance %s", instance_id, extra=verbose_fields(instanceId=instance_id))
+        return has_chaos_target_tag(cached), cached
+
+    try:
+        response = ec2.describe_instances(InstanceIds=[instance_id])
+    except ClientError as e:
+        if e.response['Error']['Code'] in NOT_FOUND_ERROR_CODES:
+            return False, None
+        raise
+
+    if not response['Reservations'] or not response['Reservations'][0]['Instances']:
+        return False, None
+
+    instance = response['Reservations'][0]['Instances'][0]
+    inventory_cache.put(instance_key(instance_id), instance)
+
+    return has_chaos_target_tag(instance), instance
+
+
+def verify_and_describe_batch(ec2, instance_ids, use_cache=True):
+    """
+    Batched form of verify_and_describe
+
+    Instance IDs are passed as an instance-id filter in chunks of
+    INSTANCE_ID_CHUNK_SIZE, so unknown IDs are simply absent from the result
+    instead of failing the whole request.
+
+    Args:
+        ec2: boto3 EC2 client
+        instance_ids: List of EC2 instance IDs
+        use_cache: If true, serve descriptions from the inventory cache when possible
+
+    Returns:
+        dict: Mapping of instance ID to (is_chaos_target, instance); unknown
+              instances map to (False, None)
+    """
+    results = {}
+    missing_ids = []
+
+    for instance_id in instance_ids:
+        cached = inventory_cache.get(instance_key(instance_id)) if use_cache else None
+        if cached is not None and cached is not NOT_A_CHAOS_TARGET:
+            results[instance_id] = (has_chaos_target_tag(cached), cached)
+        else:
+            missing_ids.append(instance_id)
+
+    paginator = ec2.get_paginator('describe_instances')
+
+    for start in range(0, len(missing_ids), INSTANCE_ID_CHUNK_SIZE):
+        chunk = missing_ids[start:start + INSTANCE_ID_CHUNK_SIZE]
+
+        for page in paginator.paginate(Filters=[{'Name': 'instance-id', 'Values': chunk}]):
+            for reservation in page.get('Reservations', []):
+                for instance in reservation.get('Instances', []):
+                    inventory_cache.put(instance_key(instance['InstanceId']), instance)
+                    results[instance['InstanceId']] = (has_chaos_target_tag(instance), instance)
+
+    for instance_id in missing_ids:
+        results.setdefault(instance_id, (False, None))
+
+    return results
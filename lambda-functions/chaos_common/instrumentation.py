@@ -0,0 +1,363 @@
+"""
+Instrumentation
+
+Per-invocation metrics for every AWS call a handler makes.
+
+The recorder hooks the botocore events of each client built by
+chaos_common.clients:
+
+- before-call / after-call time each API call (retries included) and
+  collect its retry count from the response metadata
+- after-call-error counts calls that failed without a response (timeouts,
+  connection errors)
+- needs-retry counts every throttled attempt, including the ones the
+  retry handler absorbed
+
+Handlers wrapped with @instrumented write the collected numbers to the log
+as CloudWatch Embedded Metric Format documents (one line each), where
+CloudWatch turns them into metrics. Per operation they hold the call, error,
+retry and throttle counts, latency samples and a latency histogram. A
+summary document splits the invocation into AWS time (the union of all call
+intervals, so parallel calls are not double counted) and compute time.
+
+The response only carries the invocation totals under 'awsCallMetrics', and
+only while the response stays within the payload size budget, since the
+response has already been shaped by shape_payload() at that point.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import functools
+from chaos_common.clients import THROTTLING_ERROR_CODES
+from chaos_common.payloads import DEFAULT_SIZE_BUDGET_BYTES, payload_size
+
+logger = logging.getLogger()
+
+# Latency histogram bucket upper bounds in milliseconds (plus an overflow bucket)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+MAX_EMF_VALUES = 100  # EMF accepts at most 100 values per metric
+EMF_NAMESPACE = os.environ.get('AWS_CALL_METRICS_NAMESPACE', 'ChaosPlatform/AWSCalls')
+EMF_LOG_ENABLED = os.environ.get('AWS_CALL_METRICS_LOG', 'true').lower() == 'true'
+
+_STARTED_KEY = 'chaosCallStarted'
+
+
+def operation_name(model):
+    """Return 'service.Operation' for a botocore OperationModel"""
+    return f"{model.service_model.service_name}.{model.name}"
+
+
+class CallRecorder:
+    """
+    Collect per-operation AWS call metrics for one invocation
+
+    Args:
+        clock: Monotonic clock function (overridable for tests)
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._depth = 0
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far and restart the invocation clock"""
+        with self._lock:
+            self.operations = {}
+            self._intervals = []
+            self.started = self._clock()
+
+    def attach(self, client):
+        """
+        Record every call made through a boto3 client
+
+        Args:
+            client: boto3 client
+
+        Returns:
+            The same client
+        """
+        events = client.meta.events
+        events.register('before-call', self._before_call, unique_id='chaos-instrumentation-before-call')
+        events.register('after-call', self._after_call, unique_id='chaos-instrumentation-after-call')
+        events.register('after-call-error', self._after_call_error, unique_id='chaos-instrumentation-after-call-error')
+        events.register('needs-retry', self._needs_retry, unique_id='chaos-instrumentation-needs-retry')
+        return client
+
+    def _before_call(self, context=None, **kwargs):
+        if context is not None:
+            context[_STARTED_KEY] = self._clock()
+
+    def _after_call(self, model=None, parsed=None, context=None, **kwargs):
+        parsed = parsed or {}
+        error_code = parsed.get('Error', {}).get('Code')
+        retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+        self._record(model, context, error=bool(error_code), retries=retries)
+
+    def _after_call_error(self, model=None, context=None, **kwargs):
+        self._record(model, context, error=True)
+
+    def _needs_retry(self, response=None, operation=None, **kwargs):
+        # Called once per attempt; returning None leaves the retry decision to botocore
+        if response is None or operation is None:
+            return None
+
+        error_code = (response[1] or {}).get('Error', {}).get('Code')
+
+        if error_code in THROTTLING_ERROR_CODES:
+            with self._lock:
+                self._stats(operation_name(operation))['throttles'] += 1
+
+        return None
+
+    def _stats(self, name):
+        stats = self.operations.get(name)
+
+        if stats is None:
+            stats = self.operations[name] = {
+                'calls': 0,
+                'errors': 0,
+                'retries': 0,
+                'throttles': 0,
+                'totalMs': 0.0,
+                'maxMs': 0.0,
+                'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                'samples': []
+            }
+
+        return stats
+
+    def _record(self, model, context, error=False, retries=0):
+        if model is None:
+            return
+
+        ended = self._clock()
+        started = (context or {}).pop(_STARTED_KEY, ended)
+        latency_ms = (ended - started) * 1000
+
+        with self._lock:
+            stats = self._stats(operation_name(model))
+            stats['calls'] += 1
+            stats['errors'] += int(error)
+            stats['retries'] += retries
+            stats['totalMs'] += latency_ms
+            stats['maxMs'] = max(stats['maxMs'], latency_ms)
+            stats['histogram'][bucket_index(latency_ms)] += 1
+            if len(stats['samples']) < MAX_EMF_VALUES:
+                stats['samples'].append(round(latency_ms, 3))
+            self._intervals.append((started, ended))
+
+    def summary(self):
+        """
+        Summarize the invocation so far
+
+        Returns:
+            dict: invocationMs, awsTimeMs (union of call intervals),
+                  computeTimeMs, totals and per-operation stats
+        """
+        with self._lock:
+            invocation_ms = (self._clock() - self.started) * 1000
+            aws_ms = merged_duration(self._intervals) * 1000
+            operations = {name: dict(stats) for name, stats in self.operations.items()}
+
+        return {
+            'invocationMs': round(invocation_ms, 3),
+            'awsTimeMs': round(aws_ms, 3),
+            'computeTimeMs': round(max(invocation_ms - aws_ms, 0.0), 3),
+            'calls': sum(stats['calls'] for stats in operations.values()),
+            'retries': sum(stats['retries'] for stats in operations.values()),
+            'throttles': sum(stats['throttles'] for stats in operations.values()),
+            'operations': operations
+        }
+
+    def emf_documents(self, function_name):
+        """
+        Build CloudWatch Embedded Metric Format documents for the invocation
+
+        Args:
+            function_name: Value of the FunctionName dimension
+
+        Returns:
+            list: One summary document plus one document per operation
+        """
+        summary = self.summary()
+        timestamp = int(time.time() * 1000)
+
+        documents = [{
+            '_aws': {
+                'Timestamp': timestamp,
+                'CloudWatchMetrics': [{
+                    'Namespace': EMF_NAMESPACE,
+                    'Dimensions': [['FunctionName']],
+                    'Metrics': [
+                        {'Name': 'InvocationTime', 'Unit': 'Milliseconds'},
+                        {'Name': 'AWSTime', 'Unit': 'Milliseconds'},
+                        {'Name': 'ComputeTime', 'Unit': 'Milliseconds'},
+                        {'Name': 'AWSCalls', 'Unit': 'Count'},
+                        {'Name': 'Retries', 'Unit': 'Count'},
+                        {'Name': 'Throttles', 'Unit': 'Count'}
+                    ]
+                }]
+            },
+            'FunctionName': function_name,
+            'InvocationTime': summary['invocationMs'],
+            'AWSTime': summary['awsTimeMs'],
+            'ComputeTime': summary['computeTimeMs'],
+            'AWSCalls': summary['calls'],
+            'Retries': summary['retries'],
+            'Throttles': summary['throttles']
+        }]
+
+        for name, stats in sorted(summary['operations'].items()):
+            documents.append({
+                '_aws': {
+                    'Timestamp': timestamp,
+                    'CloudWatchMetrics': [{
+                        'Namespace': EMF_NAMESPACE,
+                        'Dimensions': [['FunctionName', 'Operation']],
+                        'Metrics': [
+                            {'Name': 'Calls', 'Unit': 'Count'},
+                            {'Name': 'Errors', 'Unit': 'Count'},
+                            {'Name': 'Retries', 'Unit': 'Count'},
+                            {'Name': 'Throttles', 'Unit': 'Count'},
+                            {'Name': 'Latency', 'Unit': 'Milliseconds'}
+                        ]
+                    }]
+                },
+                'FunctionName': function_name,
+                'Operation': name,
+                'Calls': stats['calls'],
+                'Errors': stats['errors'],
+                'Retries': stats['retries'],
+                'Throttles': stats['throttles'],
+                'Latency': stats['samples'],
+                'LatencyTotalMs': round(stats['totalMs'], 3),
+                'LatencyMaxMs': round(stats['maxMs'], 3),
+                'LatencyHistogramMs': histogram_labels(stats['histogram'])
+            })
+
+        return documents
+
+    def enter(self):
+        """Start an invocation; returns True for the outermost one"""
+        with self._lock:
+            self._depth += 1
+            outermost = self._depth == 1
+
+        if outermost:
+            self.reset()
+
+        return outermost
+
+    def exit(self):
+        """Finish an invocation started with enter()"""
+        with self._lock:
+            self._depth -= 1
+
+
+def bucket_index(latency_ms):
+    """Return the histogram bucket of a latency"""
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if latency_ms <= bound:
+            return index
+    return len(LATENCY_BUCKETS_MS)
+
+
+def histogram_labels(counts):
+    """Label histogram counts with their bucket bounds ('<=5', ..., '>10000'), skipping empty buckets"""
+    labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    return {label: count for label, count in zip(labels, counts) if count}
+
+
+def merged_duration(intervals):
+    """Total length covered by possibly overlapping (start, end) intervals"""
+    total = 0.0
+    current_start = current_end = None
+
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+
+    if current_end is not None:
+        total += current_end - current_start
+
+    return total
+
+
+def instrumented(function_name):
+    """
+    Decorate a Lambda handler to report its AWS call metrics
+
+    Nested handler calls (e.g. the experiment runner calling inject-failure)
+    are recorded as part of the outermost invocation.
+
+    Args:
+        function_name: Value of the FunctionName dimension
+
+    Returns:
+        Decorator for lambda_handler(event, context)
+    """
+    def decorate(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            outermost = recorder.enter()
+
+            try:
+                response = handler(event, context)
+            finally:
+                recorder.exit()
+
+            if outermost and isinstance(response, dict):
+                if EMF_LOG_ENABLED:
+                    emit_emf(recorder.emf_documents(function_name))
+                attach_call_summary(response, recorder.summary())
+
+            return response
+
+        return wrapper
+
+    return decorate
+
+
+def attach_call_summary(response, summary, budget_bytes=None):
+    """
+    Attach the invocation totals to a response if they fit the size budget
+
+    Args:
+        response: Handler response (already shaped)
+        summary: CallRecorder.summary() of the invocation
+        budget_bytes: Size budget (defaults to PAYLOAD_SIZE_BUDGET_BYTES)
+
+    Returns:
+        bool: True if the totals were attached
+    """
+    budget = DEFAULT_SIZE_BUDGET_BYTES if budget_bytes is None else budget_bytes
+    totals = {key: value for key, value in summary.items() if key != 'operations'}
+    totals['operations'] = len(summary['operations'])
+
+    if payload_size({**response, 'awsCallMetrics': totals}) > budget:
+        logger.info(f"Response is at the payload size budget ({budget} bytes); not attaching awsCallMetrics")
+        return False
+
+    response['awsCallMetrics'] = totals
+    return True
+
+
+def emit_emf(documents):
+    """Write EMF documents to stdout, one JSON line each (CloudWatch Logs extracts the metrics)"""
+    for document in documents:
+        sys.stdout.write(json.dumps(document, separators=(',', ':')) + '\n')
+    sys.stdout.flush()
+
+
+# Module-level recorder shared by every client built through chaos_common.clients
+recorder = CallRecorder()
@@ -0,0 +1,184 @@
+"""
+Inventory Cache
+
+In-process cache for Auto Scaling Group and EC2 instance state.
+
+Lambda keeps module state alive between invocations of a warm container, so
+repeated target selections and injections against the same Auto Scaling Group
+during a game day can be served from memory instead of the AWS APIs. Entries
+expire after a TTL, the cache is bounded with LRU eviction, and entries can
+declare dependencies so that invalidating an instance (e.g. after it was
+terminated) also drops every Auto Scaling Group entry that lists it.
+
+The cache is per container. An instance terminated by another container (a
+concurrent experiment, or inject-failure running in its own function) is not
+invalidated here and stays in the cached Auto Scaling Group and instance
+entries for up to the TTL. Cached entries therefore never authorize an
+action: inject-failure describes an instance live before terminating it, and
+get-target-instance re-checks the victims it selected from a cached snapshot.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# Cache configuration (overridable through environment variables)
+DEFAULT_TTL_SECONDS = float(os.environ.get('INVENTORY_CACHE_TTL_SECONDS', '30'))
+DEFAULT_MAX_ENTRIES = int(os.environ.get('INVENTORY_CACHE_MAX_ENTRIES', '2048'))
+
+
+# Marker cached for instances known not to carry the ChaosTarget tag. Callers
+# that need the full instance description treat it as a cache miss.
+NOT_A_CHAOS_TARGET = object()
+
+
+def asg_key(asg_name):
+    """Cache key for an Auto Scaling Group description"""
+    return ('asg', asg_name)
+
+
+def instance_key(instance_id):
+    """Cache key for a raw EC2 instance description (DescribeInstances entry)"""
+    return ('instance', instance_id)
+
+
+class InventoryCache:
+    """
+    Thread-safe TTL cache with bounded size and LRU eviction
+
+    Args:
+        ttl_seconds: Time an entry stays valid after it was stored
+        max_entries: Maximum number of entries before the least recently
+                     used entry is evicted
+        clock: Monotonic clock function (overridable for tests)
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value, depends_on)
+        self._dependents = {}  # key -> set of keys that depend on it
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Return a cached value, or default if it is missing or expired
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, depends_on=(), ttl_seconds=None):
+        """
+        Store a value in the cache
+
+        Args:
+            key: Cache key
+            value: Value to store
+            depends_on: Keys whose invalidation must also invalidate this entry
+            ttl_seconds: Optional TTL overriding the cache default
+        """
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            depends_on = frozenset(depends_on)
+            self._entries[key] = (self._clock() + ttl, value, depends_on)
+
+            for dependency in depends_on:
+                self._dependents.setdefault(dependency, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate(self, key):
+        """
+        Drop an entry and every entry that depends on it
+
+        Args:
+            key: Cache key
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            removed = 0
+            pending = [key]
+
+            while pending:
+                current = pending.pop()
+                pending.extend(self._dependents.pop(current, ()))
+                if current in self._entries:
+                    self._remove(current)
+                    removed += 1
+
+            return removed
+
+    def clear(self):
+        """Drop every entry and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return cache statistics for logging"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _remove(self, key):
+        _, _, depends_on = self._entries.pop(key)
+        for dependency in depends_on:
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[dependency]
+
+
+# Module-level cache shared by every handler loaded in the same container
+inventory_cache = InventoryCache()
+
+
+def invalidate_instance(instance_id):
+    """
+    Invalidate a cached instance and every Auto Scaling Group entry listing it
+
+    Args:
+        instance_id: EC2 instance ID
+
+    Returns:
+        int: Number of entries removed
+    """
+    return inventory_cache.invalidate(instance_key(instance_id))
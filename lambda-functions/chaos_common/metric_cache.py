@@ -0,0 +1,177 @@
+"""
+Metric Window Cache
+
+In-process cache of CloudWatch metric series for incremental GetMetricData.
+
+The pre-experiment check, the recovery poll and the post-experiment check
+usually run seconds apart in the same warm container and query the same
+load balancer metrics over overlapping windows. Each series is cached with
+the time it was fetched up to, so the next call only requests datapoints
+newer than that (minus a small overlap that picks up late-arriving data)
+and merges them in. Series are trimmed to the lookback window and the cache
+is bounded with LRU eviction.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+# Cache configuration (overridable through environment variables)
+DEFAULT_MAX_SERIES = int(os.environ.get('METRIC_CACHE_MAX_SERIES', '256'))
+DEFAULT_MAX_POINTS = int(os.environ.get('METRIC_CACHE_MAX_POINTS', '20160'))  # 2 weeks at 1-minute resolution
+REFRESH_OVERLAP_PERIODS = 2  # Trailing periods re-fetched so late datapoints are picked up
+
+
+def metric_key(namespace, metric_name, dimensions, statistic, period):
+    """
+    Cache key for a single CloudWatch metric series
+
+    Args:
+        namespace: CloudWatch namespace
+        metric_name: Name of the metric
+        dimensions: List of {'Name', 'Value'} dictionaries (order does not matter)
+        statistic: Statistic (Average, Sum, p99, etc.)
+        period: Period in seconds
+
+    Returns:
+        tuple: Hashable cache key
+    """
+    dimension_items = tuple(sorted((dimension['Name'], dimension['Value']) for dimension in dimensions))
+    return ('metric', namespace, metric_name, dimension_items, statistic, period)
+
+
+def query_key(query, queries):
+    """
+    Cache key for a GetMetricData query
+
+    Metric math results depend on the other queries of the request, so an
+    expression is keyed by its text plus the keys of every metric it can see.
+
+    Args:
+        query: Query definition (MetricStat or Expression)
+        queries: Every query of the same request
+
+    Returns:
+        tuple: Hashable cache key
+    """
+    if 'MetricStat' in query:
+        stat = query['MetricStat']
+        metric = stat['Metric']
+        return metric_key(
+            metric['Namespace'],
+            metric['MetricName'],
+            metric.get('Dimensions', []),
+            stat['Stat'],
+            stat['Period']
+        )
+
+    inputs = tuple(sorted(
+        (other['Id'], query_key(other, queries)) for other in queries if 'MetricStat' in other
+    ))
+    return ('expression', query['Expression'], query.get('Period'), inputs)
+
+
+class MetricWindowCache:
+    """
+    Thread-safe cache of metric series with bounded size and LRU eviction
+
+    Each entry holds the epoch second the series was fetched up to and its
+    datapoints as a {epoch_second: value} mapping.
+
+    Args:
+        max_series: Maximum number of series before the least recently used
+                    series is evicted
+        max_points: Maximum datapoints kept per series (oldest dropped first)
+    """
+
+    def __init__(self, max_series=DEFAULT_MAX_SERIES, max_points=DEFAULT_MAX_POINTS):
+        self.max_series = max_series
+        self.max_points = max_points
+        self._entries = OrderedDict()  # key -> (fetched_until, {timestamp: value})
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def fetch_start(self, key, window_start, period):
+        """
+        Return the epoch second a fetch for this series needs to start from
+
+        Args:
+            key: Cache key
+            window_start: Epoch second the requested window starts at
+            period: Period of the series in seconds
+
+        Returns:
+            int: window_start on a miss, otherwise the cached fetch end minus
+                 the refresh overlap (never before window_start)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= window_start:
+                self.misses += 1
+                return window_start
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return max(window_start, entry[0] - REFRESH_OVERLAP_PERIODS * period)
+
+    def merge(self, key, timestamps, values, fetched_until, window_start):
+        """
+        Merge freshly fetched datapoints into a series and return the window
+
+        New datapoints replace cached ones with the same timestamp; datapoints
+        older than window_start are dropped.
+
+        Args:
+            key: Cache key
+            timestamps: Epoch-second timestamps of the fetched datapoints
+            values: Values matching timestamps
+            fetched_until: Epoch second the fetch covered up to
+            window_start: Epoch second the requested window starts at
+
+        Returns:
+            tuple: (timestamps, values) of the merged window, oldest first
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            points = entry[1] if entry is not None and entry[0] > window_start else {}
+            points.update(zip(timestamps, values))
+
+            window = sorted(item for item in points.items() if item[0] >= window_start)
+            if self.max_points > 0:
+                window = window[-self.max_points:]
+
+            if self.max_series > 0:
+                self._entries[key] = (fetched_until, dict(window))
+
+                while len(self._entries) > self.max_series:
+                    self._entries.popitem(last=False)
+
+            return [point[0] for point in window], [point[1] for point in window]
+
+    def invalidate(self, key):
+        """Drop a cached series"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        """Drop every series and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return cache statistics for logging"""
+        with self._lock:
+            return {
+                'series': len(self._entries),
+                'points': sum(len(entry[1]) for entry in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Module-level cache shared by every invocation of a warm container
+metric_cache = MetricWindowCache()
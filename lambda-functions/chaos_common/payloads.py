@@ -0,0 +1,241 @@
+"""
+Payloads
+
+Keeps handler responses small enough for the Step Functions state.
+
+Step Functions rejects state payloads over 256 KB, and every state
+transition copies the payload, so large responses (per-target health
+details, full metric series, instance descriptions) are expensive even
+below the limit. Handlers build their full response and pass it through
+shape_payload():
+
+- outputMode 'compact' always returns the compact form built by the
+  handler (counters and the top-N problem entries).
+- A full response larger than the size budget is written to an object
+  store and the compact form carries a 'payloadRef' pointing at it.
+
+The object store is S3 when PAYLOAD_BUCKET is set, or a local directory
+when PAYLOAD_STORE_DIR is set (useful for local runs and tests). Any object
+with the same put/get interface can be installed with set_object_store().
+"""
+
+import os
+import json
+import uuid
+import logging
+from datetime import datetime
+
+logger = logging.getLogger()
+
+OUTPUT_MODES = ('full', 'compact')
+DEFAULT_SIZE_BUDGET_BYTES = int(os.environ.get('PAYLOAD_SIZE_BUDGET_BYTES', str(200 * 1024)))  # Headroom below 256 KB
+DEFAULT_KEY_PREFIX = os.environ.get('PAYLOAD_KEY_PREFIX', 'chaos-payloads/')
+TOP_N_DEFAULT = 10  # Problem entries kept in compact payloads
+
+_object_store = None
+
+
+class S3ObjectStore:
+    """
+    Object store backed by an S3 bucket
+
+    Args:
+        bucket: Bucket name
+        client: S3 client (created on first use if omitted)
+    """
+
+    def __init__(self, bucket, client=None):
+        self.bucket = bucket
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from chaos_common.clients import get_client
+            self._client = get_client('s3')
+        return self._client
+
+    def put(self, key, body):
+        """Store bytes under key and return a reference to them"""
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType='application/json')
+        return {'uri': f"s3://{self.bucket}/{key}", 'bucket': self.bucket, 'key': key}
+
+    def get(self, ref):
+        """Return the bytes a reference points at"""
+        return self.client.get_object(Bucket=ref['bucket'], Key=ref['key'])['Body'].read()
+
+
+class LocalObjectStore:
+    """
+    Object store backed by a local directory (stand-in for S3)
+
+    Args:
+        root: Directory the objects are written to
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def put(self, key, body):
+        """Store bytes under key and return a reference to them"""
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as handle:
+            handle.write(body)
+        return {'uri': f"file://{os.path.abspath(path)}", 'key': key}
+
+    def get(self, ref):
+        """Return the bytes a reference points at"""
+        with open(os.path.join(self.root, ref['key']), 'rb') as handle:
+            return handle.read()
+
+
+def get_object_store():
+    """
+    Return the configured object store, or None if offloading is disabled
+
+    Returns:
+        The installed store, an S3ObjectStore for PAYLOAD_BUCKET, a
+        LocalObjectStore for PAYLOAD_STORE_DIR, or None
+    """
+    global _object_store
+
+    if _object_store is None:
+        if os.environ.get('PAYLOAD_BUCKET'):
+            _object_store = S3ObjectStore(os.environ['PAYLOAD_BUCKET'])
+        elif os.environ.get('PAYLOAD_STORE_DIR'):
+            _object_store = LocalObjectStore(os.environ['PAYLOAD_STORE_DIR'])
+
+    return _object_store
+
+
+def set_object_store(store):
+    """Install the object store used for offloading (None resets to the environment)"""
+    global _object_store
+    _object_store = store
+
+
+def resolve_output_mode(event):
+    """
+    Validate the requested output mode
+
+    Args:
+        event: Lambda event object with optional 'outputMode'
+
+    Returns:
+        str: 'full' or 'compact'
+    """
+    mode = event.get('outputMode', 'full')
+
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"outputMode must be one of {list(OUTPUT_MODES)}")
+
+    return mode
+
+
+def resolve_top_n(event):
+    """
+    Validate the number of problem entries kept in compact payloads
+
+    Args:
+        event: Lambda event object with optional 'topN'
+
+    Returns:
+        int: Number of entries to keep
+    """
+    top_n = event.get('topN', TOP_N_DEFAULT)
+
+    if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 0:
+        raise ValueError("topN must be a non-negative integer")
+
+    return top_n
+
+
+def payload_size(payload):
+    """Return the size in bytes of a payload serialized as JSON"""
+    return len(json.dumps(payload, default=str).encode('utf-8'))
+
+
+def shape_payload(payload, compact, event, name='payload', budget_bytes=None):
+    """
+    Return the payload to hand back to Step Functions
+
+    Args:
+        payload: Full response
+        compact: Function building the compact form from the full response
+        event: Lambda event object ('outputMode', 'topN')
+        name: Name used in the object key (usually the function name)
+        budget_bytes: Size budget (defaults to PAYLOAD_SIZE_BUDGET_BYTES)
+
+    Returns:
+        dict: The full payload, or its compact form with 'payloadRef' set
+              when the full payload was offloaded
+    """
+    budget = DEFAULT_SIZE_BUDGET_BYTES if budget_bytes is None else budget_bytes
+    mode = resolve_output_mode(event)
+    size = payload_size(payload)
+
+    if mode == 'full' and size <= budget:
+        payload['payloadRef'] = None
+        return payload
+
+    result = compact(payload, resolve_top_n(event))
+    result['outputMode'] = 'compact'
+    result['payloadRef'] = None
+
+    if size > budget:
+        result['payloadRef'] = offload_payload(payload, name)
+        result['payloadSizeBytes'] = size
+        logger.info(f"Full payload ({size} bytes) exceeds budget ({budget} bytes); returning compact form")
+
+    return result
+
+
+def offload_payload(payload, name='payload'):
+    """
+    Write a full payload to the object store
+
+    Args:
+        payload: Full response
+        name: Name used in the object key
+
+    Returns:
+        dict: Reference to the stored payload, or None if no store is
+              configured or the write failed
+    """
+    store = get_object_store()
+
+    if store is None:
+        logger.warning("Payload exceeds the size budget but no PAYLOAD_BUCKET is configured; full payload dropped")
+        return None
+
+    key = f"{DEFAULT_KEY_PREFIX}{name}/{datetime.utcnow():%Y/%m/%d}/{uuid.uuid4()}.json"
+    body = json.dumps(payload, default=str).encode('utf-8')
+
+    try:
+        ref = store.put(key, body)
+    except Exception as e:
+        logger.error(f"Failed to offload payload to {key}: {str(e)}")
+        return None
+
+    ref['sizeBytes'] = len(body)
+    logger.info(f"Offloaded full payload to {ref['uri']}")
+    return ref
+
+
+def load_payload(ref):
+    """
+    Read an offloaded payload back
+
+    Args:
+        ref: Reference returned in 'payloadRef'
+
+    Returns:
+        dict: The full payload
+    """
+    store = get_object_store()
+
+    if store is None:
+        raise ValueError("payloadRef given but no PAYLOAD_BUCKET is configured")
+
+    return json.loads(store.get(ref))
@@ -0,0 +1,230 @@
+"""
+Rate Limit
+
+Client-side token buckets shared by every AWS call of an invocation.
+
+A game day that runs many experiments at once multiplies the Describe*,
+DescribeTargetHealth and GetMetricData calls made per second, and EC2,
+ELBv2 and CloudWatch throttle whole accounts, not single callers. Instead
+of letting every experiment retry into the same throttling storm,
+RateLimiter keeps one token bucket per service and makes each HTTP request
+take a token before it is sent. Callers then slow down smoothly when the
+budget is exhausted.
+
+The limiter is attached to boto3 clients through their event system
+(before-send), so retries consume tokens too and handler code does not
+change. Buckets are per process: every experiment run by one invocation
+shares the same budget.
+"""
+
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger()
+
+# Default budgets per service: (requests per second, burst size). EC2 and
+# Auto Scaling describe calls refill at about 20 and 10 requests per second
+# per account; GetMetricData allows 50 and ELBv2 describe calls about 10.
+DEFAULT_RATES = {
+    'ec2': (float(os.environ.get('EC2_API_RATE', '20')), 40),
+    'autoscaling': (float(os.environ.get('AUTOSCALING_API_RATE', '10')), 20),
+    'elbv2': (float(os.environ.get('ELBV2_API_RATE', '10')), 20),
+    'cloudwatch': (float(os.environ.get('CLOUDWATCH_API_RATE', '20')), 40)
+}
+MAX_WAIT_SECONDS = float(os.environ.get('API_RATE_MAX_WAIT_SECONDS', '30'))  # Give up and send after this long
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum number of tokens (burst size)
+        clock: Monotonic clock function (overridable for tests)
+        sleep: Sleep function (overridable for tests)
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'delayed': 0, 'waitedSeconds': 0.0}
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if they are available right now; returns True on success"""
+        with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            self.stats['acquired'] += 1
+            return True
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Take tokens, waiting for the bucket to refill if needed
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum time to wait (None waits as long as needed)
+
+        Returns:
+            float: Seconds spent waiting, or None if the timeout expired
+        """
+        started = self._clock()
+        slept = False
+
+        while True:
+            with self._lock:
+                self._refill()
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    waited = self._clock() - started if slept else 0.0
+                    self.stats['acquired'] += 1
+                    if slept:
+                        self.stats['delayed'] += 1
+                        self.stats['waitedSeconds'] += waited
+                    return waited
+
+                delay = (tokens - self._tokens) / self.rate
+
+            if timeout is not None:
+                remaining = started + timeout - self._clock()
+                if remaining <= 0:
+                    return None
+                delay = min(delay, remaining)
+
+            self._sleep(delay)
+            slept = True
+
+
+class RateLimiter:
+    """
+    One token bucket per AWS service, attachable to boto3 clients
+
+    Args:
+        rates: Mapping of service name ('ec2', 'elbv2', ...) to requests per
+               second or (requests per second, burst size); services not
+               listed use DEFAULT_RATES, unknown services are not limited
+        max_wait_seconds: Longest a request waits for a token before it is
+                          sent anyway (server-side throttling then applies)
+    """
+
+    def __init__(self, rates=None, max_wait_seconds=MAX_WAIT_SECONDS):
+        self.max_wait_seconds = max_wait_seconds
+        self.buckets = {}
+        self.configure(rates)
+
+    def configure(self, rates=None):
+        """
+        Replace the buckets (and reset their counters)
+
+        Attached clients pick up the new buckets with their next request.
+
+        Args:
+            rates: Rate overrides as in the constructor (None restores the defaults)
+        """
+        buckets = {}
+
+        for service, rate in dict(DEFAULT_RATES, **(rates or {})).items():
+            rate, burst = rate if isinstance(rate, (tuple, list)) else (rate, max(rate * 2, 1))
+            buckets[service] = TokenBucket(rate, burst)
+
+        self.buckets = buckets
+
+    def acquire(self, service):
+        """Take one token for service (no-op for services without a bucket)"""
+        bucket = self.buckets.get(service)
+
+        if bucket is None:
+            return 0.0
+
+        waited = bucket.acquire(timeout=self.max_wait_seconds)
+
+        if waited is None:
+            logger.warning(f"{service} API budget exhausted for {self.max_wait_seconds}s, sending request anyway")
+            return self.max_wait_seconds
+
+        return waited
+
+    def attach(self, client):
+        """
+        Make every request of a boto3 client take a token first
+
+        Args:
+            client: boto3 client
+
+        Returns:
+            The same client
+        """
+        service = client.meta.service_model.service_name
+
+        client.meta.events.register(
+            'before-send',
+            lambda **kwargs: self._before_send(service),
+            unique_id=f"chaos-rate-limit-{id(self)}"
+        )
+
+        return client
+
+    def detach(self, client):
+        """Remove the limiter from a boto3 client it was attached to"""
+        client.meta.events.unregister('before-send', unique_id=f"chaos-rate-limit-{id(self)}")
+
+    def _before_send(self, service):
+        # Returning None lets botocore send the request
+        self.acquire(service)
+
+    def stats(self):
+        """Return per-service counters (requests, delayed requests, seconds waited)"""
+        return {
+            service: {
+                'ratePerSecond': bucket.rate,
+                'burst': bucket.capacity,
+                'requests': bucket.stats['acquired'],
+                'delayedRequests': bucket.stats['delayed'],
+                'waitedSeconds': round(bucket.stats['waitedSeconds'], 3)
+            }
+            for service, bucket in self.buckets.items()
+        }
+
+
+def resolve_rate_limits(event):
+    """
+    Validate per-service API rate overrides
+
+    Args:
+        event: Lambda event object with optional 'apiRateLimits', a mapping
+               of service name to requests per second
+
+    Returns:
+        dict: Service name -> requests per second
+    """
+    rates = event.get('apiRateLimits') or {}
+
+    if not isinstance(rates, dict):
+        raise ValueError("apiRateLimits must be an object mapping service name to requests per second")
+
+    for service, rate in rates.items():
+        if service not in DEFAULT_RATES:
+            raise ValueError(f"apiRateLimits: unknown service '{service}' (expected one of {sorted(DEFAULT_RATES)})")
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or rate <= 0:
+            raise ValueError(f"apiRateLimits.{service} must be a positive number")
+
+    return rates
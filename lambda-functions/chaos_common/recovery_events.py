@@ -0,0 +1,398 @@
+"""
+Recovery Events
+
+Auto Scaling lifecycle and EC2 state-change events, recorded so recovery
+can be followed without polling.
+
+The recovery-events function receives these EventBridge events and
+records them here:
+
+- aws.autoscaling "EC2 Instance-launch Lifecycle Action" /
+  "EC2 Instance-terminate Lifecycle Action" (only with lifecycle hooks)
+- aws.autoscaling "EC2 Instance Launch Successful" (StartTime: launch
+  started, EndTime: InService), "EC2 Instance Launch Unsuccessful" and
+  "EC2 Instance Terminate Successful"
+- aws.ec2 "EC2 Instance State-change Notification" (the rule forwards
+  pending and running; other states are recorded if replayed)
+
+Each event becomes a small record. Auto Scaling records are indexed by
+group and EC2 records by instance, so validate-system-health can find the
+replacement of a terminated instance and its launch, running and
+InService times with one or two reads.
+
+The store is a DynamoDB table (string keys 'pk' and 'sk') when
+RECOVERY_EVENTS_TABLE is set, and an in-process MemoryEventStore otherwise.
+The in-process store is enough for local runs, where events are generated
+with the build_*_event() helpers or by benchmarks/fake_aws.py. Any object
+with the same put/query interface can be installed with set_event_store().
+"""
+
+import os
+import json
+import uuid
+import threading
+from datetime import datetime, timezone
+
+AUTOSCALING_SOURCE = 'aws.autoscaling'
+EC2_SOURCE = 'aws.ec2'
+STATE_CHANGE_DETAIL_TYPE = 'EC2 Instance State-change Notification'
+
+# Auto Scaling detail-type -> record kind
+AUTOSCALING_KINDS = {
+    'EC2 Instance-launch Lifecycle Action': 'launching',
+    'EC2 Instance Launch Successful': 'launched',
+    'EC2 Instance Launch Unsuccessful': 'launchFailed',
+    'EC2 Instance-terminate Lifecycle Action': 'terminating',
+    'EC2 Instance Terminate Successful': 'terminated'
+}
+
+RECORD_TTL_SECONDS = int(os.environ.get('RECOVERY_EVENTS_TTL_SECONDS', str(2 * 24 * 3600)))
+
+_event_store = None
+
+
+def parse_time(value):
+    """
+    Parse an event or API timestamp
+
+    Args:
+        value: ISO 8601 string ('Z' suffix or offset; naive values are UTC) or datetime
+
+    Returns:
+        datetime: Timezone-aware UTC datetime
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return parsed.astimezone(timezone.utc)
+
+
+def format_time(value):
+    """Fixed-width UTC timestamp, so stored times sort as strings"""
+    return parse_time(value).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def normalize_event(envelope):
+    """
+    Turn an EventBridge event into a recovery record
+
+    Args:
+        envelope: EventBridge event ('source', 'detail-type', 'time', 'detail')
+
+    Returns:
+        dict: Record (kind, instanceId, autoScalingGroupName, time, ...) or
+              None for events that say nothing about recovery
+    """
+    if not isinstance(envelope, dict) or not isinstance(envelope.get('detail'), dict):
+        raise ValueError("Expected an EventBridge event with a 'detail' object")
+
+    source = envelope.get('source')
+    detail_type = envelope.get('detail-type')
+    detail = envelope['detail']
+    event_time = envelope.get('time')
+
+    if source == EC2_SOURCE and detail_type == STATE_CHANGE_DETAIL_TYPE:
+        if not detail.get('instance-id') or not detail.get('state') or not event_time:
+            raise ValueError("EC2 state-change event needs time, detail.instance-id and detail.state")
+        return {
+            'kind': 'state',
+            'instanceId': detail['instance-id'],
+            'state': detail['state'],
+            'time': format_time(event_time),
+            'eventId': envelope.get('id')
+        }
+
+    if source == AUTOSCALING_SOURCE and detail_type in AUTOSCALING_KINDS:
+        if not detail.get('AutoScalingGroupName') or not detail.get('EC2InstanceId'):
+            raise ValueError(f"{detail_type} event needs detail.AutoScalingGroupName and detail.EC2InstanceId")
+
+        kind = AUTOSCALING_KINDS[detail_type]
+        # Activity events carry their own start and end; lifecycle actions only the event time
+        record_time = detail.get('EndTime') or detail.get('StartTime') or event_time
+        if not record_time:
+            raise ValueError(f"{detail_type} event has no time")
+
+        record = {
+            'kind': kind,
+            'instanceId': detail['EC2InstanceId'],
+            'autoScalingGroupName': detail['AutoScalingGroupName'],
+            'time': format_time(record_time),
+            'eventId': envelope.get('id')
+        }
+        if detail.get('StartTime'):
+            record['startTime'] = format_time(detail['StartTime'])
+        if detail.get('Cause'):
+            record['cause'] = detail['Cause']
+        return record
+
+    return None
+
+
+def record_keys(record):
+    """Partition and sort key of a record"""
+    if record['kind'] == 'state':
+        return f"instance#{record['instanceId']}", f"{record['time']}#{record['state']}"
+    return (
+        f"asg#{record['autoScalingGroupName']}",
+        f"{record['time']}#{record['instanceId']}#{record['kind']}"
+    )
+
+
+class MemoryEventStore:
+    """In-process event store (local runs and tests)"""
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def put(self, record):
+        """Store a record (re-delivered events overwrite themselves)"""
+        pk, sk = record_keys(record)
+        with self._lock:
+            self._items.setdefault(pk, {})[sk] = dict(record)
+
+    def query(self, pk, since=None):
+        """Records of a partition in time order, optionally only from a time on"""
+        with self._lock:
+            items = sorted(self._items.get(pk, {}).items())
+        return [dict(record) for sk, record in items if since is None or sk >= since]
+
+    def clear(self):
+        """Forget every record"""
+        with self._lock:
+            self._items = {}
+
+
+class DynamoDBEventStore:
+    """
+    Event store backed by a DynamoDB table with string keys 'pk' and 'sk'
+
+    Args:
+        table_name: Table name
+        client: DynamoDB client (created on first use if omitted)
+    """
+
+    def __init__(self, table_name, client=None):
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from chaos_common.clients import get_client
+            self._client = get_client('dynamodb', endpoint_url=os.environ.get('RECOVERY_EVENTS_DYNAMODB_ENDPOINT'))
+        return self._client
+
+    def put(self, record):
+        """Store a record (re-delivered events overwrite themselves)"""
+        pk, sk = record_keys(record)
+        expires = int(parse_time(record['time']).timestamp()) + RECORD_TTL_SECONDS
+
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'pk': {'S': pk},
+                'sk': {'S': sk},
+                'record': {'S': json.dumps(record)},
+                'ttl': {'N': str(expires)}
+            }
+        )
+
+    def query(self, pk, since=None):
+        """Records of a partition in time order, optionally only from a time on"""
+        params = {
+            'TableName': self.table_name,
+            'KeyConditionExpression': 'pk = :pk',
+            'ExpressionAttributeValues': {':pk': {'S': pk}},
+            'ConsistentRead': True
+        }
+        if since is not None:
+            params['KeyConditionExpression'] += ' AND sk >= :since'
+            params['ExpressionAttributeValues'][':since'] = {'S': since}
+
+        records = []
+        for page in self.client.get_paginator('query').paginate(**params):
+            records.extend(json.loads(item['record']['S']) for item in page.get('Items', []))
+        return records
+
+
+def get_event_store():
+    """
+    Return the configured event store
+
+    Returns:
+        The installed store, a DynamoDBEventStore for RECOVERY_EVENTS_TABLE,
+        or a MemoryEventStore
+    """
+    global _event_store
+
+    if _event_store is None:
+        if os.environ.get('RECOVERY_EVENTS_TABLE'):
+            _event_store = DynamoDBEventStore(os.environ['RECOVERY_EVENTS_TABLE'])
+        else:
+            _event_store = MemoryEventStore()
+
+    return _event_store
+
+
+def set_event_store(store):
+    """Install the event store (None resets to the environment)"""
+    global _event_store
+    _event_store = store
+
+
+def replacement_timeline(store, asg_name, since, exclude_instance_ids=()):
+    """
+    Summarize what Auto Scaling did in a group since a point in time
+
+    Args:
+        store: Event store
+        asg_name: Auto Scaling Group name
+        since: Time from which events count (e.g. the injection time)
+        exclude_instance_ids: Instances that are not replacements (the victims)
+
+    Returns:
+        dict: replacements (instanceId, launchStartedAt, runningAt,
+              inServiceAt per replacement, in launch order), terminations
+              (instanceId, terminatingAt, terminatedAt), launchFailures and
+              the number of store reads made
+    """
+    excluded = set(exclude_instance_ids or ())
+    records = store.query(f"asg#{asg_name}", format_time(since))
+    reads = 1
+
+    replacements = {}
+    terminations = {}
+    launch_failures = 0
+    # Activity start times are exact; EventBridge event times only have whole seconds
+    activity_started = set()
+
+    for record in records:
+        instance_id = record['instanceId']
+        kind = record['kind']
+
+        if kind in ('terminating', 'terminated'):
+            entry = terminations.setdefault(instance_id, {'instanceId': instance_id, 'terminatingAt': None, 'terminatedAt': None})
+            entry['terminatingAt' if kind == 'terminating' else 'terminatedAt'] = record['time']
+        elif kind == 'launchFailed':
+            launch_failures += 1
+        elif instance_id not in excluded:
+            entry = replacements.setdefault(
+                instance_id, {'instanceId': instance_id, 'launchStartedAt': None, 'runningAt': None, 'inServiceAt': None}
+            )
+            if kind == 'launched' and record.get('startTime'):
+                entry['launchStartedAt'] = record['startTime']
+                activity_started.add(instance_id)
+            elif instance_id not in activity_started:
+                started = record.get('startTime') or record['time']
+                if entry['launchStartedAt'] is None or started < entry['launchStartedAt']:
+                    entry['launchStartedAt'] = started
+            if kind == 'launched':
+                entry['inServiceAt'] = record['time']
+
+    for entry in replacements.values():
+        for record in store.query(f"instance#{entry['instanceId']}"):
+            if record['state'] == 'pending' and entry['instanceId'] not in activity_started \
+                    and record['time'] < entry['launchStartedAt']:
+                entry['launchStartedAt'] = record['time']
+            elif record['state'] == 'running' and entry['runningAt'] is None:
+                entry['runningAt'] = record['time']
+        reads += 1
+
+    return {
+        'replacements': sorted(replacements.values(), key=lambda entry: entry['launchStartedAt']),
+        'terminations': list(terminations.values()),
+        'launchFailures': launch_failures,
+        'storeReads': reads
+    }
+
+
+def build_event(source, detail_type, detail, time=None, resources=None, region='us-east-1', account='123456789012'):
+    """
+    Build an EventBridge event envelope (for local runs and tests)
+
+    Args:
+        source: Event source ('aws.autoscaling', 'aws.ec2')
+        detail_type: Event detail-type
+        detail: Event detail object
+        time: Event time (default now)
+        resources: ARNs the event refers to
+        region: Region of the event
+        account: Account of the event
+
+    Returns:
+        dict: EventBridge event
+    """
+    return {
+        'version': '0',
+        'id': str(uuid.uuid4()),
+        'detail-type': detail_type,
+        'source': source,
+        'account': account,
+        'time': parse_time(time or datetime.now(timezone.utc)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'region': region,
+        'resources': list(resources or []),
+        'detail': detail
+    }
+
+
+def build_autoscaling_event(kind, asg_name, instance_id, start_time=None, end_time=None, cause=None):
+    """
+    Build an Auto Scaling event of a record kind ('launching', 'launched', ...)
+
+    Args:
+        kind: Record kind (a value of AUTOSCALING_KINDS)
+        asg_name: Auto Scaling Group name
+        instance_id: EC2 instance ID
+        start_time: Activity start (launched / launchFailed / terminated)
+        end_time: Activity end, e.g. InService time for 'launched' (default now)
+        cause: Activity cause
+
+    Returns:
+        dict: EventBridge event
+    """
+    detail_type = {value: key for key, value in AUTOSCALING_KINDS.items()}[kind]
+    end_time = format_time(end_time or datetime.now(timezone.utc))
+
+    if kind in ('launching', 'terminating'):
+        transition = 'LAUNCHING' if kind == 'launching' else 'TERMINATING'
+        detail = {
+            'LifecycleActionToken': str(uuid.uuid4()),
+            'AutoScalingGroupName': asg_name,
+            'LifecycleHookName': f"chaos-{kind}",
+            'EC2InstanceId': instance_id,
+            'LifecycleTransition': f"autoscaling:EC2_INSTANCE_{transition}"
+        }
+    else:
+        detail = {
+            'StatusCode': 'Failed' if kind == 'launchFailed' else 'InProgress',
+            'AutoScalingGroupName': asg_name,
+            'ActivityId': str(uuid.uuid4()),
+            'EC2InstanceId': instance_id,
+            'StartTime': format_time(start_time or end_time),
+            'EndTime': end_time,
+            'Cause': cause or '',
+            'Details': {}
+        }
+
+    return build_event(AUTOSCALING_SOURCE, detail_type, detail, time=end_time)
+
+
+def build_state_change_event(instance_id, state, time=None):
+    """
+    Build an EC2 instance state-change event
+
+    Args:
+        instance_id: EC2 instance ID
+        state: New instance state ('pending', 'running', 'terminated', ...)
+        time: Time of the change (default now)
+
+    Returns:
+        dict: EventBridge event
+    """
+    return build_event(EC2_SOURCE, STATE_CHANGE_DETAIL_TYPE, {'instance-id': instance_id, 'state': state}, time=time)
@@ -0,0 +1,278 @@
+"""
+Single Flight
+
+Request coalescing for health probes shared by concurrent experiments.
+
+When several experiments validate the same target group at once, each
+invocation would otherwise run its own DescribeTargetHealth and
+GetMetricData calls. SingleFlight.do() gives every caller asking for the
+same key within a short window one upstream call and a shared result. Keys
+are bucketed by window (key#<time // window>), so a result is never shared
+beyond the window it was computed in:
+
+- Inside a container, threads asking for a key that is already being
+  computed wait for that computation.
+- Across invocations, a DynamoDB table (COALESCE_TABLE) holds short-lived
+  results. The first caller claims the key with a conditional write and
+  becomes the leader; the others poll the item until the leader publishes
+  the result. A leader that dies lets its lease expire and the next caller
+  takes over. The lease should not outlast the caller's own timeout for
+  the upstream call, or waiting callers give up before the leader does.
+
+The store fails open: if the table is missing, throttled or unreachable,
+callers simply run the upstream call themselves. COALESCE_DYNAMODB_ENDPOINT
+points the client at DynamoDB Local for tests.
+"""
+
+import os
+import json
+import time
+import uuid
+import zlib
+import logging
+import threading
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger()
+
+# Coalescing configuration (overridable through environment variables)
+DEFAULT_WINDOW_SECONDS = float(os.environ.get('COALESCE_WINDOW_SECONDS', '10'))  # How long a shared result is reused
+DEFAULT_LEASE_SECONDS = float(os.environ.get('COALESCE_LEASE_SECONDS', '15'))  # How long a leader may take
+POLL_INITIAL_DELAY_SECONDS = 0.05  # First delay while waiting for a leader
+POLL_MAX_DELAY_SECONDS = 0.5  # Upper bound for the wait delay
+
+PENDING = 'PENDING'
+READY = 'READY'
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key
+
+    Args:
+        table_name: DynamoDB table with a string partition key 'pk' (None
+                    disables cross-invocation coalescing)
+        client: DynamoDB client (created on first use if omitted)
+        window_seconds: How long a published result is shared
+        lease_seconds: How long a leader may compute before others take over
+        clock: Wall clock function (overridable for tests)
+        sleep: Sleep function (overridable for tests)
+    """
+
+    def __init__(self, table_name=None, client=None, window_seconds=DEFAULT_WINDOW_SECONDS,
+                 lease_seconds=DEFAULT_LEASE_SECONDS, clock=time.time, sleep=time.sleep):
+        self.table_name = table_name
+        self.window_seconds = window_seconds
+        self.lease_seconds = lease_seconds
+        self._client = client
+        self._clock = clock
+        self._sleep = sleep
+        self._inflight = {}  # key -> (threading.Event, result holder)
+        self._lock = threading.Lock()
+        self.stats = {'leader': 0, 'shared': 0, 'direct': 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from chaos_common.clients import get_client
+            # The store fails open, so a slow table must not hold probes up
+            self._client = get_client(
+                'dynamodb',
+                endpoint_url=os.environ.get('COALESCE_DYNAMODB_ENDPOINT'),
+                retries={'mode': 'adaptive', 'total_max_attempts': 2},
+                read_timeout=2
+            )
+        return self._client
+
+    def do(self, key, function, shareable=None, window_seconds=None, lease_seconds=None):
+        """
+        Run function once for every concurrent caller of the same key
+
+        Args:
+            key: Coalescing key (string), bucketed by the sharing window
+            function: Zero-argument callable producing a JSON-serializable result
+            shareable: Optional predicate; results it rejects (e.g. errors)
+                       are returned to the caller but not shared
+            window_seconds: Optional sharing window overriding the default
+            lease_seconds: Optional leader lease overriding the default
+                           (e.g. the caller's timeout for function)
+
+        Returns:
+            The result computed by this caller or shared by another one
+        """
+        window = self.window_seconds if window_seconds is None else window_seconds
+        lease = self.lease_seconds if lease_seconds is None else lease_seconds
+
+        if window <= 0:
+            self.stats['direct'] += 1
+            return function()
+
+        key = f"{key}#{int(self._clock() // window)}"
+
+        # Threads of this container share one computation per key
+        with self._lock:
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                inflight = (threading.Event(), {})
+                self._inflight[key] = inflight
+
+        done, holder = inflight
+
+        if not leader:
+            done.wait()
+            if 'error' in holder:
+                raise holder['error']
+            self.stats['shared'] += 1
+            return holder['result']
+
+        try:
+            holder['result'] = self._do_shared(key, function, shareable, window, lease)
+            return holder['result']
+        except Exception as e:
+            holder['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+
+    def _do_shared(self, key, function, shareable, window, lease):
+        """Coalesce across invocations through the DynamoDB store"""
+        if not self.table_name:
+            self.stats['direct'] += 1
+            return function()
+
+        owner = str(uuid.uuid4())
+
+        try:
+            role, result = self._claim_or_wait(key, owner, lease)
+        except (ClientError, BotoCoreError) as e:
+            logger.warning(f"Coalescing store unavailable for {key}, querying directly: {str(e)}")
+            role, result = 'direct', None
+
+        self.stats[role] += 1
+
+        if role == 'shared':
+            return result
+
+        if role == 'direct':
+            return function()
+
+        # Leader: run the upstream call and publish the result
+        try:
+            result = function()
+        except Exception:
+            self._release(key, owner)
+            raise
+
+        if shareable is None or shareable(result):
+            self._publish(key, owner, result, window)
+        else:
+            self._release(key, owner)
+
+        return result
+
+    def _claim_or_wait(self, key, owner, lease):
+        """
+        Claim the key or wait for the current leader's result
+
+        Args:
+            key: Coalescing key
+            owner: Unique ID of this caller
+            lease: Seconds a leader may hold the key
+
+        Returns:
+            tuple: ('leader', None), ('shared', result) or ('direct', None)
+                   when no result arrived within one lease
+        """
+        deadline = self._clock() + lease
+        delay = POLL_INITIAL_DELAY_SECONDS
+
+        while True:
+            if self._claim(key, owner, lease):
+                return 'leader', None
+
+            item = self._get(key)
+
+            if item is not None and item['status']['S'] == READY and float(item['expiresAt']['N']) > self._clock():
+                logger.info(f"Coalesced {key}: using shared result")
+                return 'shared', json.loads(zlib.decompress(item['result']['B']))
+
+            if self._clock() >= deadline:
+                logger.warning(f"Coalesced {key}: leader did not publish in time, querying directly")
+                return 'direct', None
+
+            self._sleep(delay)
+            delay = min(delay * 2, POLL_MAX_DELAY_SECONDS)
+
+    def _claim(self, key, owner, lease):
+        """Try to become the leader for key; returns False if someone else holds it"""
+        now = self._clock()
+
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    'pk': {'S': key},
+                    'status': {'S': PENDING},
+                    'owner': {'S': owner},
+                    'expiresAt': {'N': str(round(now + lease, 3))},
+                    'ttl': {'N': str(int(now + lease + 3600))}
+                },
+                ConditionExpression='attribute_not_exists(pk) OR expiresAt < :now',
+                ExpressionAttributeValues={':now': {'N': str(round(now, 3))}}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def _get(self, key):
+        """Read the current item for key (strongly consistent)"""
+        return self.client.get_item(
+            TableName=self.table_name,
+            Key={'pk': {'S': key}},
+            ConsistentRead=True
+        ).get('Item')
+
+    def _publish(self, key, owner, result, window):
+        """Store the leader's result for followers; failures only cost sharing"""
+        now = self._clock()
+
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    'pk': {'S': key},
+                    'status': {'S': READY},
+                    'owner': {'S': owner},
+                    'expiresAt': {'N': str(round(now + window, 3))},
+                    'ttl': {'N': str(int(now + window + 3600))},
+                    'result': {'B': zlib.compress(json.dumps(result, default=str).encode('utf-8'))}
+                },
+                ConditionExpression='#owner = :owner',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':owner': {'S': owner}}
+            )
+        except (ClientError, BotoCoreError, TypeError, ValueError) as e:
+            logger.warning(f"Could not publish coalesced result for {key}: {str(e)}")
+            self._release(key, owner)
+
+    def _release(self, key, owner):
+        """Drop the leader's claim so waiting callers query directly"""
+        try:
+            self.client.delete_item(
+                TableName=self.table_name,
+                Key={'pk': {'S': key}},
+                ConditionExpression='#owner = :owner',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':owner': {'S': owner}}
+            )
+        except (ClientError, BotoCoreError) as e:
+            logger.warning(f"Could not release coalescing claim for {key}: {str(e)}")
+
+
+# Module-level coalescer shared by every invocation of a warm container
+single_flight = SingleFlight(os.environ.get('COALESCE_TABLE'))
@@ -0,0 +1,223 @@
+"""
+Structured Logging
+
+Low-overhead JSON logging shared by the Lambda functions.
+
+Handlers keep using the standard logging module. @logged installs a
+BufferedJsonHandler on the root logger that:
+
+- buffers log records instead of writing each one, and writes them as JSON
+  lines in a single write when the invocation ends (or when the buffer is
+  full, or right away for ERROR records so they survive a crash)
+- also flushes when a record arrives LOG_FLUSH_INTERVAL_SECONDS after the
+  last flush, and polling loops call flush_logs() on every iteration, so a
+  Lambda timeout loses at most a few seconds of records
+- formats records only at flush time: %-style arguments and structured
+  fields (extra=log_fields(...)) are not formatted or serialized when the
+  record is filtered out, and never more than once
+- drops verbose records (extra=verbose_fields(...)) unless the invocation
+  is sampled: LOG_SAMPLE_RATE of invocations (default 0.01), or an event
+  with "verboseLogging": true
+
+Structured fields are serialized at flush time, so pass values that are
+not modified later in the invocation.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+import functools
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '0.01'))  # Share of invocations logging verbose records
+LOG_BUFFER_MAX_RECORDS = int(os.environ.get('LOG_BUFFER_MAX_RECORDS', '500'))  # Flush early beyond this
+LOG_FLUSH_INTERVAL_SECONDS = float(os.environ.get('LOG_FLUSH_INTERVAL_SECONDS', '5'))  # Flush records older than this
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def log_fields(**fields):
+    """Return extra= arguments attaching structured fields to a log record"""
+    return {'fields': fields}
+
+
+def verbose_fields(**fields):
+    """Return extra= arguments for a verbose record, kept only in sampled invocations"""
+    return {'fields': fields, 'verbose': True}
+
+
+class InvocationState:
+    """Per-invocation logging state (function name, request ID, sampling decision)"""
+
+    def __init__(self):
+        self.function_name = None
+        self.request_id = None
+        self.sampled = False
+        self.depth = 0
+        self.lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """Drop verbose records unless the current invocation is sampled"""
+
+    def __init__(self, state):
+        super().__init__()
+        self.state = state
+
+    def filter(self, record):
+        return not getattr(record, 'verbose', False) or self.state.sampled
+
+
+class BufferedJsonHandler(logging.Handler):
+    """
+    Buffer log records and write them as JSON lines in one write per flush
+
+    Args:
+        state: InvocationState added to every record
+        stream: Output stream (default sys.stdout)
+        max_records: Buffered records that trigger an early flush
+        flush_interval: Seconds since the last flush after which a new
+                        record triggers a flush
+    """
+
+    def __init__(self, state, stream=None, max_records=LOG_BUFFER_MAX_RECORDS,
+                 flush_interval=LOG_FLUSH_INTERVAL_SECONDS):
+        super().__init__()
+        self.state = state
+        self.stream = stream
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.addFilter(SamplingFilter(state))
+
+    def emit(self, record):
+        self.buffer.append((record, self.state.function_name, self.state.request_id))
+
+        if record.levelno >= logging.ERROR or len(self.buffer) >= self.max_records \
+                or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            records, self.buffer = self.buffer, []
+            self.last_flush = time.monotonic()
+        finally:
+            self.release()
+
+        if not records:
+            return
+
+        lines = [self.format_record(*entry) for entry in records]
+        stream = self.stream or sys.stdout
+        stream.write('\n'.join(lines) + '\n')
+        stream.flush()
+
+    def format_record(self, record, function_name, request_id):
+        """Serialize one record as a JSON line"""
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'function': function_name,
+            'requestId': request_id
+        }
+
+        entry.update(getattr(record, 'fields', None) or {})
+        entry.update({
+            key: value for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES and key not in ('fields', 'verbose')
+        })
+
+        if record.exc_info:
+            entry['exception'] = logging.Formatter().formatException(record.exc_info)
+
+        try:
+            return json.dumps(entry, default=str)
+        except (TypeError, ValueError) as e:
+            return json.dumps({
+                'timestamp': entry['timestamp'],
+                'level': entry['level'],
+                'message': entry['message'],
+                'serializationError': str(e)
+            })
+
+
+_state = InvocationState()
+_handler = BufferedJsonHandler(_state)
+
+
+def configure():
+    """Route the root logger through the buffered JSON handler (idempotent)"""
+    root = logging.getLogger()
+
+    if _handler in root.handlers:
+        return _handler
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+
+    return _handler
+
+
+def flush_logs():
+    """Write the buffered records now (called by polling loops before sleeping)"""
+    _handler.flush()
+
+
+def should_sample(event):
+    """Decide whether an invocation logs verbose records"""
+    if isinstance(event, dict) and event.get('verboseLogging'):
+        return True
+
+    return random.random() < LOG_SAMPLE_RATE
+
+
+def logged(function_name):
+    """
+    Decorate a Lambda handler to log through the buffered JSON handler
+
+    The buffer is flushed once when the outermost invocation returns;
+    nested handler calls (e.g. from the experiment runner) share it.
+
+    Args:
+        function_name: Value of the 'function' field of every record
+
+    Returns:
+        Decorator for lambda_handler(event, context)
+    """
+    def decorate(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            configure()
+
+            with _state.lock:
+                _state.depth += 1
+                outermost = _state.depth == 1
+
+            if outermost:
+                _state.function_name = function_name
+                _state.request_id = getattr(context, 'aws_request_id', None)
+                _state.sampled = should_sample(event)
+
+            try:
+                return handler(event, context)
+            finally:
+                with _state.lock:
+                    _state.depth -= 1
+                if outermost:
+                    _handler.flush()
+
+        return wrapper
+
+    return decorate
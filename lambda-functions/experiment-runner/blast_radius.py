@@ -0,0 +1,164 @@
+"""
+Blast Radius
+
+Admission control for experiments that run concurrently in one batch.
+
+Every experiment of a batch asks the guard for a victim before it injects.
+The guard only admits a victim when:
+
+- fewer than maxConcurrentPerAz experiments currently hold a victim in
+  the same Availability Zone, across all Auto Scaling Groups
+- one more instance down keeps its Auto Scaling Group within
+  maxPercentDownPerAsg of the desired capacity. Instances that are not
+  InService and Healthy already count as down, as do victims of other
+  experiments that have not released them yet.
+
+Otherwise the experiment waits until another experiment releases its
+victim (or the group's state changes), up to a deadline. An instance is
+only handed out once per batch.
+"""
+
+import math
+import time
+import random
+import asyncio
+import logging
+from collections import Counter
+
+logger = logging.getLogger()
+
+ADMISSION_POLL_SECONDS = 10  # Re-read group state this often while waiting
+
+
+class BlastRadiusError(Exception):
+    """Raised when an experiment cannot be admitted within the limits"""
+
+
+class BlastRadiusGuard:
+    """
+    Hand out victims within per-AZ and per-ASG limits
+
+    Must be created inside the event loop that runs the batch.
+
+    Args:
+        max_concurrent_per_az: Victims held at once per Availability Zone
+        max_percent_down: Maximum share (percent) of an Auto Scaling
+                          Group's desired capacity that may be down
+        poll_seconds: How often waiting experiments re-read group state
+    """
+
+    def __init__(self, max_concurrent_per_az, max_percent_down, poll_seconds=ADMISSION_POLL_SECONDS):
+        self.max_concurrent_per_az = max_concurrent_per_az
+        self.max_percent_down = max_percent_down
+        self.poll_seconds = poll_seconds
+        self._condition = asyncio.Condition()
+        self._reserved = {}  # instance ID -> (ASG name, Availability Zone)
+        self._used = set()  # every instance handed out in this batch
+        self._active_by_az = Counter()
+        self.stats = {
+            'admitted': 0,
+            'waits': 0,
+            'waitedSeconds': 0.0,
+            'peakReserved': 0,
+            'peakPerAz': 0
+        }
+
+    async def acquire(self, asg_name, load_group, deadline):
+        """
+        Wait for and reserve a victim in an Auto Scaling Group
+
+        Args:
+            asg_name: Name of the Auto Scaling Group
+            load_group: Coroutine function taking a 'fresh' flag and
+                        returning (desired capacity, set of InService and
+                        Healthy instance IDs, list of eligible instances)
+            deadline: time.monotonic() value after which to give up
+
+        Returns:
+            tuple: (reserved instance dictionary, seconds spent waiting)
+        """
+        started = time.monotonic()
+        fresh = False
+
+        while True:
+            desired, in_service, candidates = await load_group(fresh)
+
+            async with self._condition:
+                instance, reason = self._choose(asg_name, desired, in_service, candidates)
+
+                if instance is not None:
+                    self._reserve(asg_name, instance)
+                    waited = time.monotonic() - started if fresh else 0.0
+                    if fresh:
+                        self.stats['waits'] += 1
+                        self.stats['waitedSeconds'] += waited
+                    return instance, waited
+
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    raise BlastRadiusError(f"Not admitted before the deadline: {reason}")
+
+                logger.info(f"Waiting for admission in {asg_name}: {reason}")
+
+                try:
+                    await asyncio.wait_for(self._condition.wait(), min(self.poll_seconds, remaining))
+                except asyncio.TimeoutError:
+                    pass
+
+            fresh = True
+
+    async def release(self, instance_id):
+        """Return a victim's slot once its experiment has finished"""
+        async with self._condition:
+            asg_name, availability_zone = self._reserved.pop(instance_id)
+            self._active_by_az[availability_zone] -= 1
+            logger.info(f"Released {instance_id} ({asg_name}, {availability_zone})")
+            self._condition.notify_all()
+
+    def _choose(self, asg_name, desired, in_service, candidates):
+        """Pick an admissible victim; returns (instance, None) or (None, reason)"""
+        allowed_down = math.floor(desired * self.max_percent_down / 100)
+
+        if allowed_down < 1:
+            raise BlastRadiusError(
+                f"maxPercentDownPerAsg={self.max_percent_down}% of {desired} instances in {asg_name} "
+                f"allows no instance to be down"
+            )
+
+        # Victims of this group count as down whether or not they are terminated yet
+        reserved_here = {instance_id for instance_id, (name, _) in self._reserved.items() if name == asg_name}
+        down = max(0, desired - len(in_service - reserved_here))
+
+        if down + 1 > allowed_down:
+            return None, f"{down} of {desired} instances down (limit {allowed_down})"
+
+        eligible = [
+            instance for instance in candidates
+            if instance['InstanceId'] not in self._used
+            and self._active_by_az[instance['AvailabilityZone']] < self.max_concurrent_per_az
+        ]
+
+        if not eligible:
+            return None, f"no eligible instance with a free Availability Zone slot (limit {self.max_concurrent_per_az} per AZ)"
+
+        # Prefer the least loaded Availability Zone
+        least_active = min(self._active_by_az[instance['AvailabilityZone']] for instance in eligible)
+
+        return random.choice([
+            instance for instance in eligible
+            if self._active_by_az[instance['AvailabilityZone']] == least_active
+        ]), None
+
+    def _reserve(self, asg_name, instance):
+        availability_zone = instance['AvailabilityZone']
+
+        self._reserved[instance['InstanceId']] = (asg_name, availability_zone)
+        self._used.add(instance['InstanceId'])
+        self._active_by_az[availability_zone] += 1
+
+        self.stats['admitted'] += 1
+        self.stats['peakReserved'] = max(self.stats['peakReserved'], len(self._reserved))
+        self.stats['peakPerAz'] = max(self.stats['peakPerAz'], self._active_by_az[availability_zone])
+
+        logger.info(f"Admitted {instance['InstanceId']} ({asg_name}, {availability_zone})")
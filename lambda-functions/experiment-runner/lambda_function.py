@@ -0,0 +1,912 @@
+"""
+Experiment Runner Lambda Function
+
+Purpose: Run a complete terminate-and-verify chaos experiment in one invocation
+Input: Auto Scaling Group name, Target Group ARN, optional Load Balancer ARN
+Output: Experiment result with per-phase timings (same statuses as the workflow)
+
+This function is part of the Chaos Engineering Platform. It runs the same
+phases as the Step Functions workflow (select, pre-check, inject, recovery
+poll, post-check) inside one asyncio event loop, reusing the code of the
+get-target-instance, inject-failure and validate-system-health functions.
+Target selection and the pre-experiment check run concurrently. It is meant
+for low-latency experiments where state transitions and extra Lambda cold
+starts would be most of the cost.
+
+Given a list of 'experiments', it runs them as one batch: concurrently,
+under a global concurrency cap, the blast-radius limits of
+blast_radius.BlastRadiusGuard and a shared API rate budget.
+
+With 'loadTest', HTTP load is sent to the application for the whole
+experiment (load_generator.LoadGenerator) to measure the errors and
+latency users see around the injection.
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import importlib
+import importlib.util
+from datetime import datetime
+from functools import partial
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from chaos_common.payloads import shape_payload, resolve_output_mode, resolve_top_n
+from chaos_common.rate_limit import resolve_rate_limits
+from chaos_common.clients import rate_limiter
+from chaos_common.instrumentation import instrumented
+from chaos_common.structured_logging import logged, log_fields, verbose_fields
+from blast_radius import BlastRadiusGuard, BlastRadiusError
+import load_generator
+
+# Configure logging
+logger = logging.getLogger()
+
+# The deployment package carries the other handlers under these module
+# names; locally they are loaded from the sibling function directories.
+FUNCTIONS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FUNCTION_MODULES = {
+    'get_target_instance': 'get-target-instance',
+    'inject_failure': 'inject-failure',
+    'validate_system_health': 'validate-system-health'
+}
+
+
+def load_function_module(module_name):
+    """
+    Import another function's handler module
+
+    Args:
+        module_name: Module name used in the deployment package
+
+    Returns:
+        module: The imported handler module
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    try:
+        return importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        if e.name != module_name:
+            raise
+
+        function_dir = os.path.join(FUNCTIONS_DIR, FUNCTION_MODULES[module_name])
+
+        # Helper modules of the function (e.g. baseline_comparison) must be importable
+        if function_dir not in sys.path:
+            sys.path.append(function_dir)
+
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(function_dir, 'lambda_function.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        return module
+
+
+targets = load_function_module('get_target_instance')
+injector = load_function_module('inject_failure')
+health = load_function_module('validate_system_health')
+
+# Batch mode
+MAX_BATCH_EXPERIMENTS = 100  # Upper bound on experiments per invocation
+MAX_CONCURRENT_EXPERIMENTS = 4  # Default global concurrency cap
+MAX_CONCURRENT_EXPERIMENTS_LIMIT = 32  # Largest accepted concurrency cap
+MAX_CONCURRENT_PER_AZ = 1  # Default victims held at once per Availability Zone
+MAX_PERCENT_DOWN_PER_ASG = 34  # Default share of an ASG's desired capacity that may be down
+ADMISSION_TIMEOUT_SECONDS = 300  # Default time an experiment may wait for admission
+THREADS_PER_EXPERIMENT = 3  # Blocking calls one experiment may have in flight
+# Load test (see load_generator)
+LOAD_TEST_BASELINE_SECONDS = 10  # Default load sent before the injection
+LOAD_TEST_COOLDOWN_SECONDS = 10  # Default load sent after the post-check
+MAX_LOAD_TEST_BASELINE_SECONDS = 120
+MAX_LOAD_TEST_TIMEOUT_SECONDS = 60
+MAX_LOAD_TEST_WINDOW_SECONDS = 300
+
+BATCH_KEYS = [
+    'experiments', 'batchId', 'maxConcurrentExperiments', 'maxConcurrentPerAz',
+    'maxPercentDownPerAsg', 'admissionTimeoutSeconds', 'apiRateLimits'
+]
+
+
+@logged('experiment-runner')
+@instrumented('experiment-runner')
+def lambda_handler(event, context):
+    """
+    Main Lambda handler function
+
+    Args:
+        event: Lambda event object containing:
+            - autoScalingGroupName: Name of the Auto Scaling Group
+            - targetGroupArn: ARN of the target group
+            - loadBalancerArn: ARN of the load balancer (optional, enables
+              CloudWatch metrics and the baseline comparison)
+            - expectedHealthyHosts: Expected number of healthy hosts (optional)
+            - experimentId: Identifier echoed in the result (optional)
+            - dryRun: If true, validate the victim without terminating (optional)
+            - recoveryTimeoutSeconds: Maximum recovery polling time (optional)
+            - pollIntervalSeconds: Delay between recovery polls (optional)
+            - recoveryMode: 'poll' (default) or 'events', which waits for
+              the replacement's launch event before polling (optional)
+            - outputMode: 'full' (default) or 'compact' (optional)
+            - loadTest: HTTP load sent while the experiment runs, with
+              url, requestsPerSecond, connections, timeoutSeconds,
+              method, headers, baselineSeconds, cooldownSeconds and
+              windowSeconds
+              (optional, see resolve_load_test)
+            - experiments: List of experiments to run as one batch
+              (optional, see run_batch; the other keys become defaults
+              for every experiment)
+        context: Lambda context object
+
+    Returns:
+        dict: Experiment result with status, phase results and timings
+    """
+    logger.info("Received event", extra=verbose_fields(event=event))
+
+    try:
+        resolve_output_mode(event)
+        resolve_top_n(event)
+
+        if 'experiments' in event:
+            return shape_payload(run_batch(event, context), compact_batch_result, event, 'experiment-runner')
+
+        if not event.get('autoScalingGroupName'):
+            raise ValueError("Missing required parameter: autoScalingGroupName")
+
+        if not event.get('targetGroupArn'):
+            raise ValueError("Missing required parameter: targetGroupArn")
+
+        # Validate polling options before anything is terminated
+        health.resolve_recovery_timeout(event)
+        health.resolve_poll_interval(event)
+        health.resolve_recovery_mode(event)
+        health.resolve_p99_fail_threshold(event)
+        resolve_load_test(event)
+
+        result = asyncio.run(run_experiment(event, context))
+
+        return shape_payload(result, compact_experiment_result, event, 'experiment-runner')
+
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return {
+            'statusCode': 400,
+            'error': 'ValidationError',
+            'message': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'error': 'InternalError',
+            'message': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+
+async def run_experiment(event, context, guard=None, admission_deadline=None):
+    """
+    Run select -> pre-check -> inject -> recovery poll -> post-check
+
+    Args:
+        event: Lambda event object (see lambda_handler)
+        context: Lambda context object
+        guard: BlastRadiusGuard admitting the victim (batch mode only)
+        admission_deadline: time.monotonic() value after which the guard
+                            gives up waiting for admission
+
+    Returns:
+        dict: Experiment result
+    """
+    if guard is None:
+        return await execute_experiment(event, context)
+
+    # The victim is admitted before the pre-check, so a long admission
+    # wait cannot leave the pre-check stale
+    started = time.perf_counter()
+    result = new_result(event)
+
+    try:
+        selection = await timed_phase(result['phases'], 'select', select_target(
+            event['autoScalingGroupName'], event.get('refreshInventory', False), guard, admission_deadline
+        ))
+    except BlastRadiusError as e:
+        return finish(result, started, 'ABORTED', 'BlastRadiusLimit', f"Chaos experiment not admitted: {e}")
+    except Exception as e:
+        return finish(result, started, 'FAILED', 'TargetSelectionError', f"Failed to select target instance: {e}")
+
+    try:
+        return await execute_experiment(event, context, selection, result, started)
+    finally:
+        await guard.release(selection['instanceId'])
+
+
+def new_result(event):
+    """
+    Start an experiment result
+
+    Args:
+        event: Lambda event object (see lambda_handler)
+
+    Returns:
+        dict: Result skeleton with an empty 'phases' dictionary
+    """
+    return {
+        'statusCode': 200,
+        'experimentId': event.get('experimentId'),
+        'experimentStartTime': datetime.utcnow().isoformat(),
+        'dryRun': event.get('dryRun', False),
+        'phases': {}
+    }
+
+
+async def execute_experiment(event, context, selection=None, result=None, started=None):
+    """
+    Run the experiment phases, selecting a victim unless one is given
+
+    With 'loadTest', the load generator runs from the start until
+    cooldownSeconds after the experiment has finished (right away if
+    nothing was injected), and its report is added as 'loadTest'.
+
+    Args:
+        event: Lambda event object (see lambda_handler)
+        context: Lambda context object
+        selection: Target summary of an already admitted victim (optional)
+        result: Result started by the caller (optional)
+        started: perf_counter value at the start of the experiment (optional)
+
+    Returns:
+        dict: Experiment result
+    """
+    load_test = resolve_load_test(event)
+
+    if load_test is None:
+        return await run_phases(event, context, selection, result, started)
+
+    started = time.perf_counter() if started is None else started
+    result = new_result(event) if result is None else result
+    generator = load_generator.LoadGenerator(**load_test['generator'])
+    load = asyncio.ensure_future(generator.run())
+
+    try:
+        await run_phases(event, context, selection, result, started, load_test['baselineSeconds'])
+        if 'failureInjection' in result:
+            await asyncio.sleep(load_test['cooldownSeconds'])
+        return result
+    finally:
+        generator.stop()
+        await load
+        injection = result.get('failureInjection') or {}
+        result['loadTest'] = generator.report(
+            injection.get('terminationRequestedAt') or injection.get('timestamp'), load_test['windowSeconds']
+        )
+
+
+async def run_phases(event, context, selection=None, result=None, started=None, load_baseline_seconds=None):
+    """
+    Run select -> pre-check -> inject -> recovery poll -> post-check
+
+    Args:
+        event: Lambda event object (see lambda_handler)
+        context: Lambda context object
+        selection: Target summary of an already admitted victim (optional)
+        result: Result started by the caller (optional)
+        started: perf_counter value at the start of the experiment (optional)
+        load_baseline_seconds: Seconds of load test traffic to send before
+                               the injection (optional)
+
+    Returns:
+        dict: Experiment result
+    """
+    asg_name = event['autoScalingGroupName']
+    target_group_arn = event['targetGroupArn']
+    expected_healthy = event.get('expectedHealthyHosts', health.HEALTHY_HOST_THRESHOLD)
+    metric_queries = build_metric_queries(target_group_arn, event.get('loadBalancerArn'))
+    p99_fail_threshold_ms = health.resolve_p99_fail_threshold(event)
+
+    started = time.perf_counter() if started is None else started
+    result = new_result(event) if result is None else result
+    phases = result['phases']
+    pre_check_phase = timed_phase(phases, 'preCheck', run_health_check(
+        target_group_arn, metric_queries, expected_healthy, p99_fail_threshold_ms
+    ))
+
+    # 1. Select the victim and check pre-experiment health at the same time
+    if selection is None:
+        selection, pre_check = await asyncio.gather(
+            timed_phase(phases, 'select', select_target(asg_name, event.get('refreshInventory', False))),
+            pre_check_phase,
+            return_exceptions=True
+        )
+    else:
+        pre_check, = await asyncio.gather(pre_check_phase, return_exceptions=True)
+
+    if isinstance(pre_check, Exception):
+        return finish(result, started, 'FAILED', 'PreCheckError', f"Failed to execute pre-experiment health check: {pre_check}")
+
+    result['preExperimentHealth'] = pre_check
+
+    if not pre_check['healthy']:
+        return finish(result, started, 'ABORTED', 'PreExperimentUnhealthy',
+                      "Chaos experiment aborted. System was not healthy before injection.")
+
+    if isinstance(selection, Exception):
+        return finish(result, started, 'FAILED', 'TargetSelectionError', f"Failed to select target instance: {selection}")
+
+    result['targetInstance'] = selection
+
+    # Let the load test measure normal latency before the fault
+    if load_baseline_seconds:
+        await asyncio.sleep(max(0.0, load_baseline_seconds - (time.perf_counter() - started)))
+
+    # 2. Inject the failure (inject-failure keeps its ChaosTarget safety checks)
+    injection = await timed_phase(phases, 'inject', asyncio.to_thread(
+        injector.lambda_handler,
+        {'instanceId': selection['instanceId'], 'dryRun': event.get('dryRun', False)},
+        None
+    ))
+    result['failureInjection'] = injection
+
+    if injection.get('statusCode') != 200:
+        return finish(result, started, 'FAILED', 'InjectionError', injection.get('message', 'Failed to inject failure'))
+
+    # 3. Poll until the target group has recovered
+    injection_timestamp = injection.get('terminationRequestedAt') or injection.get('timestamp')
+
+    if health.resolve_recovery_mode(event) == 'events':
+        recovery = asyncio.to_thread(
+            health.recover_after_replacement,
+            target_group_arn,
+            asg_name,
+            expected_healthy,
+            health.resolve_recovery_timeout(event, context),
+            health.resolve_poll_interval(event),
+            injection_timestamp,
+            [selection['instanceId']]
+        )
+    else:
+        recovery = asyncio.to_thread(
+            health.poll_for_recovery,
+            target_group_arn,
+            expected_healthy,
+            health.resolve_recovery_timeout(event, context),
+            health.resolve_poll_interval(event),
+            injection_timestamp,
+            [selection['instanceId']],
+            # A dry run leaves target health untouched, so there is no dip to wait for
+            injection.get('action') == 'terminated'
+        )
+
+    result['recovery'] = await timed_phase(phases, 'recovery', recovery)
+    result['recovery'].pop('targetHealth', None)
+
+    # 4. Post-experiment check, compared against the pre-experiment baseline
+    try:
+        post_check = await timed_phase(phases, 'postCheck', run_health_check(
+            target_group_arn, metric_queries, expected_healthy, p99_fail_threshold_ms
+        ))
+    except Exception as e:
+        return finish(result, started, 'FAILED', 'PostCheckError', f"Failed to execute post-experiment health check: {e}")
+
+    if metric_queries:
+        post_check['comparison'] = health.compare_with_baseline(pre_check['metrics'], post_check['metrics'])
+
+    result['postExperimentHealth'] = post_check
+
+    if not post_check['healthy']:
+        return finish(result, started, 'FAILED', 'SystemRecoveryFailure',
+                      "System did not return to healthy state after chaos injection")
+
+    return finish(result, started, 'SUCCESS', None,
+                  "Chaos experiment completed successfully. System demonstrated resilience.")
+
+
+async def timed_phase(phases, name, awaitable):
+    """
+    Await one experiment phase and record its duration
+
+    Args:
+        phases: Dictionary collecting phase timings
+        name: Phase name
+        awaitable: Coroutine or future running the phase
+
+    Returns:
+        The phase result
+    """
+    phase_started = time.perf_counter()
+
+    try:
+        return await awaitable
+    finally:
+        phases[name] = {'durationMs': round((time.perf_counter() - phase_started) * 1000, 1)}
+        logger.info(f"Phase {name} finished in {phases[name]['durationMs']}ms")
+
+
+async def select_target(asg_name, refresh_inventory=False, guard=None, admission_deadline=None):
+    """
+    Pick a random eligible instance, as get-target-instance does
+
+    Args:
+        asg_name: Name of the Auto Scaling Group
+        refresh_inventory: If true, bypass the inventory cache
+        guard: BlastRadiusGuard that must admit the instance (optional)
+        admission_deadline: time.monotonic() value after which the guard
+                            gives up waiting for admission
+
+    Returns:
+        dict: Target summary of the selected instance
+    """
+    if guard is not None:
+        instance, waited = await guard.acquire(
+            asg_name, partial(load_candidates, asg_name, refresh_inventory), admission_deadline
+        )
+        target = targets.build_target_summary(instance)
+        target['admissionWaitSeconds'] = round(waited, 3)
+        return target
+
+    healthy_instances = await asyncio.to_thread(
+        targets.get_healthy_instances, asg_name, not refresh_inventory
+    )
+
+    if not healthy_instances:
+        raise Exception(f"No healthy instances found in Auto Scaling Group: {asg_name}")
+
+    target = targets.build_target_summary(random.choice(healthy_instances))
+    target['totalHealthyInstances'] = len(healthy_instances)
+
+    return target
+
+
+async def load_candidates(asg_name, refresh_inventory, fresh):
+    """
+    Read an Auto Scaling Group's state for the blast-radius guard
+
+    Args:
+        asg_name: Name of the Auto Scaling Group
+        refresh_inventory: If true, bypass the inventory cache
+        fresh: If true, bypass the inventory cache (set while waiting)
+
+    Returns:
+        tuple: (desired capacity, set of InService and Healthy instance
+               IDs, list of eligible chaos target instances)
+    """
+    asg = await asyncio.to_thread(targets.describe_auto_scaling_group, asg_name, not (refresh_inventory or fresh))
+
+    # Served from the description cached just above
+    candidates = await asyncio.to_thread(targets.get_healthy_instances, asg_name, True)
+
+    if not candidates and not fresh:
+        raise Exception(f"No healthy instances found in Auto Scaling Group: {asg_name}")
+
+    in_service = {instance['InstanceId'] for instance in targets.get_in_service_instances(asg)}
+
+    return asg['DesiredCapacity'], in_service, candidates
+
+
+async def run_health_check(target_group_arn, metric_queries, expected_healthy, p99_fail_threshold_ms=None):
+    """
+    Collect target health and CloudWatch metrics concurrently and evaluate them
+
+    Args:
+        target_group_arn: ARN of the target group
+        metric_queries: GetMetricData queries (empty to skip CloudWatch)
+        expected_healthy: Expected number of healthy hosts
+        p99_fail_threshold_ms: Opt-in p99 threshold that fails the check (optional)
+
+    Returns:
+        dict: Health status, metrics, evaluation and summary
+    """
+    probes = [asyncio.to_thread(health.check_target_health, target_group_arn)]
+    if metric_queries:
+        probes.append(asyncio.to_thread(health.get_metric_data_batch, metric_queries))
+
+    results = await asyncio.gather(
+        *(asyncio.wait_for(probe, health.PROBE_TIMEOUT_SECONDS) for probe in probes),
+        return_exceptions=True
+    )
+
+    if isinstance(results[0], Exception):
+        raise results[0]
+
+    metrics = {'targetHealth': results[0]}
+
+    if metric_queries:
+        if isinstance(results[1], Exception):
+            error = str(results[1]) or type(results[1]).__name__
+            metrics.update({
+                query['Id']: {'value': None, 'error': error, 'available': False}
+                for query in metric_queries
+            })
+        else:
+            metrics.update(results[1])
+
+    evaluation = health.evaluate_health(metrics, expected_healthy, p99_fail_threshold_ms)
+
+    return {
+        'healthStatus': 'PASS' if evaluation['healthy'] else 'FAIL',
+        'healthy': evaluation['healthy'],
+        'timestamp': datetime.utcnow().isoformat(),
+        'metrics': metrics,
+        'evaluation': evaluation['evaluation'],
+        'summary': evaluation['summary']
+    }
+
+
+def build_metric_queries(target_group_arn, load_balancer_arn):
+    """
+    Build the CloudWatch queries for the health checks
+
+    Args:
+        target_group_arn: ARN of the target group
+        load_balancer_arn: ARN of the load balancer (optional)
+
+    Returns:
+        list: Query definitions (empty without a load balancer)
+    """
+    if not load_balancer_arn:
+        return []
+
+    tg_name = health.extract_resource_name(target_group_arn, 'targetgroup')
+    lb_name = health.extract_resource_name(load_balancer_arn, 'loadbalancer/app')
+
+    if not (tg_name and lb_name):
+        return []
+
+    return health.build_alb_metric_queries(tg_name, lb_name)
+
+
+def finish(result, started, status, reason, message):
+    """
+    Complete the experiment result
+
+    Args:
+        result: Result dictionary built so far
+        started: perf_counter value at the start of the experiment
+        status: 'SUCCESS', 'FAILED' or 'ABORTED'
+        reason: Failure reason (None on success)
+        message: Human-readable outcome
+
+    Returns:
+        dict: The completed result
+    """
+    result.update({
+        'status': status,
+        'reason': reason,
+        'message': message,
+        'experimentEndTime': datetime.utcnow().isoformat(),
+        'totalDurationMs': round((time.perf_counter() - started) * 1000, 1)
+    })
+
+    log = logger.info if status == 'SUCCESS' else logger.warning
+    log(f"Experiment {status}: {message} ({result['totalDurationMs']}ms)")
+
+    return result
+
+
+def compact_experiment_result(result, top_n):
+    """
+    Build the compact form of an experiment result
+
+    Args:
+        result: Full experiment result
+        top_n: Unhealthy targets kept per health check
+
+    Returns:
+        dict: Result with compact health check metrics
+    """
+    compact = dict(result)
+
+    for name in ('preExperimentHealth', 'postExperimentHealth'):
+        if name in result:
+            compact[name] = {**result[name], 'metrics': health.compact_metrics(result[name]['metrics'], top_n)}
+
+    # Only the seconds with failed requests are kept from the load test timeline
+    if 'loadTest' in result:
+        timeline = result['loadTest']['timeline']
+        compact['loadTest'] = {
+            **result['loadTest'],
+            'timeline': [second for second in timeline if second['errors']],
+            'omittedTimelineSeconds': sum(1 for second in timeline if not second['errors'])
+        }
+
+    return compact
+
+
+def resolve_load_test(event):
+    """
+    Validate the load test options
+
+    Args:
+        event: Lambda event object with optional 'loadTest'
+
+    Returns:
+        dict: LoadGenerator arguments ('generator'), 'baselineSeconds',
+              'cooldownSeconds' and 'windowSeconds', or None without a
+              load test
+    """
+    options = event.get('loadTest')
+
+    if options is None:
+        return None
+
+    if not isinstance(options, dict) or not isinstance(options.get('url'), str):
+        raise ValueError("loadTest must be an object with a url")
+
+    url = urlsplit(options['url'])
+    if url.scheme not in ('http', 'https') or not url.hostname:
+        raise ValueError("loadTest.url must be an http:// or https:// URL")
+
+    def number(key, default, high, allow_zero=False):
+        value = options.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) \
+                or not (0 <= value if allow_zero else 0 < value) or value > high:
+            raise ValueError(f"loadTest.{key} must be a number {'from 0' if allow_zero else 'above 0'} to {high}")
+        return value
+
+    connections = options.get('connections', load_generator.DEFAULT_CONNECTIONS)
+    if isinstance(connections, bool) or not isinstance(connections, int) \
+            or not 1 <= connections <= load_generator.MAX_CONNECTIONS:
+        raise ValueError(f"loadTest.connections must be an integer between 1 and {load_generator.MAX_CONNECTIONS}")
+
+    method = options.get('method', 'GET')
+    if method not in load_generator.HTTP_METHODS:
+        raise ValueError(f"loadTest.method must be one of {', '.join(load_generator.HTTP_METHODS)}")
+
+    headers = options.get('headers', {})
+    if not isinstance(headers, dict) or not all(isinstance(value, str) for value in headers.values()):
+        raise ValueError("loadTest.headers must be an object of strings")
+
+    generator = {
+        'url': options['url'],
+        'requests_per_second': number(
+            'requestsPerSecond', load_generator.DEFAULT_REQUESTS_PER_SECOND, load_generator.MAX_REQUESTS_PER_SECOND
+        ),
+        'connections': connections,
+        'timeout_seconds': number('timeoutSeconds', load_generator.DEFAULT_TIMEOUT_SECONDS, MAX_LOAD_TEST_TIMEOUT_SECONDS),
+        'method': method,
+        'headers': headers
+    }
+
+    return {
+        'generator': generator,
+        'baselineSeconds': number(
+            'baselineSeconds', LOAD_TEST_BASELINE_SECONDS, MAX_LOAD_TEST_BASELINE_SECONDS, allow_zero=True
+        ),
+        'cooldownSeconds': number(
+            'cooldownSeconds', LOAD_TEST_COOLDOWN_SECONDS, MAX_LOAD_TEST_BASELINE_SECONDS, allow_zero=True
+        ),
+        'windowSeconds': int(number('windowSeconds', load_generator.DEFAULT_WINDOW_SECONDS, MAX_LOAD_TEST_WINDOW_SECONDS))
+    }
+
+
+def run_batch(event, context):
+    """
+    Run a batch of experiments concurrently within blast-radius limits
+
+    Args:
+        event: Lambda event object containing:
+            - experiments: List of experiment definitions (same keys as a
+              single experiment; other top-level keys are their defaults)
+            - batchId: Identifier echoed in the result (optional)
+            - maxConcurrentExperiments: Experiments running at once (optional)
+            - maxConcurrentPerAz: Victims held at once per AZ (optional)
+            - maxPercentDownPerAsg: Share of an ASG that may be down (optional)
+            - admissionTimeoutSeconds: Time an experiment may wait for
+              admission (optional)
+            - apiRateLimits: Requests per second per service, e.g.
+              {"ec2": 20, "elbv2": 10} (optional)
+        context: Lambda context object
+
+    Returns:
+        dict: Batch result with one experiment result per definition
+    """
+    experiments = resolve_batch_experiments(event)
+    limits = resolve_batch_limits(event)
+    rates = resolve_rate_limits(event)
+
+    logger.info("Running %d experiments", len(experiments), extra=log_fields(limits=limits))
+
+    return asyncio.run(run_batch_experiments(event, experiments, limits, rates, context))
+
+
+def resolve_batch_experiments(event):
+    """
+    Validate the experiment definitions of a batch
+
+    Args:
+        event: Lambda event object with 'experiments'
+
+    Returns:
+        list: Experiment events with the batch defaults applied
+    """
+    definitions = event['experiments']
+
+    if not isinstance(definitions, list) or not definitions:
+        raise ValueError("experiments must be a non-empty list")
+
+    if len(definitions) > MAX_BATCH_EXPERIMENTS:
+        raise ValueError(f"At most {MAX_BATCH_EXPERIMENTS} experiments are supported per batch")
+
+    defaults = {key: value for key, value in event.items() if key not in BATCH_KEYS}
+    batch_id = event.get('batchId')
+    experiments = []
+
+    for index, definition in enumerate(definitions):
+        if not isinstance(definition, dict):
+            raise ValueError(f"experiments[{index}] must be an object")
+
+        experiment = dict(defaults, **definition)
+
+        for key in ('autoScalingGroupName', 'targetGroupArn'):
+            if not experiment.get(key):
+                raise ValueError(f"experiments[{index}]: missing required parameter: {key}")
+
+        health.resolve_recovery_timeout(experiment)
+        health.resolve_poll_interval(experiment)
+        health.resolve_recovery_mode(experiment)
+        resolve_load_test(experiment)
+
+        if not experiment.get('experimentId') and batch_id:
+            experiment['experimentId'] = f"{batch_id}-{index + 1}"
+
+        experiments.append(experiment)
+
+    return experiments
+
+
+def resolve_batch_limits(event):
+    """
+    Validate the concurrency and blast-radius limits of a batch
+
+    Args:
+        event: Lambda event object
+
+    Returns:
+        dict: maxConcurrentExperiments, maxConcurrentPerAz,
+              maxPercentDownPerAsg and admissionTimeoutSeconds
+    """
+    limits = {
+        'maxConcurrentExperiments': event.get('maxConcurrentExperiments', MAX_CONCURRENT_EXPERIMENTS),
+        'maxConcurrentPerAz': event.get('maxConcurrentPerAz', MAX_CONCURRENT_PER_AZ),
+        'maxPercentDownPerAsg': event.get('maxPercentDownPerAsg', MAX_PERCENT_DOWN_PER_ASG),
+        'admissionTimeoutSeconds': event.get('admissionTimeoutSeconds', ADMISSION_TIMEOUT_SECONDS)
+    }
+
+    for key in ('maxConcurrentExperiments', 'maxConcurrentPerAz'):
+        value = limits[key]
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"{key} must be a positive integer")
+
+    if limits['maxConcurrentExperiments'] > MAX_CONCURRENT_EXPERIMENTS_LIMIT:
+        raise ValueError(f"maxConcurrentExperiments must be at most {MAX_CONCURRENT_EXPERIMENTS_LIMIT}")
+
+    percent = limits['maxPercentDownPerAsg']
+    if isinstance(percent, bool) or not isinstance(percent, (int, float)) or not 0 < percent <= 100:
+        raise ValueError("maxPercentDownPerAsg must be a number in (0, 100]")
+
+    timeout = limits['admissionTimeoutSeconds']
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout < 0:
+        raise ValueError("admissionTimeoutSeconds must be a non-negative number")
+
+    return limits
+
+
+async def run_batch_experiments(event, experiments, limits, rates, context):
+    """
+    Run the experiments of a batch under the concurrency cap
+
+    Args:
+        event: Lambda event object
+        experiments: Experiment events from resolve_batch_experiments
+        limits: Limits from resolve_batch_limits
+        rates: API rate overrides from resolve_rate_limits
+        context: Lambda context object
+
+    Returns:
+        dict: Batch result
+    """
+    started = time.perf_counter()
+    batch_start_time = datetime.utcnow().isoformat()
+
+    # Recovery polls block a thread each for minutes; size the pool for them
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(
+        max_workers=limits['maxConcurrentExperiments'] * THREADS_PER_EXPERIMENT + 4
+    ))
+
+    guard = BlastRadiusGuard(limits['maxConcurrentPerAz'], limits['maxPercentDownPerAsg'])
+    slots = asyncio.Semaphore(limits['maxConcurrentExperiments'])
+    running = {'now': 0, 'peak': 0}
+
+    # Every AWS call of the batch draws from one budget per service
+    rate_limiter.configure(rates)
+
+    async def run_one(experiment):
+        async with slots:
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+            try:
+                return await run_experiment(experiment, context, guard, admission_deadline(experiment, limits, context))
+            finally:
+                running['now'] -= 1
+
+    try:
+        results = await asyncio.gather(*(run_one(experiment) for experiment in experiments), return_exceptions=True)
+        api_usage = rate_limiter.stats()
+    finally:
+        rate_limiter.configure()
+
+    for index, result in enumerate(results):
+        if isinstance(result, Exception):
+            logger.error(f"Experiment {index} raised: {str(result)}")
+            results[index] = finish(new_result(experiments[index]), started, 'FAILED', 'InternalError', str(result))
+
+    statuses = [result['status'] for result in results]
+
+    return {
+        'statusCode': 200,
+        'mode': 'batch',
+        'batchId': event.get('batchId'),
+        'batchStartTime': batch_start_time,
+        'batchEndTime': datetime.utcnow().isoformat(),
+        'totalDurationMs': round((time.perf_counter() - started) * 1000, 1),
+        'limits': limits,
+        'summary': {
+            'total': len(results),
+            'succeeded': statuses.count('SUCCESS'),
+            'failed': statuses.count('FAILED'),
+            'aborted': statuses.count('ABORTED'),
+            'peakConcurrentExperiments': running['peak'],
+            'peakVictimsPerAz': guard.stats['peakPerAz'],
+            'admissionWaits': guard.stats['waits'],
+            'admissionWaitSeconds': round(guard.stats['waitedSeconds'], 3)
+        },
+        'apiUsage': api_usage,
+        'experiments': results
+    }
+
+
+def admission_deadline(experiment, limits, context):
+    """
+    Latest time an experiment may be admitted
+
+    Admission must leave enough Lambda time for the recovery poll and
+    the post-experiment check.
+
+    Args:
+        experiment: Experiment event
+        limits: Limits from resolve_batch_limits
+        context: Lambda context object
+
+    Returns:
+        float: time.monotonic() deadline
+    """
+    wait = limits['admissionTimeoutSeconds']
+
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        reserve = health.resolve_recovery_timeout(experiment) + health.PROBE_TIMEOUT_SECONDS + health.LAMBDA_TIMEOUT_MARGIN_SECONDS
+        wait = min(wait, context.get_remaining_time_in_millis() / 1000 - reserve)
+
+    return time.monotonic() + max(wait, 0)
+
+
+def compact_batch_result(result, top_n):
+    """
+    Build the compact form of a batch result
+
+    Args:
+        result: Full batch result
+        top_n: Unhealthy targets kept per health check
+
+    Returns:
+        dict: Result with every experiment in compact form
+    """
+    return dict(result, experiments=[
+        compact_experiment_result(experiment, top_n) for experiment in result['experiments']
+    ])
@@ -0,0 +1,523 @@
+"""
+Load Generator
+
+HTTP load sent to the application while an experiment runs, to measure the
+errors and latency its users see during the fault. The ALB metrics in
+CloudWatch have 1-minute resolution, so a 20-second error burst during a
+termination barely shows up there.
+
+- Requests are sent at a fixed rate (open loop) over a pool of keep-alive
+  connections, as raw HTTP/1.1 over asyncio streams. Latency is measured
+  from the time a request was due, so requests waiting for a connection
+  count their wait (no coordinated omission).
+- Every request's latency goes into an HDR-style histogram (log-linear
+  buckets, at most 1.6% relative error) for the second it was due in.
+- report() summarizes the run, a per-second timeline and, given the
+  injection timestamp from inject-failure, the window around it: the exact
+  first and last failed request after the injection, and tail latencies
+  before, during and after the error window.
+
+A request fails on a connection error, a timeout or a 5xx status.
+
+Usage against a local server (from lambda-functions/experiment-runner/):
+    python -m http.server 8000 &
+    python load_generator.py http://localhost:8000/ --rate 50 --connections 8 --duration 20
+"""
+
+import ssl
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+logger = logging.getLogger()
+
+DEFAULT_REQUESTS_PER_SECOND = 20
+MAX_REQUESTS_PER_SECOND = 1000
+DEFAULT_CONNECTIONS = 10
+MAX_CONNECTIONS = 256
+DEFAULT_TIMEOUT_SECONDS = 5
+DEFAULT_WINDOW_SECONDS = 30  # Seconds before and after the fault summarized in the injection report
+MAX_DURATION_SECONDS = 900  # Hard stop, the Lambda timeout
+HTTP_METHODS = ('GET', 'HEAD')
+
+SUB_BUCKET_BITS = 7  # 2**7 linear sub-buckets per power of two
+PERCENTILES = [50, 90, 99, 99.9]
+MAX_RESPONSE_HEADER_LINES = 100
+USER_AGENT = 'chaos-platform-load-generator'
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram in microseconds
+
+    Values below 2**SUB_BUCKET_BITS are counted exactly; above, every power
+    of two is split into 2**(SUB_BUCKET_BITS - 1) equal buckets. Only
+    buckets with values are stored.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def bucket_index(value):
+        """Index of the bucket of a non-negative integer value"""
+        if value < 1 << SUB_BUCKET_BITS:
+            return value
+
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return (shift << SUB_BUCKET_BITS - 1) + (value >> shift)
+
+    @staticmethod
+    def bucket_bounds(index):
+        """Lowest and highest value of a bucket"""
+        if index < 1 << SUB_BUCKET_BITS:
+            return index, index
+
+        half = 1 << SUB_BUCKET_BITS - 1
+        shift = index // half - 1
+        mantissa = index - shift * half
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        """Count a latency in microseconds"""
+        value = max(0, int(value))
+        self.counts[self.bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Add the counts of another histogram"""
+        if not other.count:
+            return self
+
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percentile):
+        """Value at a percentile (the highest value of its bucket, at most the maximum)"""
+        if not self.count:
+            return None
+
+        rank = max(1, -(-self.count * percentile // 100))
+        seen = 0
+
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_bounds(index)[1], self.max)
+
+        return self.max
+
+    def summary(self):
+        """Percentiles, mean and maximum in milliseconds"""
+        if not self.count:
+            return {'count': 0}
+
+        summary = {'count': self.count}
+        for percentile in PERCENTILES:
+            summary[f"p{percentile:g}Ms".replace('.', '')] = round(self.percentile(percentile) / 1000, 3)
+        summary['meanMs'] = round(self.total / self.count / 1000, 3)
+        summary['maxMs'] = round(self.max / 1000, 3)
+        return summary
+
+
+class SecondBucket:
+    """Requests that were due within one second of wall time"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.histogram = LatencyHistogram()
+
+
+class HTTPConnection:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class LoadGenerator:
+    """
+    Send HTTP requests at a fixed rate and record their latency and status
+
+    Must be run inside the event loop that awaits run().
+
+    Args:
+        url: http:// or https:// URL requested
+        requests_per_second: Request rate
+        connections: Size of the keep-alive connection pool
+        timeout_seconds: Time a request may take once it has a connection
+        method: 'GET' or 'HEAD'
+        headers: Extra request headers
+        max_duration_seconds: Stop after this long even without stop()
+    """
+
+    def __init__(self, url, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, connections=DEFAULT_CONNECTIONS,
+                 timeout_seconds=DEFAULT_TIMEOUT_SECONDS, method='GET', headers=None,
+                 max_duration_seconds=MAX_DURATION_SECONDS):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Load test URL must be an http:// or https:// URL: {url}")
+
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self.requests_per_second = requests_per_second
+        self.connections = connections
+        self.timeout_seconds = timeout_seconds
+        self.method = method
+        self.max_duration_seconds = max_duration_seconds
+
+        default_port = 443 if parts.scheme == 'https' else 80
+        host_header = self.host if self.port == default_port else f"{self.host}:{self.port}"
+        header_lines = {'Host': host_header, 'User-Agent': USER_AGENT, 'Accept': '*/*', 'Connection': 'keep-alive'}
+        header_lines.update(headers or {})
+        self.request_bytes = (
+            f"{method} {self.target} HTTP/1.1\r\n"
+            + ''.join(f"{name}: {value}\r\n" for name, value in header_lines.items())
+            + "\r\n"
+        ).encode('latin-1')
+
+        # Every request waiting for or holding a connection; beyond this it is dropped
+        self.max_pending = connections + int(requests_per_second * timeout_seconds)
+
+        self.buckets = {}
+        self.failures = []  # (wall time the request was due, reason)
+        self.statuses = Counter()
+        self.error_kinds = Counter()
+        self.dropped = 0
+        self.connections_opened = 0
+        self.started_at = None
+        self.ended_at = None
+        self._stop_requested = False
+        self._stopping = None
+        self._pool = None
+        self._pending = set()
+
+    def stop(self):
+        """Stop sending; run() returns once the requests in flight are done"""
+        self._stop_requested = True
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def run(self):
+        """
+        Send requests until stop() or max_duration_seconds
+
+        Returns:
+            LoadGenerator: self, for report()
+        """
+        self._stopping = asyncio.Event()
+        if self._stop_requested:
+            self._stopping.set()
+        self._pool = asyncio.LifoQueue()
+        for _ in range(self.connections):
+            self._pool.put_nowait(None)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.started_at = time.time()
+        interval = 1.0 / self.requests_per_second
+        sent = 0
+
+        logger.info(
+            f"Load test: {self.requests_per_second} requests/s over {self.connections} connections to {self.url}"
+        )
+
+        try:
+            while not self._stopping.is_set():
+                due = started + sent * interval
+                if due - started >= self.max_duration_seconds:
+                    break
+
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    if self._stopping.is_set():
+                        break
+
+                due_wall = self.started_at + (due - started)
+                sent += 1
+
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    continue
+
+                task = asyncio.ensure_future(self._request(due, due_wall))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+            if self._pending:
+                await asyncio.wait(set(self._pending))
+        finally:
+            self.ended_at = time.time()
+            while not self._pool.empty():
+                connection = self._pool.get_nowait()
+                if connection is not None:
+                    connection.close()
+
+        return self
+
+    async def _request(self, due, due_wall):
+        loop = asyncio.get_running_loop()
+        # Holds the connection in use, also one opened by a request that then timed out
+        slot = [await self._pool.get()]
+        status = None
+        reason = None
+        keep_alive = False
+
+        try:
+            status, keep_alive = await asyncio.wait_for(self._exchange(slot), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            reason = 'timeout'
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            reason = 'connection'
+            logger.debug(f"Load test request failed: {e}")
+        finally:
+            if slot[0] is not None and (reason is not None or not keep_alive):
+                slot[0].close()
+                slot[0] = None
+            self._pool.put_nowait(slot[0])
+
+        if status is not None and status >= 500:
+            reason = 'http5xx'
+        self._record(due_wall, (loop.time() - due) * 1_000_000, status, reason)
+
+    async def _exchange(self, slot):
+        # A kept-alive connection the server closed in the meantime is retried once on a new one
+        for reused in ((True, False) if slot[0] is not None else (False,)):
+            if not reused:
+                if slot[0] is not None:
+                    slot[0].close()
+                    slot[0] = None
+                reader, writer = await asyncio.open_connection(
+                    self.host, self.port, ssl=self.ssl, server_hostname=self.host if self.ssl else None
+                )
+                slot[0] = HTTPConnection(reader, writer)
+                self.connections_opened += 1
+
+            try:
+                slot[0].writer.write(self.request_bytes)
+                await slot[0].writer.drain()
+                return await self._read_response(slot[0].reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not reused:
+                    raise
+
+    async def _read_response(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed before the response')
+
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+        status = int(status)
+        headers = {}
+
+        for _ in range(MAX_RESPONSE_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise ValueError('Too many response headers')
+
+        connection_header = headers.get('connection', '').lower()
+        keep_alive = connection_header != 'close' and (version != 'HTTP/1.0' or connection_header == 'keep-alive')
+
+        if self.method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return status, keep_alive
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip(), 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        else:
+            await reader.read()
+            keep_alive = False
+
+        return status, keep_alive
+
+    def _record(self, due_wall, latency_us, status, reason):
+        bucket = self.buckets.get(int(due_wall))
+        if bucket is None:
+            bucket = self.buckets[int(due_wall)] = SecondBucket()
+
+        bucket.requests += 1
+        bucket.histogram.record(latency_us)
+        self.statuses[str(status) if status is not None else 'none'] += 1
+
+        if reason is not None:
+            bucket.errors += 1
+            self.error_kinds[reason] += 1
+            self.failures.append((due_wall, reason))
+
+    def _histogram(self, start=None, end=None):
+        # Merged histogram of the seconds in [start, end)
+        merged = LatencyHistogram()
+        for second, bucket in self.buckets.items():
+            if (start is None or second >= start) and (end is None or second < end):
+                merged.merge(bucket.histogram)
+        return merged
+
+    def report(self, injection_timestamp=None, window_seconds=DEFAULT_WINDOW_SECONDS):
+        """
+        Summarize the run
+
+        Args:
+            injection_timestamp: ISO timestamp of the failure injection (optional)
+            window_seconds: Seconds before and after the fault summarized
+
+        Returns:
+            dict: Totals, latency percentiles, a per-second timeline and,
+                  with an injection timestamp, the error window and tail
+                  latencies around it
+        """
+        requests = sum(bucket.requests for bucket in self.buckets.values())
+        errors = sum(bucket.errors for bucket in self.buckets.values())
+
+        report = {
+            'url': self.url,
+            'requestsPerSecond': self.requests_per_second,
+            'connections': self.connections,
+            'startedAt': format_time(self.started_at),
+            'endedAt': format_time(self.ended_at),
+            'durationSeconds': round(self.ended_at - self.started_at, 3) if self.started_at and self.ended_at else None,
+            'requests': requests,
+            'errors': errors,
+            'errorRate': round(errors / requests, 4) if requests else None,
+            'dropped': self.dropped,
+            'connectionsOpened': self.connections_opened,
+            'statusCodes': dict(sorted(self.statuses.items())),
+            'errorKinds': dict(self.error_kinds),
+            'latency': self._histogram().summary(),
+            'timeline': [
+                {
+                    'second': format_time(second),
+                    'requests': bucket.requests,
+                    'errors': bucket.errors,
+                    'p50Ms': round(bucket.histogram.percentile(50) / 1000, 3),
+                    'p99Ms': round(bucket.histogram.percentile(99) / 1000, 3),
+                    'maxMs': round(bucket.histogram.max / 1000, 3)
+                }
+                for second, bucket in sorted(self.buckets.items())
+            ]
+        }
+
+        if injection_timestamp:
+            report['injection'] = self.injection_report(injection_timestamp, window_seconds)
+
+        return report
+
+    def injection_report(self, injection_timestamp, window_seconds=DEFAULT_WINDOW_SECONDS):
+        """
+        Describe what users saw around the failure injection
+
+        The error window runs from the first to the last failed request
+        that was due at or after the injection (exact request times).
+        Latency tails are taken from whole seconds: before the injection,
+        during the error window (or window_seconds after the injection
+        without errors), and after it.
+
+        Args:
+            injection_timestamp: ISO timestamp of the failure injection
+            window_seconds: Seconds before and after the fault summarized
+
+        Returns:
+            dict: errorWindow and before / during / after latency summaries
+        """
+        injected = parse_time(injection_timestamp)
+        failures = sorted(due for due, _ in self.failures if due >= injected)
+        error_window = None
+
+        if failures:
+            start, end = failures[0], failures[-1]
+            in_window = sum(
+                bucket.requests for second, bucket in self.buckets.items() if int(start) <= second <= int(end)
+            )
+            error_window = {
+                'start': format_time(start),
+                'end': format_time(end),
+                'durationSeconds': round(end - start, 3),
+                'startAfterInjectionSeconds': round(start - injected, 3),
+                'errors': len(failures),
+                'requests': in_window,
+                'errorRate': round(len(failures) / in_window, 4) if in_window else None
+            }
+            during_start, during_end = int(start), int(end) + 1
+        else:
+            during_start, during_end = int(injected), int(injected) + window_seconds
+
+        return {
+            'injectionTimestamp': format_time(injected),
+            'errorWindow': error_window,
+            'errorsBeforeInjection': len(self.failures) - len(failures),
+            'latencyBefore': self._histogram(int(injected) - window_seconds, int(injected)).summary(),
+            'latencyDuring': self._histogram(during_start, during_end).summary(),
+            'latencyAfter': self._histogram(during_end, during_end + window_seconds).summary()
+        }
+
+
+def parse_time(value):
+    """Epoch seconds of an ISO timestamp (naive values are UTC)"""
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def format_time(value):
+    """ISO timestamp of epoch seconds, with an explicit UTC offset"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Send HTTP load and report latency and errors per second')
+    parser.add_argument('url')
+    parser.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND, help='requests per second')
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS, help='keep-alive connections')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT_SECONDS, help='seconds per request')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of load')
+    parser.add_argument('--method', choices=HTTP_METHODS, default='GET')
+    parser.add_argument('--injection-timestamp', help='ISO timestamp of a failure injection during the run')
+    args = parser.parse_args()
+
+    generator = LoadGenerator(
+        args.url, args.rate, args.connections, args.timeout, args.method, max_duration_seconds=args.duration
+    )
+    asyncio.run(generator.run())
+    print(json.dumps(generator.report(args.injection_timestamp), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,28 +2,53 @@
 Get Target Instance Lambda Function
 
 Purpose: Select a random healthy EC2 instance from an Auto Scaling Group
-Input: Auto Scaling Group name
-Output: Instance ID of a randomly selected healthy instance
+Input: Auto Scaling Group name (or a list of names / selector in fleet mode)
+Output: Instance ID of a randomly selected healthy instance (or the eligible
+        targets of every matched group in fleet mode)
 
 This function is part of the Chaos Engineering Platform and is responsible
 for selecting a victim instance for chaos experiments.
 """
 
-import json
+import math
 import random
-import boto3
 import logging
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
+from chaos_common.inventory_cache import (
+    inventory_cache, asg_key, instance_key, invalidate_instance, NOT_A_CHAOS_TARGET
+)
+from chaos_common.ec2_instances import (
+    CHAOS_TARGET_TAG_KEY, has_chaos_target_tag, verify_and_describe, verify_and_describe_batch
+)
+from chaos_common.payloads import shape_payload, resolve_output_mode, resolve_top_n
+from chaos_common.clients import lazy_client, is_throttling_error
+from chaos_common.instrumentation import instrumented
+from chaos_common.structured_logging import logged, verbose_fields
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-autoscaling = boto3.client('autoscaling')
-ec2 = boto3.client('ec2')
+# AWS clients, built on first use (adaptive retries and shared rate limits, see chaos_common.clients)
+autoscaling = lazy_client('autoscaling')
+ec2 = lazy_client('ec2')
 
+# Chaos target tagging
+CHAOS_TARGET_TAG_VALUES = ['true', 'True', 'TRUE']  # Tag filters are case-sensitive
+INSTANCE_ID_CHUNK_SIZE = 200  # Instance IDs per DescribeInstances filter
 
+# Fleet mode
+ASG_NAMES_BATCH_SIZE = 50  # Group names per DescribeAutoScalingGroups request
+ASG_PAGE_SIZE = 100  # MaxRecords per DescribeAutoScalingGroups page (API maximum)
+FLEET_MAX_WORKERS = 8  # Concurrent DescribeAutoScalingGroups requests
+
+# Multi-victim selection
+AZ_STRATEGIES = ('spread', 'concentrate')
+
+
+@logged('get-target-instance')
+@instrumented('get-target-instance')
 def lambda_handler(event, context):
     """
     Main Lambda handler function
@@ -31,14 +56,31 @@ def lambda_handler(event, context):
     Args:
         event: Lambda event object containing:
             - autoScalingGroupName: Name of the Auto Scaling Group
+            - autoScalingGroupNames: (fleet mode) List of Auto Scaling Group names
+            - autoScalingGroupSelector: (fleet mode) Selector with optional
+              'namePrefix' and 'tags' ({key: value}) entries
+            - refreshInventory: (optional) If true, bypass the warm-container
+              inventory cache
+            - count: (optional) Number of victims to select
+            - percentage: (optional) Percentage of eligible instances to select
+            - azStrategy: (optional) 'spread' (default) or 'concentrate'
+            - availabilityZone: (optional) AZ to concentrate victims in
+            - outputMode: (optional) 'full' (default) or 'compact'
         context: Lambda context object
 
     Returns:
         dict: Response containing selected instance details
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    logger.info("Received event", extra=verbose_fields(event=event))
 
     try:
+        # Reject bad output options before doing any work
+        resolve_output_mode(event)
+        resolve_top_n(event)
+
+        if 'autoScalingGroupNames' in event or 'autoScalingGroupSelector' in event:
+            return shape_payload(select_fleet_targets(event), compact_selection_response, event, 'get-target-instance')
+
         # Extract Auto Scaling Group name from event
         asg_name = event.get('autoScalingGroupName')
 
@@ -48,35 +90,42 @@ def lambda_handler(event, context):
         logger.info(f"Selecting target instance from ASG: {asg_name}")
 
         # Get instances from Auto Scaling Group
-        healthy_instances = get_healthy_instances(asg_name)
+        use_cache = not event.get('refreshInventory', False)
+        healthy_instances = get_healthy_instances(asg_name, use_cache)
 
         if not healthy_instances:
             raise Exception(f"No healthy instances found in Auto Scaling Group: {asg_name}")
 
+        if 'count' in event or 'percentage' in event:
+            return shape_payload(
+                select_multiple_targets(event, asg_name, healthy_instances, use_cache),
+                compact_selection_response,
+                event,
+                'get-target-instance'
+            )
+
         # Select a random instance
-        target_instance = random.choice(healthy_instances)
+        targets, healthy_instances = select_live_targets(
+            lambda instances: [random.choice(instances)], healthy_instances, use_cache
+        )
 
-        # Get additional instance details
-        instance_details = get_instance_details(target_instance['InstanceId'])
+        if not targets:
+            raise Exception(f"No healthy instances found in Auto Scaling Group: {asg_name}")
+
+        target_instance = targets[0]
 
-        # Prepare response
+        # Prepare response (instance details come from the same inventory snapshot used for selection)
         response = {
             'statusCode': 200,
-            'instanceId': target_instance['InstanceId'],
-            'availabilityZone': target_instance['AvailabilityZone'],
-            'healthStatus': target_instance['HealthStatus'],
-            'lifecycleState': target_instance['LifecycleState'],
-            'privateIpAddress': instance_details.get('PrivateIpAddress', 'N/A'),
-            'instanceType': instance_details.get('InstanceType', 'N/A'),
-            'launchTime': instance_details.get('LaunchTime', 'N/A').isoformat() if instance_details.get('LaunchTime') else 'N/A',
+            **build_target_summary(target_instance),
             'totalHealthyInstances': len(healthy_instances),
             'autoScalingGroupName': asg_name,
             'message': f"Selected instance {target_instance['InstanceId']} from {len(healthy_instances)} healthy instances"
         }
 
-        logger.info(f"Successfully selected target instance: {json.dumps(response, default=str)}")
+        logger.info("Successfully selected target instance %s", response['instanceId'], extra=verbose_fields(response=response))
 
-        return response
+        return shape_payload(response, compact_selection_response, event, 'get-target-instance')
 
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -89,8 +138,10 @@ def lambda_handler(event, context):
     except ClientError as e:
         logger.error(f"AWS API error: {str(e)}")
         return {
-            'statusCode': 500,
-            'error': 'AWSError',
+            'statusCode': 429 if is_throttling_error(e) else 500,
+            'error': 'Throttled' if is_throttling_error(e) else 'AWSError',
+            'errorCode': e.response['Error']['Code'],
+            'retryable': is_throttling_error(e),
             'message': f"AWS API error: {e.response['Error']['Message']}"
         }
 
@@ -103,43 +154,459 @@ def lambda_handler(event, context):
         }
 
 
-def get_healthy_instances(asg_name):
+def select_multiple_targets(event, asg_name, healthy_instances, use_cache=True):
     """
-    Retrieve all healthy instances from an Auto Scaling Group
+    Select several victims from one inventory snapshot
 
     Args:
+        event: Lambda event object with 'count' or 'percentage' and an
+               optional 'azStrategy' / 'availabilityZone'
         asg_name: Name of the Auto Scaling Group
+        healthy_instances: Eligible instances returned by get_healthy_instances
+        use_cache: If true, the snapshot may be cached and the selected
+                   victims are re-checked (see select_live_targets)
 
     Returns:
-        list: List of healthy instance dictionaries
+        dict: Response containing the selected targets and their instance IDs
     """
-    try:
-        response = autoscaling.describe_auto_scaling_groups(
-            AutoScalingGroupNames=[asg_name]
+    count = resolve_victim_count(event, len(healthy_instances))
+    az_strategy = event.get('azStrategy', 'spread')
+
+    if az_strategy not in AZ_STRATEGIES:
+        raise ValueError(f"azStrategy must be one of: {', '.join(AZ_STRATEGIES)}")
+
+    if az_strategy == 'spread':
+        select = partial(select_spread_across_azs, count=count)
+    else:
+        select = partial(select_concentrated_in_az, count=count, availability_zone=event.get('availabilityZone'))
+
+    targets, healthy_instances = select_live_targets(select, healthy_instances, use_cache)
+
+    if len(targets) < count:
+        logger.warning(f"Only {len(targets)} of {count} requested victims could be selected")
+
+    az_counts = {}
+    for instance in targets:
+        az_counts[instance['AvailabilityZone']] = az_counts.get(instance['AvailabilityZone'], 0) + 1
+
+    response = {
+        'statusCode': 200,
+        'mode': 'multi',
+        'targets': [build_target_summary(instance) for instance in targets],
+        'instanceIds': [instance['InstanceId'] for instance in targets],
+        'targetCount': len(targets),
+        'azStrategy': az_strategy,
+        'availabilityZones': az_counts,
+        'totalHealthyInstances': len(healthy_instances),
+        'autoScalingGroupName': asg_name,
+        'message': (
+            f"Selected {len(targets)} instances across {len(az_counts)} Availability Zones "
+            f"from {len(healthy_instances)} healthy instances"
         )
+    }
+
+    logger.info(f"Successfully selected {len(targets)} target instances: {response['instanceIds']}")
 
-        if not response['AutoScalingGroups']:
-            raise Exception(f"Auto Scaling Group not found: {asg_name}")
+    return response
 
-        asg = response['AutoScalingGroups'][0]
-        instances = asg.get('Instances', [])
 
-        logger.info(f"Found {len(instances)} total instances in ASG")
+def compact_selection_response(response, top_n):
+    """
+    Build the compact form of a selection response
+
+    Per-instance summaries are replaced by instance IDs, which is all the
+    injection step needs.
+
+    Args:
+        response: Full selection response
+        top_n: Unused (selection responses have no problem entries)
 
-        # Filter for healthy instances that are InService
-        healthy_instances = [
-            instance for instance in instances
-            if instance['HealthStatus'] == 'Healthy'
-            and instance['LifecycleState'] == 'InService'
+    Returns:
+        dict: Compact response
+    """
+    compact = {key: value for key, value in response.items() if key != 'targets'}
+
+    if 'autoScalingGroups' in response:
+        compact['autoScalingGroups'] = [
+            {
+                **{key: value for key, value in group.items() if key != 'eligibleTargets'},
+                'eligibleInstanceIds': [target['instanceId'] for target in group['eligibleTargets']]
+            }
+            for group in response['autoScalingGroups']
         ]
 
-        # Additional safety check: Only select instances tagged as ChaosTarget
-        filtered_instances = []
-        for instance in healthy_instances:
-            if is_chaos_target(instance['InstanceId']):
-                filtered_instances.append(instance)
+    return compact
+
+
+def select_live_targets(select, instances, use_cache=True):
+    """
+    Run a victim selection and re-check the victims without the inventory cache
+
+    A cached snapshot can still list an instance that another container
+    terminated within the cache TTL. Selected victims are therefore described
+    again in one batched call; victims that are no longer running chaos
+    targets are invalidated, dropped from the pool, and the selection runs
+    again on the rest. Snapshots fetched without the cache are used as is.
+
+    Args:
+        select: Function taking the instance pool and returning the victims
+        instances: Eligible instances returned by get_healthy_instances
+        use_cache: If false, the snapshot is already live and is not re-checked
+
+    Returns:
+        tuple: (victims, instances) where instances is the pool without the
+               instances found stale
+    """
+    while instances:
+        targets = select(instances)
+
+        if not use_cache or not targets:
+            return targets, instances
+
+        stale_ids = find_stale_targets([target['InstanceId'] for target in targets])
+
+        if not stale_ids:
+            return targets, instances
+
+        instances = [instance for instance in instances if instance['InstanceId'] not in stale_ids]
+
+    return [], instances
+
+
+def find_stale_targets(instance_ids):
+    """
+    Find the selected instances that are no longer running chaos targets
+
+    Args:
+        instance_ids: List of EC2 instance IDs
+
+    Returns:
+        set: IDs of instances that are gone, not running or no longer tagged
+    """
+    verdicts = verify_and_describe_batch(ec2, instance_ids, use_cache=False)
+    stale_ids = set()
+
+    for instance_id in instance_ids:
+        is_target, instance = verdicts[instance_id]
+        if not is_target or instance.get('State', {}).get('Name') != 'running':
+            stale_ids.add(instance_id)
+            invalidate_instance(instance_id)
+
+    if stale_ids:
+        logger.warning(f"Cached inventory was stale for {len(stale_ids)} selected instances, reselecting: {', '.join(sorted(stale_ids))}")
+
+    return stale_ids
+
+
+def resolve_victim_count(event, total_instances):
+    """
+    Work out how many victims to select from 'count' or 'percentage'
+
+    Args:
+        event: Lambda event object
+        total_instances: Number of eligible instances
+
+    Returns:
+        int: Number of victims, capped at total_instances
+    """
+    if 'count' in event:
+        count = event['count']
+        if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+            raise ValueError("count must be a positive integer")
+    else:
+        percentage = event['percentage']
+        if isinstance(percentage, bool) or not isinstance(percentage, (int, float)) or not 0 < percentage <= 100:
+            raise ValueError("percentage must be a number between 0 (exclusive) and 100")
+        count = max(1, math.ceil(total_instances * percentage / 100))
+
+    if count > total_instances:
+        logger.warning(f"Requested {count} victims but only {total_instances} are eligible")
+        count = total_instances
+
+    return count
+
+
+def group_by_availability_zone(instances):
+    """
+    Group instances by Availability Zone, shuffling each group
+
+    Args:
+        instances: List of instance dictionaries
+
+    Returns:
+        dict: Mapping of Availability Zone to a shuffled list of instances
+    """
+    by_az = {}
+
+    for instance in instances:
+        by_az.setdefault(instance['AvailabilityZone'], []).append(instance)
+
+    for az_instances in by_az.values():
+        random.shuffle(az_instances)
+
+    return by_az
+
+
+def select_spread_across_azs(instances, count):
+    """
+    Select victims round-robin across Availability Zones
+
+    The AZ order is randomised so that repeated experiments do not always
+    start with the same zone.
+
+    Args:
+        instances: List of eligible instance dictionaries
+        count: Number of victims to select
+
+    Returns:
+        list: Selected instance dictionaries
+    """
+    by_az = group_by_availability_zone(instances)
+    az_order = list(by_az)
+    random.shuffle(az_order)
+
+    selected = []
+    while len(selected) < count and az_order:
+        for az in list(az_order):
+            if len(selected) == count:
+                break
+            if by_az[az]:
+                selected.append(by_az[az].pop())
             else:
-                logger.warning(f"Instance {instance['InstanceId']} is not tagged as ChaosTarget, skipping")
+                az_order.remove(az)
+
+    return selected
+
+
+def select_concentrated_in_az(instances, count, availability_zone=None):
+    """
+    Select victims from a single Availability Zone
+
+    Args:
+        instances: List of eligible instance dictionaries
+        count: Number of victims to select
+        availability_zone: AZ to use; defaults to the AZ with the most
+                           eligible instances
+
+    Returns:
+        list: Selected instance dictionaries (fewer than count if the AZ is too small)
+    """
+    by_az = group_by_availability_zone(instances)
+
+    if availability_zone is None:
+        availability_zone = max(by_az, key=lambda az: len(by_az[az]))
+    elif availability_zone not in by_az:
+        raise ValueError(f"No eligible instances in Availability Zone: {availability_zone}")
+
+    return by_az[availability_zone][:count]
+
+
+def select_fleet_targets(event):
+    """
+    Return the eligible chaos targets of many Auto Scaling Groups in one response
+
+    Groups are resolved either from an explicit list of names or from a
+    tag/name-prefix selector, and the instance inventory of the whole fleet is
+    fetched in a single batched pass.
+
+    Args:
+        event: Lambda event object with 'autoScalingGroupNames' or
+               'autoScalingGroupSelector'
+
+    Returns:
+        dict: Response containing the eligible targets for every group
+    """
+    asg_names = event.get('autoScalingGroupNames')
+    selector = event.get('autoScalingGroupSelector')
+    use_cache = not event.get('refreshInventory', False)
+
+    if asg_names is not None:
+        if not isinstance(asg_names, list) or not asg_names:
+            raise ValueError("autoScalingGroupNames must be a non-empty list")
+        asg_names = list(dict.fromkeys(asg_names))
+        groups = describe_auto_scaling_groups_by_name(asg_names, use_cache)
+        found_names = {asg['AutoScalingGroupName'] for asg in groups}
+        missing_groups = [name for name in asg_names if name not in found_names]
+    else:
+        if not isinstance(selector, dict) or not (selector.get('namePrefix') or selector.get('tags')):
+            raise ValueError("autoScalingGroupSelector requires 'namePrefix' and/or 'tags'")
+        groups = describe_auto_scaling_groups_by_selector(selector)
+        missing_groups = []
+
+    logger.info(f"Fleet mode: selecting targets from {len(groups)} Auto Scaling Groups")
+
+    # One inventory snapshot for the whole fleet
+    healthy_by_group = {asg['AutoScalingGroupName']: get_in_service_instances(asg) for asg in groups}
+    inventory = get_chaos_target_inventory([
+        instance['InstanceId']
+        for instances in healthy_by_group.values()
+        for instance in instances
+    ], use_cache)
+
+    group_results = []
+    total_eligible = 0
+
+    for asg in groups:
+        asg_name = asg['AutoScalingGroupName']
+        eligible_instances = filter_chaos_targets(healthy_by_group[asg_name], inventory)
+        total_eligible += len(eligible_instances)
+
+        group_results.append({
+            'autoScalingGroupName': asg_name,
+            'totalInstances': len(asg.get('Instances', [])),
+            'totalHealthyInstances': len(eligible_instances),
+            'eligibleTargets': [build_target_summary(instance) for instance in eligible_instances]
+        })
+
+    return {
+        'statusCode': 200,
+        'mode': 'fleet',
+        'autoScalingGroups': group_results,
+        'totalGroups': len(group_results),
+        'totalEligibleTargets': total_eligible,
+        'missingGroups': missing_groups,
+        'message': f"Found {total_eligible} eligible targets across {len(group_results)} Auto Scaling Groups"
+    }
+
+
+def describe_auto_scaling_groups_by_name(asg_names, use_cache=True):
+    """
+    Describe many Auto Scaling Groups, fetching name batches concurrently
+
+    Args:
+        asg_names: List of Auto Scaling Group names
+        use_cache: If true, serve groups from the inventory cache when possible
+
+    Returns:
+        list: Auto Scaling Group dictionaries, in the order of asg_names
+    """
+    groups_by_name = {}
+
+    if use_cache:
+        for name in asg_names:
+            asg = inventory_cache.get(asg_key(name))
+            if asg is not None:
+                groups_by_name[name] = asg
+
+    missing_names = [name for name in asg_names if name not in groups_by_name]
+    batches = [
+        missing_names[start:start + ASG_NAMES_BATCH_SIZE]
+        for start in range(0, len(missing_names), ASG_NAMES_BATCH_SIZE)
+    ]
+
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(FLEET_MAX_WORKERS, len(batches))) as executor:
+            results = list(executor.map(
+                lambda batch: paginate_auto_scaling_groups(AutoScalingGroupNames=batch),
+                batches
+            ))
+
+        for groups in results:
+            for asg in groups:
+                groups_by_name[asg['AutoScalingGroupName']] = asg
+
+    return [groups_by_name[name] for name in asg_names if name in groups_by_name]
+
+
+def describe_auto_scaling_groups_by_selector(selector):
+    """
+    Describe the Auto Scaling Groups matching a tag and/or name-prefix selector
+
+    Tag conditions are evaluated server-side with DescribeAutoScalingGroups
+    filters; the name prefix is applied to the returned pages.
+
+    Args:
+        selector: Dictionary with optional 'namePrefix' and 'tags' ({key: value})
+
+    Returns:
+        list: Matching Auto Scaling Group dictionaries
+    """
+    name_prefix = selector.get('namePrefix')
+    tags = selector.get('tags') or {}
+
+    params = {}
+    if tags:
+        params['Filters'] = [
+            {'Name': f'tag:{key}', 'Values': value if isinstance(value, list) else [value]}
+            for key, value in tags.items()
+        ]
+
+    groups = paginate_auto_scaling_groups(**params)
+
+    if name_prefix:
+        groups = [asg for asg in groups if asg['AutoScalingGroupName'].startswith(name_prefix)]
+
+    return groups
+
+
+def paginate_auto_scaling_groups(**params):
+    """
+    Page through DescribeAutoScalingGroups
+
+    Args:
+        **params: DescribeAutoScalingGroups request parameters
+
+    Returns:
+        list: Auto Scaling Group dictionaries from every page
+    """
+    paginator = autoscaling.get_paginator('describe_auto_scaling_groups')
+    groups = []
+
+    for page in paginator.paginate(PaginationConfig={'PageSize': ASG_PAGE_SIZE}, **params):
+        for asg in page.get('AutoScalingGroups', []):
+            cache_auto_scaling_group(asg)
+            groups.append(asg)
+
+    return groups
+
+
+def cache_auto_scaling_group(asg):
+    """
+    Store an Auto Scaling Group description in the inventory cache
+
+    The entry depends on its instances, so terminating any of them
+    invalidates the group as well.
+
+    Args:
+        asg: Auto Scaling Group dictionary from DescribeAutoScalingGroups
+    """
+    inventory_cache.put(
+        asg_key(asg['AutoScalingGroupName']),
+        asg,
+        depends_on=[instance_key(instance['InstanceId']) for instance in asg.get('Instances', [])]
+    )
+
+
+def get_healthy_instances(asg_name, use_cache=True):
+    """
+    Retrieve all healthy instances from an Auto Scaling Group
+
+    Tag verification and instance details come from a single inventory
+    snapshot (see get_chaos_target_inventory), so the number of EC2 API
+    calls grows with result pages rather than with instances.
+
+    Args:
+        asg_name: Name of the Auto Scaling Group
+        use_cache: If true, serve the group and its instances from the
+                   inventory cache when possible
+
+    Returns:
+        list: List of healthy instance dictionaries, each carrying its
+              EC2 details under 'InstanceDetails'
+    """
+    try:
+        asg = describe_auto_scaling_group(asg_name, use_cache)
+
+        logger.info(f"Found {len(asg.get('Instances', []))} total instances in ASG")
+
+        healthy_instances = get_in_service_instances(asg)
+
+        # Additional safety check: Only select instances tagged as ChaosTarget
+        inventory = get_chaos_target_inventory(
+            [instance['InstanceId'] for instance in healthy_instances], use_cache
+        )
+
+        filtered_instances = filter_chaos_targets(healthy_instances, inventory)
 
         logger.info(f"Found {len(filtered_instances)} healthy instances eligible for chaos experiments")
 
@@ -150,6 +617,172 @@ def get_healthy_instances(asg_name):
         raise
 
 
+def describe_auto_scaling_group(asg_name, use_cache=True):
+    """
+    Describe one Auto Scaling Group, from the inventory cache when possible
+
+    Args:
+        asg_name: Name of the Auto Scaling Group
+        use_cache: If true, serve the description from the inventory cache
+
+    Returns:
+        dict: Auto Scaling Group dictionary from DescribeAutoScalingGroups
+    """
+    asg = inventory_cache.get(asg_key(asg_name)) if use_cache else None
+
+    if asg is not None:
+        logger.info(f"Using cached Auto Scaling Group description for {asg_name}")
+        return asg
+
+    response = autoscaling.describe_auto_scaling_groups(
+        AutoScalingGroupNames=[asg_name]
+    )
+
+    if not response['AutoScalingGroups']:
+        raise Exception(f"Auto Scaling Group not found: {asg_name}")
+
+    asg = response['AutoScalingGroups'][0]
+    cache_auto_scaling_group(asg)
+
+    return asg
+
+
+def get_in_service_instances(asg):
+    """
+    Filter an Auto Scaling Group's instances for healthy, InService instances
+
+    Args:
+        asg: Auto Scaling Group dictionary from DescribeAutoScalingGroups
+
+    Returns:
+        list: List of healthy instance dictionaries
+    """
+    return [
+        instance for instance in asg.get('Instances', [])
+        if instance['HealthStatus'] == 'Healthy'
+        and instance['LifecycleState'] == 'InService'
+    ]
+
+
+def filter_chaos_targets(instances, inventory):
+    """
+    Keep only the instances present in a chaos target inventory snapshot
+
+    Args:
+        instances: List of Auto Scaling Group instance dictionaries
+        inventory: Mapping of instance ID to instance details
+
+    Returns:
+        list: Instance dictionaries carrying their EC2 details under 'InstanceDetails'
+    """
+    filtered_instances = []
+    skipped_instances = []
+
+    for instance in instances:
+        details = inventory.get(instance['InstanceId'])
+        if details is None:
+            skipped_instances.append(instance['InstanceId'])
+            continue
+        filtered_instances.append(dict(instance, InstanceDetails=details))
+
+    if skipped_instances:
+        logger.warning(
+            f"{len(skipped_instances)} instances are not tagged as ChaosTarget, skipping: "
+            f"{', '.join(skipped_instances[:10])}{' ...' if len(skipped_instances) > 10 else ''}"
+        )
+
+    return filtered_instances
+
+
+def build_target_summary(instance):
+    """
+    Build the response fields describing a selected target instance
+
+    Args:
+        instance: Instance dictionary returned by filter_chaos_targets
+
+    Returns:
+        dict: Target instance fields
+    """
+    instance_details = instance.get('InstanceDetails', {})
+
+    return {
+        'instanceId': instance['InstanceId'],
+        'availabilityZone': instance['AvailabilityZone'],
+        'healthStatus': instance['HealthStatus'],
+        'lifecycleState': instance['LifecycleState'],
+        'privateIpAddress': instance_details.get('PrivateIpAddress', 'N/A'),
+        'instanceType': instance_details.get('InstanceType', 'N/A'),
+        'launchTime': instance_details.get('LaunchTime', 'N/A').isoformat() if instance_details.get('LaunchTime') else 'N/A'
+    }
+
+
+def get_chaos_target_inventory(instance_ids, use_cache=True):
+    """
+    Fetch an inventory snapshot of the given instances that are tagged as chaos targets
+
+    Instance IDs are sent as an instance-id filter in chunks of
+    INSTANCE_ID_CHUNK_SIZE together with a tag:ChaosTarget filter, and every
+    chunk is paginated, so EC2 only returns the instances that are eligible.
+    An instance that no longer exists is simply absent from the result
+    instead of failing the whole chunk with InvalidInstanceID.NotFound. Instances already present in the
+    inventory cache (tagged or known to be untagged) are not fetched again.
+
+    Args:
+        instance_ids: List of EC2 instance IDs
+        use_cache: If true, serve instances from the inventory cache when possible
+
+    Returns:
+        dict: Mapping of instance ID to instance details for tagged instances
+    """
+    inventory = {}
+    missing_ids = []
+
+    for instance_id in instance_ids:
+        cached = inventory_cache.get(instance_key(instance_id)) if use_cache else None
+        if cached is None:
+            missing_ids.append(instance_id)
+        elif cached is not NOT_A_CHAOS_TARGET and has_chaos_target_tag(cached):
+            inventory[instance_id] = extract_instance_details(cached)
+
+    if not missing_ids:
+        return inventory
+
+    paginator = ec2.get_paginator('describe_instances')
+    api_calls = 0
+    fetched_ids = set()
+
+    for start in range(0, len(missing_ids), INSTANCE_ID_CHUNK_SIZE):
+        chunk = missing_ids[start:start + INSTANCE_ID_CHUNK_SIZE]
+
+        pages = paginator.paginate(Filters=[
+            {'Name': 'instance-id', 'Values': chunk},
+            {'Name': f'tag:{CHAOS_TARGET_TAG_KEY}', 'Values': CHAOS_TARGET_TAG_VALUES}
+        ])
+
+        for page in pages:
+            api_calls += 1
+            for reservation in page.get('Reservations', []):
+                for instance in reservation.get('Instances', []):
+                    # The tag filter is case-sensitive, so re-check the value the same way as before
+                    if has_chaos_target_tag(instance):
+                        fetched_ids.add(instance['InstanceId'])
+                        inventory_cache.put(instance_key(instance['InstanceId']), instance)
+                        inventory[instance['InstanceId']] = extract_instance_details(instance)
+
+    # Remember the instances the tag filter excluded
+    for instance_id in missing_ids:
+        if instance_id not in fetched_ids:
+            inventory_cache.put(instance_key(instance_id), NOT_A_CHAOS_TARGET)
+
+    logger.info(
+        f"Inventory snapshot: {len(inventory)} of {len(instance_ids)} instances tagged as "
+        f"ChaosTarget ({len(instance_ids) - len(missing_ids)} cached, {api_calls} DescribeInstances calls)"
+    )
+
+    return inventory
+
+
 def is_chaos_target(instance_id):
     """
     Check if an instance is tagged as a chaos target
@@ -161,22 +794,12 @@ def is_chaos_target(instance_id):
         bool: True if instance is tagged with ChaosTarget=true
     """
     try:
-        response = ec2.describe_instances(InstanceIds=[instance_id])
-
-        if not response['Reservations']:
-            return False
-
-        instance = response['Reservations'][0]['Instances'][0]
-        tags = instance.get('Tags', [])
-
-        # Check for ChaosTarget tag
-        for tag in tags:
-            if tag['Key'] == 'ChaosTarget' and tag['Value'].lower() == 'true':
-                return True
-
-        return False
+        is_target, _ = verify_and_describe(ec2, instance_id)
+        return is_target
 
     except ClientError as e:
+        if is_throttling_error(e):
+            raise
         logger.error(f"Error checking instance tags: {str(e)}")
         return False
 
@@ -192,23 +815,36 @@ def get_instance_details(instance_id):
         dict: Instance details
     """
     try:
-        response = ec2.describe_instances(InstanceIds=[instance_id])
+        _, instance = verify_and_describe(ec2, instance_id)
 
-        if not response['Reservations']:
+        if instance is None:
             return {}
 
-        instance = response['Reservations'][0]['Instances'][0]
-
-        return {
-            'InstanceType': instance.get('InstanceType'),
-            'PrivateIpAddress': instance.get('PrivateIpAddress'),
-            'PublicIpAddress': instance.get('PublicIpAddress'),
-            'LaunchTime': instance.get('LaunchTime'),
-            'State': instance.get('State', {}).get('Name'),
-            'SubnetId': instance.get('SubnetId'),
-            'VpcId': instance.get('VpcId')
-        }
+        return extract_instance_details(instance)
 
     except ClientError as e:
+        if is_throttling_error(e):
+            raise
         logger.error(f"Error retrieving instance details: {str(e)}")
         return {}
+
+
+def extract_instance_details(instance):
+    """
+    Build the instance details dictionary from a DescribeInstances entry
+
+    Args:
+        instance: Instance dictionary from DescribeInstances
+
+    Returns:
+        dict: Instance details
+    """
+    return {
+        'InstanceType': instance.get('InstanceType'),
+        'PrivateIpAddress': instance.get('PrivateIpAddress'),
+        'PublicIpAddress': instance.get('PublicIpAddress'),
+        'LaunchTime': instance.get('LaunchTime'),
+        'State': instance.get('State', {}).get('Name'),
+        'SubnetId': instance.get('SubnetId'),
+        'VpcId': instance.get('VpcId')
+    }
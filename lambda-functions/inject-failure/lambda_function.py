@@ -2,27 +2,50 @@
 Inject Failure Lambda Function
 
 Purpose: Terminate a specified EC2 instance to inject chaos into the system
-Input: Instance ID
-Output: Termination status and details
+Input: Instance ID (or a list of instance IDs)
+Output: Termination status and details (per instance for bulk requests)
 
 This function is part of the Chaos Engineering Platform and is responsible
 for safely terminating EC2 instances that are tagged as chaos targets.
 """
 
-import json
-import boto3
+import time
+import random
 import logging
 from datetime import datetime
 from botocore.exceptions import ClientError
+from chaos_common.inventory_cache import invalidate_instance
+from chaos_common.ec2_instances import (
+    verify_and_describe, verify_and_describe_batch
+)
+from chaos_common.payloads import shape_payload, resolve_output_mode, resolve_top_n
+from chaos_common.clients import lazy_client, is_throttling_error
+from chaos_common.instrumentation import instrumented
+from chaos_common.structured_logging import logged, verbose_fields, flush_logs
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-ec2 = boto3.client('ec2')
+# AWS clients, built on first use (adaptive retries and shared rate limits, see chaos_common.clients)
+ec2 = lazy_client('ec2')
 
+# Bulk termination
+TERMINATE_BATCH_SIZE = 1000  # TerminateInstances accepts up to 1000 instance IDs
+TERMINATING_STATES = ['terminated', 'terminating', 'shutting-down']
 
+# Termination confirmation polling
+CONFIRMATION_TIMEOUT_SECONDS = 120  # Default time to wait for the 'terminated' state
+POLL_INITIAL_DELAY_SECONDS = 1.0  # First poll delay
+POLL_MAX_DELAY_SECONDS = 10.0  # Upper bound for the backoff delay
+POLL_BACKOFF_RATE = 2.0  # Delay multiplier between polls
+LAMBDA_TIMEOUT_MARGIN_SECONDS = 5  # Time kept in reserve to build the response
+
+# Compact output: bulk outcomes kept as problem entries (most severe first)
+PROBLEM_ACTIONS = ['error', 'refused', 'skipped']
+
+
+@logged('inject-failure')
+@instrumented('inject-failure')
 def lambda_handler(event, context):
     """
     Main Lambda handler function
@@ -30,43 +53,71 @@ def lambda_handler(event, context):
     Args:
         event: Lambda event object containing:
             - instanceId: EC2 instance ID to terminate
+            - instanceIds: (bulk mode) List of EC2 instance IDs to terminate
             - dryRun: (optional) If true, only validate without terminating
+            - waitForTermination: (optional) If true, poll until the instances
+              reach the 'terminated' state and report state transition timings
+            - confirmationTimeoutSeconds: (optional) Maximum time to poll.
+              Default: CONFIRMATION_TIMEOUT_SECONDS
+            - refreshInventory: (optional) If true, bypass the warm-container
+              inventory cache
+            - outputMode: (optional) 'full' (default) or 'compact'
+            - topN: (optional) Problem outcomes kept in compact bulk output
         context: Lambda context object
 
     Returns:
         dict: Response containing termination status and details
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    logger.info("Received event", extra=verbose_fields(event=event))
 
     try:
+        # Reject bad output options before doing any work
+        resolve_output_mode(event)
+        resolve_top_n(event)
+
+        if 'instanceIds' in event:
+            return shape_payload(
+                terminate_instances_bulk(event, context), compact_injection_response, event, 'inject-failure'
+            )
+
         # Extract instance ID from event
         instance_id = event.get('instanceId')
         dry_run = event.get('dryRun', False)
 
+        if event.get('refreshInventory', False) and instance_id:
+            invalidate_instance(instance_id)
+
         if not instance_id:
             raise ValueError("Missing required parameter: instanceId")
 
         logger.info(f"Processing termination request for instance: {instance_id}")
 
+        # Safety check and instance details come from a single DescribeInstances
+        # call, never from the cache: the verdict gates TerminateInstances
+        is_target, instance = verify_and_describe(ec2, instance_id, use_cache=False)
+
+        if instance is None:
+            raise Exception(f"Instance {instance_id} not found or not accessible")
+
         # Safety check: Verify instance is tagged as ChaosTarget
-        if not is_chaos_target(instance_id):
+        if not is_target:
+            logger.warning(f"Instance {instance_id} is NOT tagged as ChaosTarget=true")
             raise Exception(
                 f"Instance {instance_id} is not tagged as ChaosTarget=true. "
                 "Refusing to terminate for safety reasons."
             )
 
-        # Get instance details before termination
-        instance_details = get_instance_details(instance_id)
+        logger.info(f"Instance {instance_id} is tagged as ChaosTarget=true")
 
-        if not instance_details:
-            raise Exception(f"Instance {instance_id} not found or not accessible")
+        # Get instance details before termination
+        instance_details = extract_instance_details(instance)
 
         current_state = instance_details.get('State', 'unknown')
         logger.info(f"Current instance state: {current_state}")
 
         # Check if instance is already terminated or terminating
-        if current_state in ['terminated', 'terminating']:
-            return {
+        if current_state in TERMINATING_STATES:
+            return shape_payload({
                 'statusCode': 200,
                 'instanceId': instance_id,
                 'action': 'skipped',
@@ -74,12 +125,12 @@ def lambda_handler(event, context):
                 'currentState': current_state,
                 'message': f"Instance {instance_id} is already {current_state}",
                 'timestamp': datetime.utcnow().isoformat()
-            }
+            }, compact_injection_response, event, 'inject-failure')
 
         # Dry run mode - validate only, don't terminate
         if dry_run:
             logger.info(f"Dry run mode: Would terminate instance {instance_id}")
-            return {
+            return shape_payload({
                 'statusCode': 200,
                 'instanceId': instance_id,
                 'action': 'validated',
@@ -88,15 +139,26 @@ def lambda_handler(event, context):
                 'message': f"Validation successful. Instance {instance_id} is eligible for termination",
                 'instanceDetails': instance_details,
                 'timestamp': datetime.utcnow().isoformat()
-            }
+            }, compact_injection_response, event, 'inject-failure')
 
         # Terminate the instance
         logger.warning(f"⚠️  TERMINATING INSTANCE: {instance_id}")
 
+        termination_started = time.perf_counter()
+        termination_requested_at = datetime.utcnow().isoformat()
+
         termination_response = terminate_instance(instance_id)
 
         new_state = termination_response.get('CurrentState', {}).get('Name', 'unknown')
 
+        confirmation = None
+        if event.get('waitForTermination', False):
+            confirmation = wait_for_termination(
+                {instance_id: termination_response},
+                termination_started,
+                resolve_confirmation_timeout(event, context)
+            )
+
         # Prepare response
         response = {
             'statusCode': 200,
@@ -109,12 +171,29 @@ def lambda_handler(event, context):
             'privateIpAddress': instance_details.get('PrivateIpAddress', 'N/A'),
             'message': f"Successfully initiated termination of instance {instance_id}",
             'timestamp': datetime.utcnow().isoformat(),
+            'terminationRequestedAt': termination_requested_at,
             'chaosExperiment': True
         }
 
-        logger.info(f"Termination successful: {json.dumps(response, default=str)}")
+        if confirmation is not None:
+            instance_confirmation = confirmation['instances'][instance_id]
+            response['currentState'] = instance_confirmation['finalState']
+            response['terminationConfirmation'] = {
+                'confirmed': instance_confirmation['confirmed'],
+                'timeToTerminatedSeconds': instance_confirmation['timeToTerminatedSeconds'],
+                'transitions': instance_confirmation['transitions'],
+                'polls': confirmation['polls'],
+                'elapsedSeconds': confirmation['elapsedSeconds']
+            }
+            if instance_confirmation['confirmed']:
+                response['message'] = (
+                    f"Instance {instance_id} terminated in "
+                    f"{instance_confirmation['timeToTerminatedSeconds']:.3f}s"
+                )
+
+        logger.info("Termination successful: %s", response['message'], extra=verbose_fields(response=response))
 
-        return response
+        return shape_payload(response, compact_injection_response, event, 'inject-failure')
 
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -132,9 +211,10 @@ def lambda_handler(event, context):
         logger.error(f"AWS API error ({error_code}): {error_message}")
 
         return {
-            'statusCode': 500,
-            'error': 'AWSError',
+            'statusCode': 429 if is_throttling_error(e) else 500,
+            'error': 'Throttled' if is_throttling_error(e) else 'AWSError',
             'errorCode': error_code,
+            'retryable': is_throttling_error(e),
             'message': f"AWS API error: {error_message}",
             'timestamp': datetime.utcnow().isoformat()
         }
@@ -149,12 +229,210 @@ def lambda_handler(event, context):
         }
 
 
+def terminate_instances_bulk(event, context=None):
+    """
+    Verify and terminate many instances with a handful of API calls
+
+    Safety verification uses one batched DescribeInstances pass, and the
+    eligible instances are terminated with TerminateInstances calls chunked
+    to TERMINATE_BATCH_SIZE.
+
+    Args:
+        event: Lambda event object with 'instanceIds' and optional 'dryRun' /
+               'waitForTermination'
+        context: Lambda context object (used to bound confirmation polling)
+
+    Returns:
+        dict: Response containing the outcome of every instance
+              (terminated / validated / skipped / refused / error)
+    """
+    instance_ids = event.get('instanceIds')
+    dry_run = event.get('dryRun', False)
+
+    if not isinstance(instance_ids, list) or not instance_ids:
+        raise ValueError("instanceIds must be a non-empty list")
+
+    instance_ids = list(dict.fromkeys(instance_ids))
+
+    if event.get('refreshInventory', False):
+        for instance_id in instance_ids:
+            invalidate_instance(instance_id)
+
+    logger.info(f"Processing bulk termination request for {len(instance_ids)} instances")
+
+    # Safety check: one batched describe for every instance, bypassing the cache
+    verdicts = verify_and_describe_batch(ec2, instance_ids, use_cache=False)
+
+    results = {}
+    eligible = []
+
+    for instance_id in instance_ids:
+        is_target, instance = verdicts[instance_id]
+
+        if instance is None:
+            results[instance_id] = build_bulk_result(
+                instance_id, 'error', message=f"Instance {instance_id} not found or not accessible"
+            )
+            continue
+
+        current_state = instance.get('State', {}).get('Name', 'unknown')
+
+        if not is_target:
+            logger.warning(f"Instance {instance_id} is NOT tagged as ChaosTarget=true")
+            results[instance_id] = build_bulk_result(
+                instance_id, 'refused', current_state, current_state,
+                f"Instance {instance_id} is not tagged as ChaosTarget=true. Refusing to terminate for safety reasons."
+            )
+        elif current_state in TERMINATING_STATES:
+            results[instance_id] = build_bulk_result(
+                instance_id, 'skipped', current_state, current_state,
+                f"Instance {instance_id} is already {current_state}"
+            )
+        elif dry_run:
+            results[instance_id] = build_bulk_result(
+                instance_id, 'validated', current_state, current_state,
+                f"Instance {instance_id} is eligible for termination"
+            )
+        else:
+            eligible.append(instance_id)
+            results[instance_id] = build_bulk_result(instance_id, 'pending', current_state)
+
+    if eligible:
+        logger.warning(f"⚠️  TERMINATING {len(eligible)} INSTANCES: {', '.join(eligible)}")
+
+    termination_started = time.perf_counter()
+    terminated = {}
+
+    for start in range(0, len(eligible), TERMINATE_BATCH_SIZE):
+        batch = eligible[start:start + TERMINATE_BATCH_SIZE]
+
+        try:
+            terminating_instances = terminate_instances(batch)
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            error_message = e.response['Error']['Message']
+            for instance_id in batch:
+                results[instance_id].update({
+                    'action': 'error',
+                    'errorCode': error_code,
+                    'message': f"AWS API error: {error_message}"
+                })
+            continue
+
+        for instance_id in batch:
+            terminating_instance = terminating_instances.get(instance_id)
+
+            if terminating_instance is None:
+                results[instance_id].update({
+                    'action': 'error',
+                    'message': f"TerminateInstances did not report instance {instance_id}"
+                })
+                continue
+
+            terminated[instance_id] = terminating_instance
+            results[instance_id].update({
+                'action': 'terminated',
+                'currentState': terminating_instance.get('CurrentState', {}).get('Name', 'unknown'),
+                'message': f"Successfully initiated termination of instance {instance_id}"
+            })
+
+    confirmation = None
+    if terminated and event.get('waitForTermination', False):
+        confirmation = wait_for_termination(
+            terminated, termination_started, resolve_confirmation_timeout(event, context)
+        )
+        for instance_id, instance_confirmation in confirmation['instances'].items():
+            results[instance_id]['currentState'] = instance_confirmation['finalState']
+            results[instance_id]['terminationConfirmation'] = instance_confirmation
+
+    outcomes = [results[instance_id] for instance_id in instance_ids]
+    summary = {}
+    for outcome in outcomes:
+        summary[outcome['action']] = summary.get(outcome['action'], 0) + 1
+
+    response = {
+        'statusCode': 200,
+        'action': 'bulk',
+        'dryRun': dry_run,
+        'results': outcomes,
+        'summary': summary,
+        'instanceCount': len(instance_ids),
+        'message': ', '.join(f"{count} {action}" for action, count in sorted(summary.items())),
+        'timestamp': datetime.utcnow().isoformat(),
+        'chaosExperiment': not dry_run
+    }
+
+    if confirmation is not None:
+        response['terminationConfirmation'] = {
+            'confirmed': confirmation['confirmed'],
+            'confirmedCount': sum(1 for c in confirmation['instances'].values() if c['confirmed']),
+            'polls': confirmation['polls'],
+            'elapsedSeconds': confirmation['elapsedSeconds']
+        }
+
+    logger.info(f"Bulk termination finished: {response['message']}")
+
+    return response
+
+
+def compact_injection_response(response, top_n):
+    """
+    Build the compact form of an injection response
+
+    Instance tags are dropped, and bulk outcomes are reduced to the summary
+    counters, the IDs of terminated instances and the top-N problem outcomes.
+
+    Args:
+        response: Full injection response
+        top_n: Problem outcomes to keep
+
+    Returns:
+        dict: Compact response
+    """
+    compact = {key: value for key, value in response.items() if key != 'results'}
+
+    if 'instanceDetails' in response:
+        compact['instanceDetails'] = {
+            key: value for key, value in response['instanceDetails'].items() if key != 'Tags'
+        }
+
+    if 'results' in response:
+        severity = {action: rank for rank, action in enumerate(PROBLEM_ACTIONS)}
+        problems = sorted(
+            (outcome for outcome in response['results'] if outcome['action'] in severity),
+            key=lambda outcome: severity[outcome['action']]
+        )
+
+        compact['terminatedInstanceIds'] = [
+            outcome['instanceId'] for outcome in response['results'] if outcome['action'] == 'terminated'
+        ]
+        compact['problemResults'] = [
+            {key: value for key, value in outcome.items() if key != 'terminationConfirmation'}
+            for outcome in problems[:top_n]
+        ]
+        compact['omittedProblemResults'] = max(0, len(problems) - top_n)
+
+    return compact
+
+
+def build_bulk_result(instance_id, action, previous_state=None, current_state=None, message=None):
+    """Build the per-instance outcome entry of a bulk termination response"""
+    return {
+        'instanceId': instance_id,
+        'action': action,
+        'previousState': previous_state,
+        'currentState': current_state,
+        'message': message
+    }
+
+
 def is_chaos_target(instance_id):
     """
     Verify that an instance is tagged as a chaos target
 
     This is a critical safety check to prevent accidental termination
-    of instances that are not part of chaos experiments.
+    of instances that are not part of chaos experiments. Handlers that also
+    need the instance details should call verify_and_describe directly.
 
     Args:
         instance_id: EC2 instance ID
@@ -163,25 +441,22 @@ def is_chaos_target(instance_id):
         bool: True if instance is tagged with ChaosTarget=true
     """
     try:
-        response = ec2.describe_instances(InstanceIds=[instance_id])
+        is_target, instance = verify_and_describe(ec2, instance_id, use_cache=False)
 
-        if not response['Reservations']:
+        if instance is None:
             logger.error(f"Instance {instance_id} not found")
             return False
 
-        instance = response['Reservations'][0]['Instances'][0]
-        tags = instance.get('Tags', [])
-
-        # Check for ChaosTarget tag
-        for tag in tags:
-            if tag['Key'] == 'ChaosTarget' and tag['Value'].lower() == 'true':
-                logger.info(f"Instance {instance_id} is tagged as ChaosTarget=true")
-                return True
+        if is_target:
+            logger.info(f"Instance {instance_id} is tagged as ChaosTarget=true")
+        else:
+            logger.warning(f"Instance {instance_id} is NOT tagged as ChaosTarget=true")
 
-        logger.warning(f"Instance {instance_id} is NOT tagged as ChaosTarget=true")
-        return False
+        return is_target
 
     except ClientError as e:
+        if is_throttling_error(e):
+            raise
         logger.error(f"Error checking instance tags: {str(e)}")
         return False
 
@@ -197,31 +472,44 @@ def get_instance_details(instance_id):
         dict: Instance details including state, type, IP, AZ, etc.
     """
     try:
-        response = ec2.describe_instances(InstanceIds=[instance_id])
+        _, instance = verify_and_describe(ec2, instance_id)
 
-        if not response['Reservations']:
+        if instance is None:
             return {}
 
-        instance = response['Reservations'][0]['Instances'][0]
-
-        return {
-            'InstanceId': instance.get('InstanceId'),
-            'InstanceType': instance.get('InstanceType'),
-            'PrivateIpAddress': instance.get('PrivateIpAddress'),
-            'PublicIpAddress': instance.get('PublicIpAddress'),
-            'State': instance.get('State', {}).get('Name'),
-            'AvailabilityZone': instance.get('Placement', {}).get('AvailabilityZone'),
-            'LaunchTime': instance.get('LaunchTime').isoformat() if instance.get('LaunchTime') else 'N/A',
-            'SubnetId': instance.get('SubnetId'),
-            'VpcId': instance.get('VpcId'),
-            'Tags': instance.get('Tags', [])
-        }
+        return extract_instance_details(instance)
 
     except ClientError as e:
+        if is_throttling_error(e):
+            raise
         logger.error(f"Error retrieving instance details: {str(e)}")
         return {}
 
 
+def extract_instance_details(instance):
+    """
+    Build the instance details dictionary from a DescribeInstances entry
+
+    Args:
+        instance: Instance dictionary from DescribeInstances
+
+    Returns:
+        dict: Instance details including state, type, IP, AZ, etc.
+    """
+    return {
+        'InstanceId': instance.get('InstanceId'),
+        'InstanceType': instance.get('InstanceType'),
+        'PrivateIpAddress': instance.get('PrivateIpAddress'),
+        'PublicIpAddress': instance.get('PublicIpAddress'),
+        'State': instance.get('State', {}).get('Name'),
+        'AvailabilityZone': instance.get('Placement', {}).get('AvailabilityZone'),
+        'LaunchTime': instance.get('LaunchTime').isoformat() if instance.get('LaunchTime') else 'N/A',
+        'SubnetId': instance.get('SubnetId'),
+        'VpcId': instance.get('VpcId'),
+        'Tags': instance.get('Tags', [])
+    }
+
+
 def terminate_instance(instance_id):
     """
     Terminate an EC2 instance
@@ -239,6 +527,9 @@ def terminate_instance(instance_id):
             InstanceIds=[instance_id]
         )
 
+        # The cached description (and any Auto Scaling Group listing it) is now stale
+        invalidate_instance(instance_id)
+
         if response['TerminatingInstances']:
             terminating_instance = response['TerminatingInstances'][0]
             logger.info(
@@ -253,3 +544,169 @@ def terminate_instance(instance_id):
     except ClientError as e:
         logger.error(f"Failed to terminate instance {instance_id}: {str(e)}")
         raise
+
+
+def terminate_instances(instance_ids):
+    """
+    Terminate a batch of EC2 instances with a single API call
+
+    Args:
+        instance_ids: List of EC2 instance IDs (at most TERMINATE_BATCH_SIZE)
+
+    Returns:
+        dict: Mapping of instance ID to its TerminatingInstances entry
+    """
+    try:
+        logger.info(f"Calling EC2 TerminateInstances API for {len(instance_ids)} instances")
+
+        response = ec2.terminate_instances(
+            InstanceIds=instance_ids
+        )
+
+        for instance_id in instance_ids:
+            invalidate_instance(instance_id)
+
+        terminating_instances = {}
+        for terminating_instance in response.get('TerminatingInstances', []):
+            terminating_instances[terminating_instance['InstanceId']] = terminating_instance
+            logger.info(
+                f"Instance {terminating_instance['InstanceId']} state change: "
+                f"{terminating_instance['PreviousState']['Name']} -> "
+                f"{terminating_instance['CurrentState']['Name']}"
+            )
+
+        return terminating_instances
+
+    except ClientError as e:
+        logger.error(f"Failed to terminate {len(instance_ids)} instances: {str(e)}")
+        raise
+
+
+def resolve_confirmation_timeout(event, context=None):
+    """
+    Work out how long termination confirmation may poll
+
+    Args:
+        event: Lambda event object with optional 'confirmationTimeoutSeconds'
+        context: Lambda context object
+
+    Returns:
+        float: Polling budget in seconds, bounded by the remaining Lambda time
+    """
+    timeout = event.get('confirmationTimeoutSeconds', CONFIRMATION_TIMEOUT_SECONDS)
+
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ValueError("confirmationTimeoutSeconds must be a positive number")
+
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        remaining = context.get_remaining_time_in_millis() / 1000 - LAMBDA_TIMEOUT_MARGIN_SECONDS
+        timeout = max(0, min(timeout, remaining))
+
+    return timeout
+
+
+def backoff_delay(attempt):
+    """
+    Delay before the given poll attempt: exponential backoff with equal jitter
+
+    Args:
+        attempt: Zero-based poll attempt number
+
+    Returns:
+        float: Delay in seconds
+    """
+    delay = min(POLL_MAX_DELAY_SECONDS, POLL_INITIAL_DELAY_SECONDS * (POLL_BACKOFF_RATE ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def wait_for_termination(terminating_instances, started, timeout_seconds):
+    """
+    Poll instances until they reach the 'terminated' state
+
+    Every observed state change is recorded with a wall-clock timestamp and
+    the high-resolution time elapsed since the TerminateInstances request.
+
+    Args:
+        terminating_instances: Mapping of instance ID to its TerminatingInstances entry
+        started: time.perf_counter() value taken just before TerminateInstances
+        timeout_seconds: Maximum time to poll
+
+    Returns:
+        dict: Confirmation result with per-instance transitions and timings
+    """
+    deadline = started + timeout_seconds
+    instances = {}
+    last_states = {}
+
+    for instance_id, terminating_instance in terminating_instances.items():
+        previous_state = terminating_instance.get('PreviousState', {}).get('Name', 'unknown')
+        current_state = terminating_instance.get('CurrentState', {}).get('Name', 'unknown')
+        instances[instance_id] = {
+            'confirmed': current_state == 'terminated',
+            'finalState': current_state,
+            'timeToTerminatedSeconds': None,
+            'transitions': [{
+                'from': previous_state,
+                'to': current_state,
+                'observedAt': datetime.utcnow().isoformat(),
+                'elapsedSeconds': round(time.perf_counter() - started, 6)
+            }]
+        }
+        last_states[instance_id] = current_state
+
+    pending = {instance_id for instance_id, state in last_states.items() if state != 'terminated'}
+    polls = 0
+    attempt = 0
+
+    while pending:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+
+        flush_logs()
+        time.sleep(min(backoff_delay(attempt), remaining))
+        attempt += 1
+
+        try:
+            verdicts = verify_and_describe_batch(ec2, sorted(pending), use_cache=False)
+        except ClientError as e:
+            logger.warning(f"Termination poll failed, retrying: {str(e)}")
+            continue
+
+        polls += 1
+        observed_at = datetime.utcnow().isoformat()
+        elapsed = round(time.perf_counter() - started, 6)
+
+        for instance_id in sorted(pending):
+            _, instance = verdicts[instance_id]
+            # Terminated instances eventually disappear from DescribeInstances
+            state = instance.get('State', {}).get('Name', 'unknown') if instance else 'terminated'
+
+            if state != last_states[instance_id]:
+                instances[instance_id]['transitions'].append({
+                    'from': last_states[instance_id],
+                    'to': state,
+                    'observedAt': observed_at,
+                    'elapsedSeconds': elapsed
+                })
+                instances[instance_id]['finalState'] = state
+                last_states[instance_id] = state
+                logger.info(
+                    "Instance %s is now %s (%.3fs after termination request)", instance_id, state, elapsed,
+                    extra=verbose_fields(instanceId=instance_id, state=state, elapsedSeconds=elapsed)
+                )
+
+            if state == 'terminated':
+                instances[instance_id]['confirmed'] = True
+                instances[instance_id]['timeToTerminatedSeconds'] = elapsed
+                pending.discard(instance_id)
+
+    if pending:
+        logger.warning(f"{len(pending)} instances not confirmed terminated within {timeout_seconds:.0f}s")
+
+    return {
+        'confirmed': not pending,
+        'instances': instances,
+        'polls': polls,
+        'elapsedSeconds': round(time.perf_counter() - started, 6)
+    }
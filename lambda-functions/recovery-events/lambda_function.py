@@ -0,0 +1,117 @@
+"""
+Recovery Events Lambda Function
+
+Purpose: Record Auto Scaling lifecycle and EC2 state-change events
+Input: EventBridge event (or a list of them under 'events')
+Output: Number of recorded and ignored events
+
+This function is part of the Chaos Engineering Platform. The events it
+records let validate-system-health follow a recovery (replacement launch,
+running and InService times) without polling while nothing happens yet.
+"""
+
+import logging
+from datetime import datetime
+from botocore.exceptions import ClientError
+from chaos_common.recovery_events import normalize_event, get_event_store
+from chaos_common.clients import is_throttling_error
+from chaos_common.instrumentation import instrumented
+from chaos_common.structured_logging import logged, verbose_fields
+
+# Configure logging
+logger = logging.getLogger()
+
+MAX_EVENTS_PER_INVOCATION = 100  # Locally replayed batches
+
+
+@logged('recovery-events')
+@instrumented('recovery-events')
+def lambda_handler(event, context):
+    """
+    Main Lambda handler function
+
+    Args:
+        event: EventBridge event from the recovery events rule, or
+            - events: List of EventBridge events (local replay)
+        context: Lambda context object
+
+    Returns:
+        dict: Number of recorded and ignored events, and the records
+
+    Raises:
+        ClientError: If a record could not be stored, so that the event is
+                     retried (and sent to the dead-letter queue, if any)
+    """
+    logger.info("Received event", extra=verbose_fields(event=event))
+
+    try:
+        envelopes = resolve_envelopes(event)
+        store = get_event_store()
+        records = []
+        ignored = 0
+
+        for envelope in envelopes:
+            record = normalize_event(envelope)
+
+            if record is None:
+                ignored += 1
+                continue
+
+            store.put(record)
+            records.append(record)
+
+        logger.info(f"Recorded {len(records)} recovery records ({ignored} events ignored)")
+
+        return {
+            'statusCode': 200,
+            'recorded': len(records),
+            'ignored': ignored,
+            'records': records,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return {
+            'statusCode': 400,
+            'error': 'ValidationError',
+            'message': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+    except ClientError as e:
+        # EventBridge invokes asynchronously: a returned error would drop the event
+        logger.error(
+            f"AWS API error{' (throttled)' if is_throttling_error(e) else ''}, "
+            f"failing the invocation so the event is retried: {str(e)}"
+        )
+        raise
+
+    except Exception as e:
+        logger.error(f"Unexpected error, failing the invocation so the event is retried: {str(e)}")
+        raise
+
+
+def resolve_envelopes(event):
+    """
+    Validate the events of an invocation
+
+    Args:
+        event: One EventBridge event, or an object with an 'events' list
+
+    Returns:
+        list: EventBridge events
+    """
+    if 'events' not in event:
+        return [event]
+
+    envelopes = event['events']
+
+    if not isinstance(envelopes, list) or not envelopes:
+        raise ValueError("events must be a non-empty list of EventBridge events")
+
+    if len(envelopes) > MAX_EVENTS_PER_INVOCATION:
+        raise ValueError(f"At most {MAX_EVENTS_PER_INVOCATION} events per invocation")
+
+    return envelopes
+
@@ -0,0 +1,67 @@
+"""
+Shared fixtures for the Lambda function tests
+
+Tests run from lambda-functions/ against the in-process AWS backend in
+benchmarks/fake_aws.py, so no AWS account or network is needed:
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+import importlib.util
+import pytest
+
+LAMBDA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (LAMBDA_ROOT, os.path.join(LAMBDA_ROOT, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from fake_aws import FakeAWS  # noqa: E402
+from chaos_common import clients  # noqa: E402
+from chaos_common.inventory_cache import inventory_cache  # noqa: E402
+
+_handlers = {}
+
+
+def load_handler(function_dir, module='lambda_function'):
+    """
+    Import a handler module by its function directory
+
+    Every function ships a module named lambda_function, so each one is
+    loaded under its own name instead of through sys.path.
+
+    Args:
+        function_dir: Directory under lambda-functions/ (e.g. 'inject-failure')
+        module: Module file name without .py
+
+    Returns:
+        module: The imported module (cached per test session)
+    """
+    name = f"{function_dir.replace('-', '_')}_{module}"
+
+    if name not in _handlers:
+        function_path = os.path.join(LAMBDA_ROOT, function_dir)
+        if function_path not in sys.path:
+            sys.path.append(function_path)  # Sibling modules (e.g. load_generator)
+        spec = importlib.util.spec_from_file_location(name, os.path.join(function_path, f"{module}.py"))
+        handler = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(handler)
+        _handlers[name] = handler
+
+    return _handlers[name]
+
+
+@pytest.fixture
+def fake_aws():
+    """FakeAWS backend answering every client call, with a short instance lifecycle"""
+    backend = FakeAWS(termination_seconds=0.2, replacement_launch_seconds=0.2, replacement_ready_seconds=0.4)
+    clients.install_backend(backend)
+    inventory_cache.clear()
+
+    yield backend
+
+    backend.stop()
+    clients.install_backend(None)
+    inventory_cache.clear()
@@ -0,0 +1,139 @@
+"""Tests for inject-failure bulk termination and termination confirmation"""
+
+import time
+import pytest
+from botocore.exceptions import ClientError
+from conftest import load_handler
+from fake_aws import FakeAWS
+from chaos_common import clients
+from chaos_common.inventory_cache import inventory_cache
+
+MISSING_INSTANCE_ID = 'i-0000000000000dead'
+
+
+@pytest.fixture
+def inject():
+    return load_handler('inject-failure')
+
+
+class ManualClock:
+    """Simulated clock for the fake lifecycle; sleeping moves it and records the delay"""
+
+    def __init__(self):
+        self.now = time.time()
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return ManualClock()
+
+
+@pytest.fixture
+def slow_fake(clock):
+    """FakeAWS whose instances take 5 simulated seconds to terminate"""
+    backend = FakeAWS(clock=clock, termination_seconds=5.0, replace_terminated=False)
+    clients.install_backend(backend)
+    inventory_cache.clear()
+    yield backend
+    clients.install_backend(None)
+    inventory_cache.clear()
+
+
+def outcomes(response):
+    return {result['instanceId']: result['action'] for result in response['results']}
+
+
+def test_terminates_in_batches(fake_aws, inject, monkeypatch):
+    monkeypatch.setattr(inject, 'TERMINATE_BATCH_SIZE', 2)
+    fleet = fake_aws.add_fleet('chaos-platform-asg', 5)
+
+    response = inject.terminate_instances_bulk({'instanceIds': fleet['instanceIds']})
+
+    assert fake_aws.stats['ec2.TerminateInstances']['calls'] == 3
+    assert response['summary'] == {'terminated': 5}
+    assert all(fake_aws.instances[instance_id]['state'] == 'shutting-down' for instance_id in fleet['instanceIds'])
+
+
+def test_classifies_every_instance(fake_aws, inject):
+    fleet = fake_aws.add_fleet('chaos-platform-asg', 4, chaos_target_ratio=0.75)
+    target, already_terminating, _, protected = fleet['instanceIds']
+    clients.get_client('ec2').terminate_instances(InstanceIds=[already_terminating])
+
+    response = inject.terminate_instances_bulk(
+        {'instanceIds': [target, already_terminating, protected, MISSING_INSTANCE_ID, target]}
+    )
+
+    assert response['instanceCount'] == 4
+    assert outcomes(response) == {
+        target: 'terminated',
+        already_terminating: 'skipped',
+        protected: 'refused',
+        MISSING_INSTANCE_ID: 'error'
+    }
+    assert fake_aws.instances[protected]['state'] == 'running'
+
+
+def test_dry_run_only_validates(fake_aws, inject):
+    fleet = fake_aws.add_fleet('chaos-platform-asg', 2)
+
+    response = inject.terminate_instances_bulk({'instanceIds': fleet['instanceIds'], 'dryRun': True})
+
+    assert response['summary'] == {'validated': 2}
+    assert 'ec2.TerminateInstances' not in fake_aws.stats
+
+
+def test_failed_batch_is_reported_per_instance(fake_aws, inject, monkeypatch):
+    fleet = fake_aws.add_fleet('chaos-platform-asg', 2)
+
+    def refuse(instance_ids):
+        raise ClientError({'Error': {'Code': 'UnauthorizedOperation', 'Message': 'Not allowed'}}, 'TerminateInstances')
+
+    monkeypatch.setattr(inject, 'terminate_instances', refuse)
+    response = inject.terminate_instances_bulk({'instanceIds': fleet['instanceIds']})
+
+    assert response['summary'] == {'error': 2}
+    assert {result['errorCode'] for result in response['results']} == {'UnauthorizedOperation'}
+
+
+@pytest.mark.parametrize('attempt, ceiling', [(0, 1.0), (1, 2.0), (2, 4.0), (3, 8.0), (4, 10.0), (10, 10.0)])
+def test_backoff_delay_is_bounded(inject, attempt, ceiling):
+    delays = [inject.backoff_delay(attempt) for _ in range(50)]
+
+    assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+
+
+def test_wait_for_termination_backs_off_until_terminated(slow_fake, clock, inject, monkeypatch):
+    monkeypatch.setattr(inject.time, 'sleep', clock.sleep)
+    monkeypatch.setattr(inject.random, 'uniform', lambda low, high: high)
+    instance_id = slow_fake.add_fleet('chaos-platform-asg', 1)['instanceIds'][0]
+    terminating = inject.terminate_instances([instance_id])
+
+    confirmation = inject.wait_for_termination(terminating, time.perf_counter(), timeout_seconds=60)
+
+    instance = confirmation['instances'][instance_id]
+    assert clock.sleeps == [1.0, 2.0, 4.0]  # Terminated 5s in: seen by the third poll
+    assert confirmation['confirmed']
+    assert confirmation['polls'] == 3
+    assert instance['finalState'] == 'terminated'
+    assert [(step['from'], step['to']) for step in instance['transitions']] == [
+        ('running', 'shutting-down'), ('shutting-down', 'terminated')
+    ]
+
+
+def test_wait_for_termination_stops_at_the_deadline(slow_fake, inject):
+    instance_id = slow_fake.add_fleet('chaos-platform-asg', 1)['instanceIds'][0]
+    terminating = inject.terminate_instances([instance_id])
+
+    confirmation = inject.wait_for_termination(terminating, time.perf_counter(), timeout_seconds=0)
+
+    assert not confirmation['confirmed']
+    assert confirmation['polls'] == 0
+    assert confirmation['instances'][instance_id]['finalState'] == 'shutting-down'
@@ -0,0 +1,130 @@
+"""Tests for chaos_common.inventory_cache and the handlers' use of it"""
+
+import pytest
+from conftest import load_handler
+from chaos_common import clients
+from chaos_common.ec2_instances import verify_and_describe_batch
+from chaos_common.inventory_cache import (
+    InventoryCache, inventory_cache, asg_key, instance_key, invalidate_instance
+)
+
+ASG = 'chaos-platform-asg'
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return ManualClock()
+
+
+@pytest.fixture
+def get_target():
+    return load_handler('get-target-instance')
+
+
+@pytest.fixture
+def inject():
+    return load_handler('inject-failure')
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = InventoryCache(ttl_seconds=30, clock=clock)
+    cache.put('fleet', ['i-1'])
+    cache.put('short', ['i-2'], ttl_seconds=5)
+
+    clock.now += 5
+    assert cache.get('fleet') == ['i-1']
+    assert cache.get('short') is None
+
+    clock.now += 25
+    assert cache.get('fleet') is None
+    assert cache.stats() == {'entries': 0, 'hits': 1, 'misses': 2}
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = InventoryCache(ttl_seconds=30, max_entries=2, clock=clock)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_invalidation_follows_dependencies(clock):
+    cache = InventoryCache(ttl_seconds=30, clock=clock)
+    cache.put(instance_key('i-1'), {'InstanceId': 'i-1'})
+    cache.put(asg_key(ASG), {'Instances': ['i-1', 'i-2']}, depends_on=[instance_key('i-1'), instance_key('i-2')])
+    cache.put(asg_key('other-asg'), {'Instances': ['i-3']}, depends_on=[instance_key('i-3')])
+
+    assert cache.invalidate(instance_key('i-1')) == 2
+    assert cache.get(asg_key(ASG)) is None
+    assert cache.get(asg_key('other-asg')) is not None
+
+
+def test_zero_ttl_disables_caching(clock):
+    cache = InventoryCache(ttl_seconds=0, clock=clock)
+    cache.put('a', 1)
+
+    assert cache.get('a') is None
+
+
+def test_terminating_invalidates_cached_inventory(fake_aws, get_target, inject):
+    fleet = fake_aws.add_fleet(ASG, 3)
+    get_target.lambda_handler({'autoScalingGroupName': ASG}, None)
+    victim = fleet['instanceIds'][0]
+    assert inventory_cache.get(asg_key(ASG)) is not None
+
+    inject.terminate_instances([victim])
+
+    assert inventory_cache.get(asg_key(ASG)) is None
+    assert inventory_cache.get(instance_key(victim)) is None
+
+
+def test_bulk_termination_re_verifies_cached_instances(fake_aws, inject):
+    fleet = fake_aws.add_fleet(ASG, 2)
+    victim = fleet['instanceIds'][0]
+    ec2 = clients.get_client('ec2')
+    verify_and_describe_batch(ec2, fleet['instanceIds'])  # Cache the running descriptions
+    ec2.terminate_instances(InstanceIds=[victim])  # Behind the cache's back
+
+    cached = verify_and_describe_batch(ec2, [victim])[victim][1]
+    response = inject.terminate_instances_bulk({'instanceIds': fleet['instanceIds'], 'dryRun': True})
+
+    assert cached['State']['Name'] == 'running'
+    assert {result['instanceId']: result['action'] for result in response['results']} == {
+        victim: 'skipped',
+        fleet['instanceIds'][1]: 'validated'
+    }
+
+
+def test_find_stale_targets(fake_aws, get_target):
+    fleet = fake_aws.add_fleet(ASG, 3)
+    live, terminated, untagged = fleet['instanceIds']
+    get_target.lambda_handler({'autoScalingGroupName': ASG}, None)
+    clients.get_client('ec2').terminate_instances(InstanceIds=[terminated])
+    fake_aws.instances[untagged]['tags'].pop('ChaosTarget')
+
+    assert get_target.find_stale_targets([live, terminated, untagged]) == {terminated, untagged}
+    assert inventory_cache.get(asg_key(ASG)) is None
+    assert invalidate_instance(terminated) == 0  # Already dropped
+
+
+def test_selection_skips_instances_terminated_behind_the_cache(fake_aws, get_target):
+    fleet = fake_aws.add_fleet(ASG, 3)
+    get_target.lambda_handler({'autoScalingGroupName': ASG}, None)
+    clients.get_client('ec2').terminate_instances(InstanceIds=fleet['instanceIds'][:2])
+
+    for _ in range(5):
+        response = get_target.lambda_handler({'autoScalingGroupName': ASG}, None)
+        assert response['statusCode'] == 200
+        assert response['instanceId'] == fleet['instanceIds'][2]
@@ -0,0 +1,166 @@
+"""Tests for the experiment-runner load generator"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from conftest import load_handler
+
+load_generator = load_handler('experiment-runner', 'load_generator')
+LatencyHistogram = load_generator.LatencyHistogram
+LoadGenerator = load_generator.LoadGenerator
+
+T = 1_700_000_000  # A whole second
+OK_US = 1000
+FAILED_US = 50000
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Answers 200, or 503 while the server is marked as failing"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = 503 if self.server.failing else 200
+        body = b'down' if status == 503 else b'ok'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), HealthHandler)
+    httpd.failing = False
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_bucket_bounds_cover_every_value():
+    for value in list(range(5000)) + [2 ** power + offset for power in range(12, 40) for offset in (-1, 0, 1)]:
+        low, high = LatencyHistogram.bucket_bounds(LatencyHistogram.bucket_index(value))
+        assert low <= value <= high
+
+
+def test_buckets_are_contiguous_and_precise():
+    previous_high = -1
+
+    for index in range(LatencyHistogram.bucket_index(10 ** 7)):
+        low, high = LatencyHistogram.bucket_bounds(index)
+        assert low == previous_high + 1
+        assert high - low < max(1, low / 63)  # Within 1/64 of the value
+        previous_high = high
+
+
+def test_percentiles_are_exact_for_small_values():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+
+    assert histogram.percentile(50) == 50
+    assert histogram.percentile(99) == 99
+    assert histogram.percentile(100) == 100
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_percentiles_of_large_values_stay_within_their_bucket():
+    histogram = LatencyHistogram()
+    for _ in range(999):
+        histogram.record(10_000)
+    histogram.record(2_000_000)
+
+    assert 10_000 <= histogram.percentile(99) <= 10_000 * 65 / 64
+    assert histogram.percentile(100) == 2_000_000
+    assert histogram.summary()['maxMs'] == 2000.0
+
+
+def test_merge_adds_counts():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(5)
+    second.record(500)
+    second.record(7)
+
+    first.merge(second)
+
+    assert (first.count, first.min, first.max, first.total) == (3, 5, 500, 512)
+    assert first.percentile(50) == 7
+
+
+def synthetic_run():
+    """Ten requests per second from T-5 to T+9; half of seconds T+2 and T+3 fail, plus one at T-3"""
+    generator = LoadGenerator('http://127.0.0.1:1/health')
+
+    for second in range(-5, 10):
+        for tenth in range(10):
+            failed = (second in (2, 3) and tenth >= 5) or (second == -3 and tenth == 0)
+            generator._record(
+                T + second + tenth / 10, FAILED_US if failed else OK_US,
+                503 if failed else 200, 'http5xx' if failed else None
+            )
+
+    return generator
+
+
+def test_injection_report_windows():
+    report = synthetic_run().injection_report(load_generator.format_time(T + 1), window_seconds=3)
+
+    window = report['errorWindow']
+    assert window['start'] == load_generator.format_time(T + 2.5)
+    assert window['end'] == load_generator.format_time(T + 3.9)
+    assert window['durationSeconds'] == 1.4
+    assert window['startAfterInjectionSeconds'] == 1.5
+    assert (window['errors'], window['requests'], window['errorRate']) == (10, 20, 0.5)
+    assert report['errorsBeforeInjection'] == 1
+    # Before: T-2..T (T-3's failure is outside the window); during: T+2..T+3; after: T+4..T+6
+    assert report['latencyBefore'] == {**report['latencyBefore'], 'count': 30, 'maxMs': 1.0}
+    ok_bucket_high_ms = LatencyHistogram.bucket_bounds(LatencyHistogram.bucket_index(OK_US))[1] / 1000
+    assert report['latencyDuring'] == {**report['latencyDuring'], 'count': 20, 'p50Ms': ok_bucket_high_ms, 'maxMs': 50.0}
+    assert report['latencyAfter'] == {**report['latencyAfter'], 'count': 30, 'maxMs': 1.0}
+
+
+def test_injection_report_without_errors_uses_the_window():
+    report = synthetic_run().injection_report(load_generator.format_time(T + 5), window_seconds=2)
+
+    assert report['errorWindow'] is None
+    assert report['errorsBeforeInjection'] == 11
+    assert report['latencyDuring']['count'] == 20
+    assert report['latencyAfter']['count'] == 20
+
+
+def test_run_against_a_failing_server(server):
+    url = f"http://127.0.0.1:{server.server_address[1]}/health"
+
+    async def run():
+        generator = LoadGenerator(url, requests_per_second=50, connections=4, timeout_seconds=2)
+        task = asyncio.ensure_future(generator.run())
+        await asyncio.sleep(1.0)
+        injected = datetime.now(timezone.utc).isoformat()
+        await asyncio.sleep(0.1)  # Requests due before the injection are answered before the fault
+        server.failing = True
+        await asyncio.sleep(0.6)
+        server.failing = False
+        await asyncio.sleep(0.6)
+        generator.stop()
+        await task
+        return generator.report(injected, window_seconds=2)
+
+    started = time.time()
+    report = asyncio.run(run())
+
+    window = report['injection']['errorWindow']
+    assert time.time() - started < 10
+    assert report['statusCodes'].keys() == {'200', '503'}
+    assert report['errors'] == report['statusCodes']['503']
+    assert report['injection']['errorsBeforeInjection'] == 0
+    assert window['errors'] == report['errors']
+    assert 0 <= window['startAfterInjectionSeconds'] < 0.5
+    assert 0.3 < window['durationSeconds'] < 1.0
@@ -0,0 +1,115 @@
+"""Tests for the recovery-events handler and the events-mode recovery wait"""
+
+from datetime import datetime, timezone
+import pytest
+from botocore.exceptions import ClientError
+from conftest import load_handler
+from chaos_common import clients
+from chaos_common.recovery_events import (
+    MemoryEventStore, DynamoDBEventStore, set_event_store, build_autoscaling_event, build_state_change_event,
+    build_event
+)
+
+ASG = 'chaos-platform-asg'
+
+
+@pytest.fixture
+def store():
+    memory = MemoryEventStore()
+    set_event_store(memory)
+    yield memory
+    set_event_store(None)
+
+
+@pytest.fixture
+def recovery_events():
+    return load_handler('recovery-events')
+
+
+class FailingStore:
+    def put(self, record):
+        raise ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Rate exceeded'}}, 'PutItem'
+        )
+
+
+def test_records_recovery_events(store, recovery_events):
+    events = [
+        build_state_change_event('i-0replacement', 'running'),
+        build_autoscaling_event('launched', ASG, 'i-0replacement', start_time=datetime.now(timezone.utc)),
+        build_event('aws.ec2', 'EBS Volume Notification', {'event': 'createVolume'})
+    ]
+
+    response = recovery_events.lambda_handler({'events': events}, None)
+
+    assert response['statusCode'] == 200
+    assert response['recorded'] == 2
+    assert response['ignored'] == 1
+    assert [record['state'] for record in store.query('instance#i-0replacement')] == ['running']
+    assert [record['kind'] for record in store.query(f"asg#{ASG}")] == ['launched']
+
+
+def test_redelivered_event_is_stored_once(store, recovery_events):
+    event = build_state_change_event('i-0replacement', 'pending')
+
+    recovery_events.lambda_handler(event, None)
+    recovery_events.lambda_handler(event, None)
+
+    assert len(store.query('instance#i-0replacement')) == 1
+
+
+def test_invalid_batch_is_rejected(store, recovery_events):
+    response = recovery_events.lambda_handler({'events': []}, None)
+
+    assert response['statusCode'] == 400
+    assert response['error'] == 'ValidationError'
+
+
+def test_store_errors_fail_the_invocation(recovery_events):
+    set_event_store(FailingStore())
+
+    try:
+        with pytest.raises(ClientError):
+            recovery_events.lambda_handler(build_state_change_event('i-0replacement', 'pending'), None)
+    finally:
+        set_event_store(None)
+
+
+def test_missing_table_fails_the_invocation(fake_aws, recovery_events):
+    set_event_store(DynamoDBEventStore('missing-table', client=clients.get_client('dynamodb')))
+
+    try:
+        with pytest.raises(ClientError) as raised:
+            recovery_events.lambda_handler(build_state_change_event('i-0replacement', 'pending'), None)
+    finally:
+        set_event_store(None)
+
+    assert raised.value.response['Error']['Code'] == 'ResourceNotFoundException'
+
+
+def test_recover_after_replacement(fake_aws, store, recovery_events):
+    validate = load_handler('validate-system-health')
+    fake_aws.event_sink = lambda event: recovery_events.lambda_handler(event, None)
+    fleet = fake_aws.add_fleet(ASG, 3)
+    victim = fleet['instanceIds'][0]
+    injected_at = datetime.now(timezone.utc).isoformat()
+
+    clients.get_client('ec2').terminate_instances(InstanceIds=[victim])
+    fake_aws.start()
+
+    recovery = validate.recover_after_replacement(
+        fleet['targetGroupArn'], ASG, 3, timeout_seconds=20, interval_seconds=0.1,
+        injection_timestamp=injected_at, terminated_instance_ids=[victim]
+    )
+
+    replacement = recovery['events']['replacements'][0]
+    assert recovery['recovered']
+    assert recovery['mode'] == 'events'
+    assert recovery['replacementSeen']
+    assert replacement['instanceId'] not in fleet['instanceIds']
+    assert replacement['runningAt'] is not None
+    assert recovery['events']['terminations'][0]['instanceId'] == victim
+    assert recovery['timings']['replacementInstanceId'] == replacement['instanceId']
+    # EventBridge times have whole seconds, so with the fake's sub-second lifecycle only presence is checked
+    assert recovery['timings']['launchToRunningSeconds'] is not None
+    assert recovery['timings']['launchToHealthySeconds'] is not None
@@ -0,0 +1,184 @@
+"""Tests for chaos_common.single_flight against the fake DynamoDB table"""
+
+import json
+import zlib
+from functools import partial
+import pytest
+from conftest import load_handler
+from chaos_common import clients
+from chaos_common.single_flight import SingleFlight, PENDING, READY
+
+TABLE = 'chaos-coalesce'
+WINDOW = 10.0
+LEASE = 5.0
+
+
+class ManualClock:
+    """Clock that only moves when told to (sleeping moves it too)"""
+
+    def __init__(self, now=1_000_000.0):  # Starts on a window boundary
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return ManualClock()
+
+
+@pytest.fixture
+def table(fake_aws):
+    fake_aws.add_table(TABLE)
+    return fake_aws.tables[TABLE]
+
+
+def make_flight(clock, table_name=TABLE):
+    return SingleFlight(table_name, client=clients.get_client('dynamodb'), window_seconds=WINDOW,
+                        lease_seconds=LEASE, clock=clock, sleep=clock.sleep)
+
+
+def counting(result):
+    calls = []
+
+    def function():
+        calls.append(1)
+        return result
+
+    return function, calls
+
+
+def bucket(key, clock):
+    return f"{key}#{int(clock() // WINDOW)}"
+
+
+def test_leader_claims_and_publishes(table, clock):
+    flight = make_flight(clock)
+    function, calls = counting({'healthy': 3})
+
+    assert flight.do('probe', function) == {'healthy': 3}
+
+    item = table[bucket('probe', clock)]
+    assert len(calls) == 1
+    assert flight.stats['leader'] == 1
+    assert item['status']['S'] == READY
+    assert float(item['expiresAt']['N']) == pytest.approx(clock() + WINDOW)
+    assert json.loads(zlib.decompress(item['result']['B'])) == {'healthy': 3}
+
+
+def test_follower_shares_published_result(table, clock):
+    make_flight(clock).do('probe', lambda: {'healthy': 3})
+    follower = make_flight(clock)  # Another container
+    function, calls = counting({'healthy': 0})
+
+    assert follower.do('probe', function) == {'healthy': 3}
+    assert calls == []
+    assert follower.stats['shared'] == 1
+
+
+def test_keys_are_bucketed_by_window(table, clock):
+    flight = make_flight(clock)
+    function, calls = counting({'healthy': 3})
+
+    flight.do('probe', function)
+    first_key = bucket('probe', clock)
+    clock.now += WINDOW
+    flight.do('probe', function)
+
+    assert len(calls) == 2
+    assert set(table) == {first_key, bucket('probe', clock)}
+    assert first_key != bucket('probe', clock)
+
+
+def test_zero_window_runs_directly(table, clock):
+    flight = make_flight(clock)
+
+    assert flight.do('probe', lambda: 1, window_seconds=0) == 1
+    assert flight.stats['direct'] == 1
+    assert table == {}
+
+
+def test_unshareable_result_releases_claim(table, clock):
+    flight = make_flight(clock)
+
+    assert flight.do('probe', lambda: {'error': 'Throttled'}, shareable=lambda result: 'error' not in result) == \
+        {'error': 'Throttled'}
+    assert table == {}
+
+
+def test_failed_call_releases_claim(table, clock):
+    flight = make_flight(clock)
+
+    def fail():
+        raise RuntimeError('upstream failed')
+
+    with pytest.raises(RuntimeError):
+        flight.do('probe', fail)
+    assert table == {}
+
+
+def test_publish_and_release_only_by_owner(table, clock):
+    flight = make_flight(clock)
+    key = bucket('probe', clock)
+
+    assert flight._claim(key, 'owner-a', LEASE)
+    assert not flight._claim(key, 'owner-b', LEASE)
+
+    flight._publish(key, 'owner-b', {'healthy': 0}, WINDOW)
+    flight._release(key, 'owner-b')
+    assert table[key]['status']['S'] == PENDING
+    assert table[key]['owner']['S'] == 'owner-a'
+
+    flight._release(key, 'owner-a')
+    assert key not in table
+
+
+def test_expired_lease_is_taken_over(table, clock):
+    key = bucket('probe', clock)
+    make_flight(clock)._claim(key, 'dead-leader', LEASE)
+    clock.now += LEASE + 1  # Still inside the window the claim was made in
+    assert bucket('probe', clock) == key
+    flight = make_flight(clock)
+    function, calls = counting({'healthy': 3})
+
+    assert flight.do('probe', function) == {'healthy': 3}
+    assert len(calls) == 1
+    assert flight.stats['leader'] == 1
+    assert table[key]['status']['S'] == READY
+
+
+def test_follower_queries_directly_when_leader_outlasts_lease(table, clock):
+    key = bucket('probe', clock)
+    make_flight(clock)._claim(key, 'slow-leader', 60)
+    flight = make_flight(clock)
+    function, calls = counting({'healthy': 3})
+
+    assert flight.do('probe', function) == {'healthy': 3}
+    assert len(calls) == 1
+    assert flight.stats['direct'] == 1
+    assert table[key]['owner']['S'] == 'slow-leader'
+
+
+def test_fails_open_when_table_is_missing(fake_aws, clock):
+    flight = make_flight(clock, table_name='missing-table')
+    function, calls = counting({'healthy': 3})
+
+    assert flight.do('probe', function) == {'healthy': 3}
+    assert len(calls) == 1
+    assert flight.stats['direct'] == 1
+
+
+def test_coalescing_key_covers_bound_options():
+    validate = load_handler('validate-system-health')
+    argument = ['query']
+
+    def key(use_cache):
+        probes = {'cloudwatch': (partial(validate.get_metric_data_batch, use_cache=use_cache), argument)}
+        return validate.coalesce_probes(probes, WINDOW)['cloudwatch'][0].args[0]
+
+    assert key(True) == key(True)
+    assert key(True) != key(False)
@@ -0,0 +1,252 @@
+"""
+Baseline Comparison
+
+Compares pre-experiment and post-experiment metric windows.
+
+All metrics are packed into NaN-padded 2D arrays (one row per metric) so the
+means, variances, deltas and Welch t statistics of every metric are computed
+in a handful of vectorized NumPy operations. This keeps week-long,
+1-minute-resolution windows across many metrics well inside the Lambda time
+budget. Only the final p-value lookup runs per metric.
+"""
+
+import math
+import numpy as np
+
+SIGNIFICANCE_LEVEL = 0.05  # p-value below which a change is significant
+MIN_SAMPLES = 2  # Datapoints needed on each side for a significance test
+
+# +1: higher values are worse, -1: lower values are worse, 0: neutral
+METRIC_DIRECTIONS = {
+    'healthyHostCount': -1,
+    'unhealthyHostCount': 1,
+    'target5xxErrors': 1,
+    'target5xxErrorRate': 1,
+    'responseTime': 1,
+    'responseTimeP50': 1,
+    'responseTimeP90': 1,
+    'responseTimeP99': 1,
+    'requestCount': 0
+}
+
+
+def compare_metric_windows(pre_metrics, post_metrics, significance_level=SIGNIFICANCE_LEVEL):
+    """
+    Compare the series of every metric present in both windows
+
+    Args:
+        pre_metrics: Metrics dictionary of the pre-experiment check
+        post_metrics: Metrics dictionary of the post-experiment check
+        significance_level: p-value threshold for significance
+
+    Returns:
+        dict: Per-metric comparison results and the list of significant regressions
+    """
+    names = sorted(
+        name for name in set(pre_metrics) & set(post_metrics)
+        if extract_values(pre_metrics[name]) and extract_values(post_metrics[name])
+    )
+
+    if not names:
+        return {'available': False, 'metrics': {}, 'regressions': [], 'reason': 'No common metric series'}
+
+    pre = pad_series([extract_values(pre_metrics[name]) for name in names])
+    post = pad_series([extract_values(post_metrics[name]) for name in names])
+    directions = np.array([METRIC_DIRECTIONS.get(name, 0) for name in names], dtype=float)
+
+    stats = compute_window_statistics(pre, post, directions)
+
+    results = {}
+    regressions = []
+
+    for index, name in enumerate(names):
+        df = stats['degreesOfFreedom'][index]
+        t_stat = stats['tStatistic'][index]
+        enough = stats['preCount'][index] >= MIN_SAMPLES and stats['postCount'][index] >= MIN_SAMPLES
+
+        if enough and np.isfinite(t_stat) and np.isfinite(df):
+            p_value = student_t_two_sided_p_value(float(t_stat), float(df))
+        elif enough and stats['delta'][index] == 0:
+            p_value = 1.0  # Identical constant windows
+        elif enough:
+            p_value = 0.0  # Constant windows with different levels
+        else:
+            p_value = None
+
+        significant = p_value is not None and p_value < significance_level
+        regression = float(stats['regressionPercent'][index])
+        regressed = significant and directions[index] != 0 and regression > 0
+
+        results[name] = {
+            'preMean': to_float(stats['preMean'][index]),
+            'postMean': to_float(stats['postMean'][index]),
+            'delta': to_float(stats['delta'][index]),
+            'percentChange': to_float(stats['percentChange'][index]),
+            'regressionPercent': to_float(regression),
+            'preCount': int(stats['preCount'][index]),
+            'postCount': int(stats['postCount'][index]),
+            'tStatistic': to_float(t_stat),
+            'pValue': None if p_value is None else round(p_value, 6),
+            'significant': significant,
+            'regressed': regressed
+        }
+
+        if regressed:
+            regressions.append(name)
+
+    return {
+        'available': True,
+        'significanceLevel': significance_level,
+        'metrics': results,
+        'regressions': regressions
+    }
+
+
+def extract_values(metric):
+    """Return the series values of a metric entry (falling back to its latest value)"""
+    if not isinstance(metric, dict) or not metric.get('available'):
+        return []
+
+    values = metric.get('series', {}).get('values')
+    if values:
+        return values
+
+    return [] if metric.get('value') is None else [metric['value']]
+
+
+def pad_series(series_list):
+    """
+    Pack variable-length series into a NaN-padded 2D float array
+
+    Args:
+        series_list: List of value lists
+
+    Returns:
+        numpy.ndarray: Array of shape (len(series_list), longest series)
+    """
+    width = max(len(values) for values in series_list)
+    packed = np.full((len(series_list), width), np.nan)
+
+    for row, values in enumerate(series_list):
+        packed[row, :len(values)] = values
+
+    return packed
+
+
+def compute_window_statistics(pre, post, directions):
+    """
+    Vectorized per-row statistics for NaN-padded pre/post windows
+
+    Args:
+        pre: 2D array of pre-experiment values (NaN padded)
+        post: 2D array of post-experiment values (NaN padded)
+        directions: 1D array of metric directions (+1, -1 or 0)
+
+    Returns:
+        dict: 1D arrays of means, counts, deltas, percent changes, Welch t
+              statistics and degrees of freedom
+    """
+    pre_count = np.sum(~np.isnan(pre), axis=1)
+    post_count = np.sum(~np.isnan(post), axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pre_mean = np.nanmean(pre, axis=1)
+        post_mean = np.nanmean(post, axis=1)
+        pre_var = np.nansum((pre - pre_mean[:, None]) ** 2, axis=1) / (pre_count - 1)
+        post_var = np.nansum((post - post_mean[:, None]) ** 2, axis=1) / (post_count - 1)
+
+        delta = post_mean - pre_mean
+        percent_change = np.where(pre_mean != 0, delta / np.abs(pre_mean) * 100, np.where(delta == 0, 0.0, np.inf))
+
+        pre_se = pre_var / pre_count
+        post_se = post_var / post_count
+        standard_error = np.sqrt(pre_se + post_se)
+        t_statistic = np.where(standard_error > 0, delta / standard_error, np.nan)
+        degrees_of_freedom = (pre_se + post_se) ** 2 / (
+            pre_se ** 2 / (pre_count - 1) + post_se ** 2 / (post_count - 1)
+        )
+
+    return {
+        'preMean': pre_mean,
+        'postMean': post_mean,
+        'preCount': pre_count,
+        'postCount': post_count,
+        'delta': delta,
+        'percentChange': percent_change,
+        'regressionPercent': percent_change * directions,
+        'tStatistic': t_statistic,
+        'degreesOfFreedom': degrees_of_freedom
+    }
+
+
+def student_t_two_sided_p_value(t_statistic, degrees_of_freedom):
+    """
+    Two-sided p-value of Student's t distribution
+
+    Uses the regularized incomplete beta function, so no SciPy is needed.
+
+    Args:
+        t_statistic: t statistic
+        degrees_of_freedom: Degrees of freedom (may be fractional)
+
+    Returns:
+        float: p-value in [0, 1]
+    """
+    x = degrees_of_freedom / (degrees_of_freedom + t_statistic ** 2)
+    return min(1.0, max(0.0, regularized_incomplete_beta(degrees_of_freedom / 2, 0.5, x)))
+
+
+def regularized_incomplete_beta(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+
+    log_front = (
+        math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+        + a * math.log(x) + b * math.log(1 - x)
+    )
+
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * beta_continued_fraction(a, b, x) / a
+
+    return 1 - math.exp(log_front) * beta_continued_fraction(b, a, 1 - x) / b
+
+
+def beta_continued_fraction(a, b, x, max_iterations=200, epsilon=1e-12):
+    """Continued fraction for the incomplete beta function (modified Lentz's method)"""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1, a - 1
+    c = 1.0
+    d = 1 - qab * x / qap
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+
+    for m in range(1, max_iterations + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+
+        if abs(delta - 1) < epsilon:
+            break
+
+    return h
+
+
+def to_float(value):
+    """Convert a NumPy scalar to a JSON-friendly float (None for NaN / infinity)"""
+    value = float(value)
+    return round(value, 6) if math.isfinite(value) else None
@@ -9,27 +9,72 @@ This function is part of the Chaos Engineering Platform and validates that
 the application remained healthy (or recovered) after a chaos experiment.
 """
 
+import os
 import json
-import boto3
+import time
+import hashlib
+import calendar
 import logging
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone, timedelta
+from functools import partial
 from botocore.exceptions import ClientError
+from chaos_common.metric_cache import metric_cache, query_key
+from chaos_common.payloads import shape_payload, load_payload, resolve_output_mode, resolve_top_n
+from chaos_common.single_flight import single_flight
+from chaos_common.recovery_events import get_event_store, replacement_timeline, parse_time
+from chaos_common.clients import lazy_client, is_throttling_error
+from chaos_common.instrumentation import instrumented
+from chaos_common.structured_logging import logged, log_fields, verbose_fields, flush_logs
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-cloudwatch = boto3.client('cloudwatch')
-elbv2 = boto3.client('elbv2')
+# Concurrent probes
+PROBE_TIMEOUT_SECONDS = 15  # Default per-probe timeout
+PROBE_MAX_WORKERS = 16  # Threads used to run probes in parallel (one probe per target group)
+
+# AWS clients, built on first use; CloudWatch is never built when no metrics
+# are queried (pooled connections are shared by the probe threads; adaptive
+# retries and shared rate limits, see chaos_common.clients)
+cloudwatch = lazy_client('cloudwatch', max_pool_connections=PROBE_MAX_WORKERS + 4, read_timeout=PROBE_TIMEOUT_SECONDS)
+elbv2 = lazy_client('elbv2', max_pool_connections=PROBE_MAX_WORKERS + 4, read_timeout=PROBE_TIMEOUT_SECONDS)
 
 # Health check thresholds
 HEALTHY_HOST_THRESHOLD = 2  # Minimum number of healthy hosts
 MAX_5XX_ERRORS = 10  # Maximum acceptable 5XX errors
 MAX_RESPONSE_TIME_MS = 2000  # Maximum acceptable response time in milliseconds
+MAX_P99_RESPONSE_TIME_MS = 3000  # p99 response time above which the check WARNs (any point in the window)
+P99_FAIL_THRESHOLD_MS = os.environ.get('P99_FAIL_THRESHOLD_MS')  # Opt-in: p99 above this FAILs the check
 METRIC_PERIOD_SECONDS = 60  # CloudWatch metric period
+METRIC_LOOKBACK_MINUTES = 5  # CloudWatch metric window
+MAX_METRIC_DATA_QUERIES = 500  # GetMetricData limit per request
+
+# Multi-target-group validation
+MAX_TARGET_GROUPS = 100  # Upper bound on target groups checked per invocation
+TARGET_GROUP_ARNS_BATCH_SIZE = 20  # Target group ARNs per DescribeTargetGroups request
+
+# Compact output (most severe first)
+TARGET_STATE_SEVERITY = ['unhealthy', 'unavailable', 'draining', 'initial', 'unused']
+
+# Recovery polling
+RECOVERY_TIMEOUT_SECONDS = 300  # Default time to wait for recovery
+RECOVERY_POLL_INTERVAL_SECONDS = 5  # Default delay between target health polls
+MAX_POLL_INTERVAL_SECONDS = 9  # Keeps time-to-recover resolution under 10 seconds
+LAMBDA_TIMEOUT_MARGIN_SECONDS = 10  # Time kept in reserve for the final health check
 
+# Event-driven recovery (recoveryMode 'events', see chaos_common.recovery_events)
+RECOVERY_MODES = ('poll', 'events')
+EVENT_POLL_INTERVAL_SECONDS = 2  # Delay between event store reads while no replacement exists
+REPLACEMENT_EVENT_TIMEOUT_SECONDS = 240  # Fall back to target health polling after this long without a replacement
+RECOVERY_EVENT_LOOKBACK_SECONDS = 900  # Event window without an injectionTimestamp
 
+# Baseline comparison
+SIGNIFICANCE_LEVEL = 0.05  # Default p-value threshold for pre/post regressions
+
+
+@logged('validate-system-health')
+@instrumented('validate-system-health')
 def lambda_handler(event, context):
     """
     Main Lambda handler function
@@ -37,22 +82,65 @@ def lambda_handler(event, context):
     Args:
         event: Lambda event object containing:
             - targetGroupArn: ARN of the target group
-            - loadBalancerArn: ARN of the load balancer (optional)
+            - targetGroupArns: List of target group ARNs to check in one
+              invocation (alternative to targetGroupArn)
+            - loadBalancerArn: ARN of the load balancer (optional). Without
+              targetGroupArn, every target group of the load balancer is checked
             - expectedHealthyHosts: Expected number of healthy hosts (optional)
             - checkType: 'pre' or 'post' experiment (optional)
+            - waitForRecovery: If true, poll target health until the expected
+              healthy count is back or the deadline passes (optional)
+            - recoveryTimeoutSeconds: Maximum time to poll (optional)
+            - pollIntervalSeconds: Delay between polls, at most
+              MAX_POLL_INTERVAL_SECONDS (optional)
+            - injectionTimestamp: ISO timestamp of the failure injection, used
+              to report time since injection (optional)
+            - recoveryMode: 'poll' (default) polls target health from the
+              start; 'events' waits for the replacement's launch event and
+              only then polls (optional)
+            - autoScalingGroupName: Group whose replacement is awaited
+              (required with recoveryMode 'events')
+            - terminatedInstanceIds: Terminated instances; their failure
+              in target health counts as the dip before recovery, and they
+              are never counted as replacements (optional)
+            - probeTimeoutSeconds: Per-probe timeout for the concurrent
+              ELBv2 / CloudWatch collection stage (optional)
+            - refreshMetrics: If true, fetch the full metric window instead of
+              only the datapoints newer than the cached series (optional)
+            - baselineMetrics: Metrics of the pre-experiment check; when given,
+              the current metric windows are compared against them (optional)
+            - baselinePayloadRef: payloadRef of an offloaded pre-experiment
+              check; its full metrics are used as the baseline (optional)
+            - significanceLevel: p-value threshold for the baseline
+              comparison (optional)
+            - coalesceWindowSeconds: How long probe results may be shared
+              with concurrent checks of the same target group; 0 disables
+              coalescing (optional)
+            - outputMode: 'full' (default) or 'compact' (optional)
+            - topN: Unhealthy targets kept per target group in compact
+              output (optional)
         context: Lambda context object
 
     Returns:
         dict: Health validation results with pass/fail status
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    logger.info("Received event", extra=verbose_fields(event=event))
 
     try:
+        # Reject bad output options before doing any work
+        resolve_output_mode(event)
+        resolve_top_n(event)
+
         # Extract parameters from event
         target_group_arn = event.get('targetGroupArn')
         load_balancer_arn = event.get('loadBalancerArn')
         expected_healthy = event.get('expectedHealthyHosts', HEALTHY_HOST_THRESHOLD)
         check_type = event.get('checkType', 'unknown')
+        p99_fail_threshold_ms = resolve_p99_fail_threshold(event)
+
+        # Multi-target-group mode: an explicit list, or a load balancer to expand
+        if event.get('targetGroupArns') is not None or (load_balancer_arn and not target_group_arn):
+            return validate_target_groups(event)
 
         if not target_group_arn:
             raise ValueError("Missing required parameter: targetGroupArn")
@@ -69,21 +157,66 @@ def lambda_handler(event, context):
 
         # Collect health metrics
         metrics = {}
+        recovery = None
+        probe_timeout = resolve_probe_timeout(event)
+        probes = {}
+
+        # 1. Check Target Group health (polling until recovery if requested)
+        if event.get('waitForRecovery', False) and resolve_recovery_mode(event) == 'events':
+            recovery = recover_after_replacement(
+                target_group_arn,
+                event['autoScalingGroupName'],
+                expected_healthy,
+                resolve_recovery_timeout(event, context),
+                resolve_poll_interval(event),
+                event.get('injectionTimestamp'),
+                resolve_terminated_instance_ids(event)
+            )
+            metrics['targetHealth'] = recovery.pop('targetHealth')
+        elif event.get('waitForRecovery', False):
+            recovery = poll_for_recovery(
+                target_group_arn,
+                expected_healthy,
+                resolve_recovery_timeout(event, context),
+                resolve_poll_interval(event),
+                event.get('injectionTimestamp'),
+                resolve_terminated_instance_ids(event)
+            )
+            metrics['targetHealth'] = recovery.pop('targetHealth')
+        else:
+            probes['targetHealth'] = (check_target_health, target_group_arn)
 
-        # 1. Check Target Group health
-        target_health = check_target_health(target_group_arn)
-        metrics['targetHealth'] = target_health
-
-        # 2. Get CloudWatch metrics
+        # 2. Get CloudWatch metrics (one batched GetMetricData request)
+        metric_queries = []
         if tg_name and lb_name:
-            metrics['healthyHostCount'] = get_healthy_host_count(tg_name, lb_name)
-            metrics['unhealthyHostCount'] = get_unhealthy_host_count(tg_name, lb_name)
-            metrics['target5xxErrors'] = get_target_5xx_errors(lb_name)
-            metrics['responseTime'] = get_response_time(lb_name)
-            metrics['requestCount'] = get_request_count(lb_name)
+            metric_queries = build_alb_metric_queries(tg_name, lb_name)
+            probes['cloudwatch'] = (
+                partial(get_metric_data_batch, use_cache=not event.get('refreshMetrics')),
+                metric_queries
+            )
+
+        # Run the ELBv2 and CloudWatch probes in parallel
+        probe_results, probe_status = run_probes_concurrently(
+            coalesce_probes(probes, resolve_coalesce_window(event), probe_timeout), probe_timeout
+        )
+
+        if 'targetHealth' in probes:
+            metrics['targetHealth'] = probe_results['targetHealth'] or {
+                'error': probe_status['targetHealth'].get('error')
+            }
+
+        if 'cloudwatch' in probes:
+            metrics.update(probe_results['cloudwatch'] or {
+                query['Id']: {
+                    'value': None,
+                    'error': probe_status['cloudwatch'].get('error'),
+                    'available': False
+                }
+                for query in metric_queries
+            })
 
         # 3. Evaluate overall health
-        health_result = evaluate_health(metrics, expected_healthy)
+        health_result = evaluate_health(metrics, expected_healthy, p99_fail_threshold_ms)
 
         # Prepare response
         response = {
@@ -94,13 +227,26 @@ def lambda_handler(event, context):
             'timestamp': datetime.utcnow().isoformat(),
             'metrics': metrics,
             'evaluation': health_result['evaluation'],
-            'summary': health_result['summary']
+            'summary': health_result['summary'],
+            'probes': probe_status
         }
 
+        if recovery is not None:
+            response['recovery'] = recovery
+
+        # 4. Compare against the pre-experiment baseline
+        baseline_metrics = resolve_baseline_metrics(event)
+        if baseline_metrics:
+            response['comparison'] = compare_with_baseline(
+                baseline_metrics,
+                metrics,
+                event.get('significanceLevel')
+            )
+
         logger.info(f"Health validation result: {response['healthStatus']}")
         logger.info(f"Summary: {response['summary']}")
 
-        return response
+        return shape_payload(response, compact_health_response, event, 'validate-system-health')
 
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -114,8 +260,10 @@ def lambda_handler(event, context):
     except ClientError as e:
         logger.error(f"AWS API error: {str(e)}")
         return {
-            'statusCode': 500,
-            'error': 'AWSError',
+            'statusCode': 429 if is_throttling_error(e) else 500,
+            'error': 'Throttled' if is_throttling_error(e) else 'AWSError',
+            'errorCode': e.response['Error']['Code'],
+            'retryable': is_throttling_error(e),
             'message': f"AWS API error: {e.response['Error']['Message']}",
             'timestamp': datetime.utcnow().isoformat()
         }
@@ -130,6 +278,894 @@ def lambda_handler(event, context):
         }
 
 
+def resolve_baseline_metrics(event):
+    """
+    Return the pre-experiment metrics to compare against
+
+    An offloaded pre-experiment payload (baselinePayloadRef) carries the full
+    metric series and is preferred over the inline, possibly compact,
+    baselineMetrics.
+
+    Args:
+        event: Lambda event object
+
+    Returns:
+        dict: Baseline metrics, or None if no baseline was given
+    """
+    if event.get('baselinePayloadRef'):
+        try:
+            return load_payload(event['baselinePayloadRef']).get('metrics')
+        except Exception as e:
+            logger.warning(f"Could not load baseline payload, using inline baselineMetrics: {str(e)}")
+
+    return event.get('baselineMetrics')
+
+
+def compact_health_response(response, top_n):
+    """
+    Build the compact form of a health response
+
+    Drops per-target details and metric series, keeping counters, the
+    latest metric values, the evaluation and the top-N unhealthy targets.
+
+    Args:
+        response: Full health response
+        top_n: Unhealthy targets kept per target group
+
+    Returns:
+        dict: Compact response
+    """
+    compact = dict(response)
+
+    if 'metrics' in response:
+        compact['metrics'] = compact_metrics(response['metrics'], top_n)
+
+    if 'targetGroups' in response:
+        compact['targetGroups'] = [
+            {**group, 'metrics': compact_metrics(group['metrics'], top_n)}
+            for group in response['targetGroups']
+        ]
+
+    return compact
+
+
+def compact_metrics(metrics, top_n):
+    """
+    Compact a metrics dictionary
+
+    Args:
+        metrics: Metrics dictionary of a health check
+        top_n: Unhealthy targets to keep
+
+    Returns:
+        dict: Metrics without series and per-target details
+    """
+    compact = {}
+
+    for name, metric in metrics.items():
+        if name == 'targetHealth':
+            compact[name] = compact_target_health(metric, top_n)
+        elif isinstance(metric, dict):
+            compact[name] = {key: value for key, value in metric.items() if key != 'series'}
+        else:
+            compact[name] = metric
+
+    return compact
+
+
+def compact_target_health(target_health, top_n):
+    """
+    Replace per-target details with the top-N unhealthy targets
+
+    Args:
+        target_health: Result of check_target_health
+        top_n: Unhealthy targets to keep
+
+    Returns:
+        dict: Counters plus 'unhealthyTargets' (most severe states first)
+    """
+    if 'details' not in target_health:
+        return target_health
+
+    severity = {state: rank for rank, state in enumerate(TARGET_STATE_SEVERITY)}
+    unhealthy = sorted(
+        (detail for detail in target_health['details'] if detail['state'] != 'healthy'),
+        key=lambda detail: severity.get(detail['state'], len(severity))
+    )
+
+    compact = {key: value for key, value in target_health.items() if key != 'details'}
+    compact['unhealthyTargets'] = unhealthy[:top_n]
+    compact['omittedUnhealthyTargets'] = max(0, len(unhealthy) - top_n)
+
+    return compact
+
+
+def compare_with_baseline(baseline_metrics, metrics, significance_level=None):
+    """
+    Compare the current metric windows with the pre-experiment baseline
+
+    The comparison engine needs NumPy, which is imported on first use so
+    health checks without a baseline do not pay for it.
+
+    Args:
+        baseline_metrics: Metrics dictionary of the pre-experiment check
+        metrics: Metrics dictionary of this check
+        significance_level: p-value threshold (optional)
+
+    Returns:
+        dict: Comparison results, or an unavailable result if NumPy is missing
+    """
+    if not isinstance(baseline_metrics, dict):
+        raise ValueError("baselineMetrics must be an object of metric results")
+
+    if significance_level is None:
+        significance_level = SIGNIFICANCE_LEVEL
+    elif not isinstance(significance_level, (int, float)) or not 0 < significance_level < 1:
+        raise ValueError("significanceLevel must be a number between 0 and 1")
+
+    try:
+        from baseline_comparison import compare_metric_windows
+    except ImportError as e:
+        logger.warning(f"Baseline comparison unavailable: {str(e)}")
+        return {
+            'available': False,
+            'metrics': {},
+            'regressions': [],
+            'reason': f"Comparison engine unavailable: {str(e)}"
+        }
+
+    started = time.perf_counter()
+    comparison = compare_metric_windows(baseline_metrics, metrics, significance_level)
+    comparison['elapsedMs'] = round((time.perf_counter() - started) * 1000, 3)
+
+    if comparison['regressions']:
+        logger.warning(f"Significant regressions against baseline: {comparison['regressions']}")
+
+    return comparison
+
+
+def validate_target_groups(event):
+    """
+    Validate the health of several target groups in one invocation
+
+    One target health probe per group runs on the shared thread pool, next
+    to a single batched GetMetricData probe covering every group (load
+    balancer metrics are queried once per load balancer). Each group is
+    evaluated on its own; the aggregate passes only if every group passes.
+
+    Args:
+        event: Lambda event object with 'targetGroupArns' and/or 'loadBalancerArn'
+
+    Returns:
+        dict: Per-group and aggregate health results
+    """
+    if event.get('waitForRecovery', False):
+        raise ValueError("waitForRecovery supports a single targetGroupArn")
+
+    expected_healthy = event.get('expectedHealthyHosts', HEALTHY_HOST_THRESHOLD)
+    check_type = event.get('checkType', 'unknown')
+    probe_timeout = resolve_probe_timeout(event)
+    p99_fail_threshold_ms = resolve_p99_fail_threshold(event)
+
+    target_groups = resolve_target_groups(event.get('targetGroupArns'), event.get('loadBalancerArn'))
+    logger.info(f"Validating {len(target_groups)} target groups ({check_type} experiment)")
+
+    # One target health probe per group plus one shared metric query
+    probes = {
+        f"targetHealth:{group['targetGroupArn']}": (check_target_health, group['targetGroupArn'])
+        for group in target_groups
+    }
+
+    metric_queries = []
+    load_balancer_prefixes = {}
+
+    for index, group in enumerate(target_groups):
+        tg_name = extract_resource_name(group['targetGroupArn'], 'targetgroup')
+        lb_arn = group['loadBalancerArn']
+        lb_name = extract_resource_name(lb_arn, 'loadbalancer/app') if lb_arn else None
+
+        if not (tg_name and lb_name):
+            continue
+
+        group['metricPrefix'] = f'tg{index}_'
+        metric_queries.extend(build_target_group_metric_queries(tg_name, lb_name, group['metricPrefix']))
+
+        if lb_arn not in load_balancer_prefixes:
+            load_balancer_prefixes[lb_arn] = f'lb{len(load_balancer_prefixes)}_'
+            metric_queries.extend(build_load_balancer_metric_queries(lb_name, load_balancer_prefixes[lb_arn]))
+
+    if metric_queries:
+        probes['cloudwatch'] = (
+            partial(get_metric_data_batch, use_cache=not event.get('refreshMetrics')),
+            metric_queries
+        )
+
+    probe_results, probe_status = run_probes_concurrently(
+        coalesce_probes(probes, resolve_coalesce_window(event), probe_timeout), probe_timeout
+    )
+
+    metric_results = probe_results.get('cloudwatch') or {
+        query['Id']: {
+            'value': None,
+            'error': probe_status['cloudwatch'].get('error'),
+            'available': False
+        }
+        for query in metric_queries
+    }
+
+    # Evaluate every group with its own and its load balancer's metrics
+    group_results = []
+
+    for group in target_groups:
+        probe_name = f"targetHealth:{group['targetGroupArn']}"
+        metrics = {
+            'targetHealth': probe_results[probe_name] or {'error': probe_status[probe_name].get('error')}
+        }
+
+        for prefix in (group.get('metricPrefix'), load_balancer_prefixes.get(group['loadBalancerArn'])):
+            if prefix:
+                metrics.update({
+                    query_id[len(prefix):]: value
+                    for query_id, value in metric_results.items()
+                    if query_id.startswith(prefix)
+                })
+
+        health_result = evaluate_health(metrics, expected_healthy, p99_fail_threshold_ms)
+
+        group_results.append({
+            'targetGroupArn': group['targetGroupArn'],
+            'targetGroupName': group['targetGroupName'],
+            'loadBalancerArn': group['loadBalancerArn'],
+            'healthStatus': 'PASS' if health_result['healthy'] else 'FAIL',
+            'healthy': health_result['healthy'],
+            'metrics': metrics,
+            'evaluation': health_result['evaluation'],
+            'summary': health_result['summary']
+        })
+
+    failed = [group['targetGroupArn'] for group in group_results if not group['healthy']]
+    healthy = not failed
+
+    if healthy:
+        summary = f"All {len(group_results)} target groups are healthy"
+    else:
+        summary = f"{len(failed)} of {len(group_results)} target groups are unhealthy"
+
+    response = {
+        'statusCode': 200,
+        'mode': 'multi',
+        'checkType': check_type,
+        'healthStatus': 'PASS' if healthy else 'FAIL',
+        'healthy': healthy,
+        'timestamp': datetime.utcnow().isoformat(),
+        'targetGroups': group_results,
+        'aggregate': {
+            'totalGroups': len(group_results),
+            'passedGroups': len(group_results) - len(failed),
+            'failedGroups': len(failed),
+            'failedTargetGroupArns': failed
+        },
+        'summary': summary,
+        'probes': probe_status
+    }
+
+    logger.info(f"Health validation result: {response['healthStatus']}")
+    logger.info(f"Summary: {summary}")
+
+    return shape_payload(response, compact_health_response, event, 'validate-system-health')
+
+
+def resolve_target_groups(target_group_arns=None, load_balancer_arn=None):
+    """
+    Resolve the target groups to check and the load balancer each belongs to
+
+    Args:
+        target_group_arns: Optional list of target group ARNs
+        load_balancer_arn: Optional load balancer ARN; expanded to all of its
+                           target groups when no list is given, otherwise
+                           used for the metric dimensions of every group
+
+    Returns:
+        list: Dictionaries with 'targetGroupArn', 'targetGroupName' and
+              'loadBalancerArn' (None if not attached to a load balancer)
+    """
+    paginator = elbv2.get_paginator('describe_target_groups')
+    descriptions = []
+
+    if target_group_arns is not None:
+        if (not isinstance(target_group_arns, list) or not target_group_arns
+                or not all(isinstance(arn, str) and arn for arn in target_group_arns)):
+            raise ValueError("targetGroupArns must be a non-empty list of target group ARNs")
+
+        target_group_arns = list(dict.fromkeys(target_group_arns))
+
+        for start in range(0, len(target_group_arns), TARGET_GROUP_ARNS_BATCH_SIZE):
+            batch = target_group_arns[start:start + TARGET_GROUP_ARNS_BATCH_SIZE]
+            for page in paginator.paginate(TargetGroupArns=batch):
+                descriptions.extend(page.get('TargetGroups', []))
+    else:
+        logger.info(f"Expanding target groups of load balancer {load_balancer_arn}")
+        for page in paginator.paginate(LoadBalancerArn=load_balancer_arn):
+            descriptions.extend(page.get('TargetGroups', []))
+
+    if not descriptions:
+        raise ValueError("No target groups found to validate")
+
+    if len(descriptions) > MAX_TARGET_GROUPS:
+        raise ValueError(f"Too many target groups ({len(descriptions)}); at most {MAX_TARGET_GROUPS} per invocation")
+
+    target_groups = []
+
+    for description in descriptions:
+        attached = description.get('LoadBalancerArns', [])
+        target_groups.append({
+            'targetGroupArn': description['TargetGroupArn'],
+            'targetGroupName': description.get('TargetGroupName'),
+            'loadBalancerArn': load_balancer_arn or (attached[0] if attached else None)
+        })
+
+    return target_groups
+
+
+def resolve_probe_timeout(event):
+    """
+    Validate the per-probe timeout
+
+    Args:
+        event: Lambda event object with optional 'probeTimeoutSeconds'
+
+    Returns:
+        float: Probe timeout in seconds
+    """
+    timeout = event.get('probeTimeoutSeconds', PROBE_TIMEOUT_SECONDS)
+
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ValueError("probeTimeoutSeconds must be a positive number")
+
+    return timeout
+
+
+def run_probes_concurrently(probes, timeout_seconds):
+    """
+    Run health probes in parallel, each bounded by its own timeout
+
+    A probe that times out or raises does not fail the others: its result
+    is None and its status records what happened, so callers can return
+    partial results. Total latency is that of the slowest probe rather than
+    the sum of all probes.
+
+    Args:
+        probes: Mapping of probe name to (function, argument)
+        timeout_seconds: Per-probe timeout
+
+    Returns:
+        tuple: (results, status) dictionaries keyed by probe name
+    """
+    results = {}
+    status = {}
+
+    if not probes:
+        return results, status
+
+    def timed(function, argument):
+        probe_started = time.perf_counter()
+        result = function(argument)
+        return result, time.perf_counter() - probe_started
+
+    executor = ThreadPoolExecutor(max_workers=min(PROBE_MAX_WORKERS, len(probes)))
+    started = time.perf_counter()
+
+    try:
+        futures = {
+            name: executor.submit(timed, function, argument)
+            for name, (function, argument) in probes.items()
+        }
+
+        for name, future in futures.items():
+            remaining = max(0, started + timeout_seconds - time.perf_counter())
+
+            try:
+                results[name], duration = future.result(timeout=remaining)
+                status[name] = {'status': 'ok', 'durationMs': round(duration * 1000, 1)}
+
+            except FutureTimeoutError:
+                logger.warning(f"Probe {name} timed out after {timeout_seconds}s, returning partial results")
+                results[name] = None
+                status[name] = {
+                    'status': 'timeout',
+                    'durationMs': round(timeout_seconds * 1000, 1),
+                    'error': f"Probe timed out after {timeout_seconds}s"
+                }
+
+            except Exception as e:
+                logger.error(f"Probe {name} failed: {str(e)}")
+                results[name] = None
+                status[name] = {
+                    'status': 'error',
+                    'durationMs': round((time.perf_counter() - started) * 1000, 1),
+                    'error': str(e)
+                }
+
+    finally:
+        # Do not wait for timed-out probes; their threads finish in the background
+        executor.shutdown(wait=False)
+
+    return results, status
+
+
+def resolve_coalesce_window(event):
+    """
+    Validate the probe result sharing window
+
+    Args:
+        event: Lambda event object with optional 'coalesceWindowSeconds'
+
+    Returns:
+        float: Sharing window in seconds (0 disables coalescing)
+    """
+    window = event.get('coalesceWindowSeconds', single_flight.window_seconds)
+
+    if isinstance(window, bool) or not isinstance(window, (int, float)) or window < 0:
+        raise ValueError("coalesceWindowSeconds must be a non-negative number")
+
+    return window
+
+
+def coalesce_probes(probes, window_seconds, lease_seconds=None):
+    """
+    Route probes through the single-flight coalescer
+
+    Concurrent checks asking for the same probe (same function and bound
+    options, same target group, same metric queries) within the same window
+    share one upstream call.
+
+    Args:
+        probes: Mapping of probe name to (function, argument)
+        window_seconds: Sharing window in seconds
+        lease_seconds: How long a leader may hold a probe, at most the probe
+                       timeout so waiting checks do not outlast it
+
+    Returns:
+        dict: Probes with coalescing functions
+    """
+    if window_seconds <= 0:
+        return probes
+
+    coalesced = {}
+
+    for name, (function, argument) in probes.items():
+        identity = [probe_identity(function), argument]
+        digest = hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:32]
+        key = f"validate-system-health#{name.split(':', 1)[0]}#{digest}"
+        coalesced[name] = (partial(run_coalesced, key, function, window_seconds, lease_seconds), argument)
+
+    return coalesced
+
+
+def probe_identity(function):
+    """
+    Describe a probe function for the coalescing key
+
+    Keywords bound in a partial (e.g. use_cache for a refreshMetrics check)
+    change what the probe returns, so they are part of the key.
+
+    Args:
+        function: Probe function, possibly a functools.partial
+
+    Returns:
+        dict: Qualified name plus bound positional and keyword arguments
+    """
+    args = []
+    keywords = {}
+
+    while isinstance(function, partial):
+        args = list(function.args) + args
+        keywords = {**function.keywords, **keywords}
+        function = function.func
+
+    return {
+        'function': f"{getattr(function, '__module__', '')}.{getattr(function, '__qualname__', repr(function))}",
+        'args': args,
+        'keywords': keywords
+    }
+
+
+def run_coalesced(key, function, window_seconds, lease_seconds, argument):
+    """Run one probe through the single-flight coalescer"""
+    return single_flight.do(
+        key,
+        partial(function, argument),
+        shareable=is_shareable_result,
+        window_seconds=window_seconds,
+        lease_seconds=lease_seconds
+    )
+
+
+def is_shareable_result(result):
+    """Return True if a probe result is worth sharing (not an error)"""
+    if not isinstance(result, dict) or 'error' in result:
+        return False
+
+    entries = [value for value in result.values() if isinstance(value, dict)]
+    return not entries or not all('error' in entry for entry in entries)
+
+
+def resolve_recovery_timeout(event, context=None):
+    """
+    Work out how long recovery polling may run
+
+    Args:
+        event: Lambda event object with optional 'recoveryTimeoutSeconds'
+        context: Lambda context object
+
+    Returns:
+        float: Polling budget in seconds, bounded by the remaining Lambda time
+    """
+    timeout = event.get('recoveryTimeoutSeconds', RECOVERY_TIMEOUT_SECONDS)
+
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ValueError("recoveryTimeoutSeconds must be a positive number")
+
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        remaining = context.get_remaining_time_in_millis() / 1000 - LAMBDA_TIMEOUT_MARGIN_SECONDS
+        timeout = max(0, min(timeout, remaining))
+
+    return timeout
+
+
+def resolve_p99_fail_threshold(event):
+    """
+    Validate the opt-in p99 response time threshold that fails the health check
+
+    Args:
+        event: Lambda event object with optional 'p99FailThresholdMs'
+               (defaults to the P99_FAIL_THRESHOLD_MS environment variable)
+
+    Returns:
+        float: Threshold in milliseconds, or None if the p99 check only warns
+    """
+    threshold = event.get('p99FailThresholdMs', P99_FAIL_THRESHOLD_MS)
+
+    if threshold is None or threshold == '':
+        return None
+
+    if isinstance(threshold, str):
+        try:
+            threshold = float(threshold)
+        except ValueError:
+            threshold = None
+
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or threshold <= 0:
+        raise ValueError("p99FailThresholdMs must be a number above 0")
+
+    return threshold
+
+
+def resolve_poll_interval(event):
+    """
+    Validate the recovery poll interval
+
+    Args:
+        event: Lambda event object with optional 'pollIntervalSeconds'
+
+    Returns:
+        float: Poll interval in seconds
+    """
+    interval = event.get('pollIntervalSeconds', RECOVERY_POLL_INTERVAL_SECONDS)
+
+    if isinstance(interval, bool) or not isinstance(interval, (int, float)) or not 0 < interval <= MAX_POLL_INTERVAL_SECONDS:
+        raise ValueError(f"pollIntervalSeconds must be between 0 (exclusive) and {MAX_POLL_INTERVAL_SECONDS}")
+
+    return interval
+
+
+def poll_for_recovery(target_group_arn, expected_healthy, timeout_seconds, interval_seconds, injection_timestamp=None,
+                      terminated_instance_ids=(), require_dip=True):
+    """
+    Poll target health until the expected healthy count is back
+
+    Returns as soon as the target group reports at least expected_healthy
+    healthy targets after the failure was seen, instead of waiting a fixed
+    period. Right after a termination the load balancer still reports the
+    victim healthy until its health checks fail, so a poll only counts as
+    recovered once a dip was observed: fewer than expected_healthy healthy
+    targets, or a terminated instance deregistered or not healthy.
+
+    Args:
+        target_group_arn: ARN of the target group
+        expected_healthy: Number of healthy targets that counts as recovered
+        timeout_seconds: Maximum time to poll
+        interval_seconds: Delay between polls
+        injection_timestamp: Optional ISO timestamp of the failure injection
+        terminated_instance_ids: Instances whose failure counts as the dip
+        require_dip: If false, the first poll with enough healthy targets
+                     counts as recovered (e.g. the dip was already seen)
+
+    Returns:
+        dict: Recovery result, including the last target health reading
+              under 'targetHealth'
+    """
+    started = time.perf_counter()
+    started_at = datetime.utcnow()
+    deadline = started + timeout_seconds
+    polls = 0
+    min_healthy = None
+    recovered_at = None
+    dip_observed_at = None if require_dip else started_at
+
+    logger.info(f"Polling target health every {interval_seconds}s for up to {timeout_seconds:.0f}s")
+
+    while True:
+        target_health = check_target_health(target_group_arn)
+        polls += 1
+
+        healthy_count = target_health.get('healthy')
+        if healthy_count is not None:
+            min_healthy = healthy_count if min_healthy is None else min(min_healthy, healthy_count)
+
+        if dip_observed_at is None:
+            if failure_observed(target_health, expected_healthy, terminated_instance_ids):
+                dip_observed_at = datetime.utcnow()
+                logger.info(f"Failure observed in target health after {time.perf_counter() - started:.1f}s")
+        elif healthy_count is not None and healthy_count >= expected_healthy:
+            recovered_at = datetime.utcnow()
+            break
+
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+
+        flush_logs()
+        time.sleep(min(interval_seconds, remaining))
+
+    elapsed = time.perf_counter() - started
+    recovered = recovered_at is not None
+
+    result = {
+        'recovered': recovered,
+        'timeToRecoverSeconds': round(elapsed, 3) if recovered else None,
+        'pollingStartedAt': started_at.isoformat(),
+        'recoveredAt': recovered_at.isoformat() if recovered else None,
+        'polls': polls,
+        'pollIntervalSeconds': interval_seconds,
+        'elapsedSeconds': round(elapsed, 3),
+        'minHealthyObserved': min_healthy,
+        'dipObserved': dip_observed_at is not None,
+        'dipObservedAt': dip_observed_at.isoformat() if dip_observed_at and require_dip else None,
+        'targetHealth': target_health
+    }
+
+    if recovered and injection_timestamp:
+        try:
+            injected_at = datetime.fromisoformat(injection_timestamp.replace('Z', '+00:00'))
+            if injected_at.tzinfo is not None:
+                injected_at = injected_at.astimezone(timezone.utc).replace(tzinfo=None)
+            result['timeSinceInjectionSeconds'] = round((recovered_at - injected_at).total_seconds(), 3)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring unparseable injectionTimestamp: {injection_timestamp}")
+
+    if recovered:
+        logger.info(f"Recovered after {elapsed:.1f}s ({polls} polls)")
+    elif dip_observed_at is None:
+        logger.warning(f"No failure observed in target health within {timeout_seconds:.0f}s ({polls} polls)")
+    else:
+        logger.warning(f"Not recovered within {timeout_seconds:.0f}s ({polls} polls)")
+
+    return result
+
+
+def failure_observed(target_health, expected_healthy, terminated_instance_ids=()):
+    """
+    Tell whether a target health reading shows the injected failure
+
+    Args:
+        target_health: Result of check_target_health
+        expected_healthy: Number of healthy targets that counts as recovered
+        terminated_instance_ids: Instances that were terminated
+
+    Returns:
+        bool: True if fewer than expected_healthy targets are healthy, or a
+              terminated instance is deregistered or not healthy
+    """
+    healthy_count = target_health.get('healthy')
+    if healthy_count is None:
+        return False
+
+    if healthy_count < expected_healthy:
+        return True
+
+    states = {detail['targetId']: detail['state'] for detail in target_health.get('details', [])}
+    return any(states.get(instance_id) != 'healthy' for instance_id in terminated_instance_ids)
+
+
+def resolve_recovery_mode(event):
+    """
+    Validate the recovery mode
+
+    Args:
+        event: Lambda event object with optional 'recoveryMode' and
+               'autoScalingGroupName'
+
+    Returns:
+        str: 'poll' or 'events'
+    """
+    mode = event.get('recoveryMode', 'poll')
+
+    if mode not in RECOVERY_MODES:
+        raise ValueError(f"recoveryMode must be one of {', '.join(RECOVERY_MODES)}")
+
+    if mode == 'events':
+        asg_name = event.get('autoScalingGroupName')
+        if not isinstance(asg_name, str) or not asg_name:
+            raise ValueError("recoveryMode 'events' requires autoScalingGroupName")
+
+    return mode
+
+
+def resolve_terminated_instance_ids(event):
+    """
+    Validate the instances excluded from the replacement search
+
+    Args:
+        event: Lambda event object with optional 'terminatedInstanceIds'
+
+    Returns:
+        list: Instance IDs
+    """
+    instance_ids = event.get('terminatedInstanceIds', [])
+
+    if not isinstance(instance_ids, list) or not all(isinstance(instance_id, str) for instance_id in instance_ids):
+        raise ValueError("terminatedInstanceIds must be a list of instance IDs")
+
+    return instance_ids
+
+
+def wait_for_replacement(asg_name, since, timeout_seconds, exclude_instance_ids=()):
+    """
+    Read recorded Auto Scaling events until a replacement instance exists
+
+    Only the event store is read (no ELBv2 or EC2 calls).
+
+    Args:
+        asg_name: Auto Scaling Group name
+        since: Time from which launches count as replacements
+        timeout_seconds: Maximum time to wait
+        exclude_instance_ids: Instances that are not replacements
+
+    Returns:
+        dict: Replacement timeline (see replacement_timeline) with the
+              total 'storeReads' and 'waitedSeconds'
+    """
+    store = get_event_store()
+    started = time.perf_counter()
+    deadline = started + timeout_seconds
+    reads = 0
+
+    while True:
+        timeline = replacement_timeline(store, asg_name, since, exclude_instance_ids)
+        reads += timeline['storeReads']
+
+        remaining = deadline - time.perf_counter()
+        if timeline['replacements'] or remaining <= 0:
+            break
+
+        flush_logs()
+        time.sleep(min(EVENT_POLL_INTERVAL_SECONDS, remaining))
+
+    timeline['storeReads'] = reads
+    timeline['waitedSeconds'] = round(time.perf_counter() - started, 3)
+
+    return timeline
+
+
+def recover_after_replacement(target_group_arn, asg_name, expected_healthy, timeout_seconds, interval_seconds,
+                              injection_timestamp=None, terminated_instance_ids=()):
+    """
+    Wait for the replacement's launch event, then poll until recovered
+
+    Target health is not polled while Auto Scaling has not launched a
+    replacement yet. If no launch event arrives within
+    REPLACEMENT_EVENT_TIMEOUT_SECONDS (e.g. the events rule is not
+    deployed), polling starts anyway for the rest of the timeout.
+
+    Args:
+        target_group_arn: ARN of the target group
+        asg_name: Auto Scaling Group that replaces the terminated instances
+        expected_healthy: Number of healthy targets that counts as recovered
+        timeout_seconds: Maximum time to wait in total
+        interval_seconds: Delay between target health polls
+        injection_timestamp: Optional ISO timestamp of the failure injection
+        terminated_instance_ids: Instances that are not replacements
+
+    Returns:
+        dict: Recovery result as poll_for_recovery, plus the replacement
+              'events' and launch-to-running / InService / healthy 'timings'
+    """
+    started = time.perf_counter()
+    injected_at = None
+
+    if injection_timestamp:
+        try:
+            injected_at = parse_time(injection_timestamp)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring unparseable injectionTimestamp: {injection_timestamp}")
+
+    since = injected_at or datetime.now(timezone.utc) - timedelta(seconds=RECOVERY_EVENT_LOOKBACK_SECONDS)
+
+    timeline = wait_for_replacement(
+        asg_name, since, min(timeout_seconds, REPLACEMENT_EVENT_TIMEOUT_SECONDS), terminated_instance_ids
+    )
+    replacement_seen = bool(timeline['replacements'])
+
+    if replacement_seen:
+        logger.info(
+            f"Replacement {timeline['replacements'][0]['instanceId']} launched; "
+            f"polling target health after {timeline['waitedSeconds']:.1f}s"
+        )
+    else:
+        logger.warning(f"No replacement launch event for {asg_name}; falling back to target health polling")
+
+    remaining = max(0.0, timeout_seconds - (time.perf_counter() - started))
+    # A replacement launch means Auto Scaling already saw the failure
+    recovery = poll_for_recovery(
+        target_group_arn, expected_healthy, remaining, interval_seconds, injection_timestamp,
+        terminated_instance_ids, require_dip=not replacement_seen
+    )
+
+    # Pick up the running and InService events that arrived while polling
+    final = replacement_timeline(get_event_store(), asg_name, since, terminated_instance_ids)
+    elapsed = time.perf_counter() - started
+
+    recovery.update({
+        'mode': 'events',
+        'replacementSeen': replacement_seen,
+        'waitedForReplacementSeconds': timeline['waitedSeconds'],
+        'eventStoreReads': timeline['storeReads'] + final['storeReads'],
+        'elapsedSeconds': round(elapsed, 3),
+        'timeToRecoverSeconds': round(elapsed, 3) if recovery['recovered'] else None,
+        'events': {
+            'replacements': final['replacements'],
+            'terminations': final['terminations'],
+            'launchFailures': final['launchFailures']
+        },
+        'timings': recovery_timings(final, recovery.get('recoveredAt'), injected_at)
+    })
+
+    return recovery
+
+
+def recovery_timings(timeline, recovered_at=None, injected_at=None):
+    """
+    Measure the recovery phases of the first replacement
+
+    Args:
+        timeline: Replacement timeline (see replacement_timeline)
+        recovered_at: Time the target group was seen recovered
+        injected_at: Time of the failure injection
+
+    Returns:
+        dict: Seconds from injection to launch, and from launch to running,
+              InService and healthy (None where an event is missing)
+    """
+    if not timeline['replacements']:
+        return {}
+
+    replacement = timeline['replacements'][0]
+
+    def seconds_between(start, end):
+        if start is None or end is None:
+            return None
+        return round((parse_time(end) - parse_time(start)).total_seconds(), 3)
+
+    return {
+        'replacementInstanceId': replacement['instanceId'],
+        'injectionToLaunchSeconds': seconds_between(injected_at, replacement['launchStartedAt']),
+        'launchToRunningSeconds': seconds_between(replacement['launchStartedAt'], replacement['runningAt']),
+        'launchToInServiceSeconds': seconds_between(replacement['launchStartedAt'], replacement['inServiceAt']),
+        'launchToHealthySeconds': seconds_between(replacement['launchStartedAt'], recovered_at)
+    }
+
+
 def check_target_health(target_group_arn):
     """
     Check the health of targets in the target group using ELBv2 API
@@ -152,7 +1188,11 @@ def check_target_health(target_group_arn):
 
         total = len(targets)
 
-        logger.info(f"Target health: {healthy} healthy, {unhealthy} unhealthy, {draining} draining, {unused} unused (total: {total})")
+        logger.info(
+            "Target health: %d healthy, %d unhealthy, %d draining, %d unused (total: %d)",
+            healthy, unhealthy, draining, unused, total,
+            extra=log_fields(healthy=healthy, unhealthy=unhealthy, draining=draining, unused=unused, total=total)
+        )
 
         return {
             'healthy': healthy,
@@ -172,140 +1212,257 @@ def check_target_health(target_group_arn):
 
     except ClientError as e:
         logger.error(f"Error checking target health: {str(e)}")
-        return {'error': str(e)}
-
-
-def get_healthy_host_count(target_group_name, load_balancer_name):
-    """Get HealthyHostCount metric from CloudWatch"""
-    return get_cloudwatch_metric(
-        namespace='AWS/ApplicationELB',
-        metric_name='HealthyHostCount',
-        dimensions=[
-            {'Name': 'TargetGroup', 'Value': target_group_name},
-            {'Name': 'LoadBalancer', 'Value': load_balancer_name}
-        ],
-        statistic='Average'
-    )
+        return {'error': str(e), 'throttled': is_throttling_error(e)}
 
 
-def get_unhealthy_host_count(target_group_name, load_balancer_name):
-    """Get UnHealthyHostCount metric from CloudWatch"""
-    return get_cloudwatch_metric(
-        namespace='AWS/ApplicationELB',
-        metric_name='UnHealthyHostCount',
-        dimensions=[
-            {'Name': 'TargetGroup', 'Value': target_group_name},
-            {'Name': 'LoadBalancer', 'Value': load_balancer_name}
-        ],
-        statistic='Average'
-    )
+def build_alb_metric_queries(target_group_name, load_balancer_name):
+    """
+    Build the GetMetricData queries used for an Application Load Balancer
 
+    Query IDs become the keys of the collected metrics. New metrics only need
+    another entry in the builders below; they are fetched in the same request.
 
-def get_target_5xx_errors(load_balancer_name):
-    """Get HTTPCode_Target_5XX_Count metric from CloudWatch"""
-    return get_cloudwatch_metric(
-        namespace='AWS/ApplicationELB',
-        metric_name='HTTPCode_Target_5XX_Count',
-        dimensions=[
-            {'Name': 'LoadBalancer', 'Value': load_balancer_name}
-        ],
-        statistic='Sum'
+    Args:
+        target_group_name: Target group name (targetgroup/... ARN suffix)
+        load_balancer_name: Load balancer name (app/... ARN suffix)
+
+    Returns:
+        list: Query definitions for get_metric_data_batch
+    """
+    return (
+        build_target_group_metric_queries(target_group_name, load_balancer_name)
+        + build_load_balancer_metric_queries(load_balancer_name)
     )
 
 
-def get_response_time(load_balancer_name):
-    """Get TargetResponseTime metric from CloudWatch"""
-    return get_cloudwatch_metric(
-        namespace='AWS/ApplicationELB',
-        metric_name='TargetResponseTime',
-        dimensions=[
-            {'Name': 'LoadBalancer', 'Value': load_balancer_name}
-        ],
-        statistic='Average'
-    )
+def build_target_group_metric_queries(target_group_name, load_balancer_name, id_prefix=''):
+    """
+    Build the queries for metrics reported per target group
+
+    Args:
+        target_group_name: Target group name (targetgroup/... ARN suffix)
+        load_balancer_name: Load balancer name (app/... ARN suffix)
+        id_prefix: Prefix keeping query IDs unique when several target
+                   groups share one request
 
+    Returns:
+        list: Query definitions for get_metric_data_batch
+    """
+    target_group_dimensions = [
+        {'Name': 'TargetGroup', 'Value': target_group_name},
+        {'Name': 'LoadBalancer', 'Value': load_balancer_name}
+    ]
 
-def get_request_count(load_balancer_name):
-    """Get RequestCount metric from CloudWatch"""
-    return get_cloudwatch_metric(
-        namespace='AWS/ApplicationELB',
-        metric_name='RequestCount',
-        dimensions=[
-            {'Name': 'LoadBalancer', 'Value': load_balancer_name}
-        ],
-        statistic='Sum'
-    )
+    return [
+        build_metric_query(f'{id_prefix}healthyHostCount', 'HealthyHostCount', target_group_dimensions, 'Average', 'Count'),
+        build_metric_query(f'{id_prefix}unhealthyHostCount', 'UnHealthyHostCount', target_group_dimensions, 'Average', 'Count')
+    ]
 
 
-def get_cloudwatch_metric(namespace, metric_name, dimensions, statistic):
+def build_load_balancer_metric_queries(load_balancer_name, id_prefix=''):
     """
-    Generic function to retrieve a CloudWatch metric
+    Build the queries for metrics reported per load balancer
 
     Args:
-        namespace: CloudWatch namespace
+        load_balancer_name: Load balancer name (app/... ARN suffix)
+        id_prefix: Prefix keeping query IDs unique when several load
+                   balancers share one request
+
+    Returns:
+        list: Query definitions for get_metric_data_batch
+    """
+    load_balancer_dimensions = [
+        {'Name': 'LoadBalancer', 'Value': load_balancer_name}
+    ]
+
+    return [
+        build_metric_query(f'{id_prefix}target5xxErrors', 'HTTPCode_Target_5XX_Count', load_balancer_dimensions, 'Sum', 'Count'),
+        build_metric_query(f'{id_prefix}responseTime', 'TargetResponseTime', load_balancer_dimensions, 'Average', 'Seconds'),
+        build_metric_query(f'{id_prefix}responseTimeP50', 'TargetResponseTime', load_balancer_dimensions, 'p50', 'Seconds'),
+        build_metric_query(f'{id_prefix}responseTimeP90', 'TargetResponseTime', load_balancer_dimensions, 'p90', 'Seconds'),
+        build_metric_query(f'{id_prefix}responseTimeP99', 'TargetResponseTime', load_balancer_dimensions, 'p99', 'Seconds'),
+        build_metric_query(f'{id_prefix}requestCount', 'RequestCount', load_balancer_dimensions, 'Sum', 'Count'),
+        build_expression_query(
+            f'{id_prefix}target5xxErrorRate',
+            f'IF({id_prefix}requestCount > 0, 100 * {id_prefix}target5xxErrors / {id_prefix}requestCount, 0)',
+            'Percent'
+        )
+    ]
+
+
+def build_metric_query(query_id, metric_name, dimensions, statistic, unit, namespace='AWS/ApplicationELB'):
+    """
+    Build a GetMetricData query for a single CloudWatch metric
+
+    Args:
+        query_id: Query ID (lowercase first letter, used as the metrics key)
         metric_name: Name of the metric
         dimensions: List of dimension dictionaries
-        statistic: Statistic type (Average, Sum, etc.)
+        statistic: Statistic type (Average, Sum, p99, etc.)
+        unit: Unit reported with the value
+        namespace: CloudWatch namespace
 
     Returns:
-        dict: Metric data including value and timestamp
+        dict: Query definition
     """
-    try:
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(minutes=5)  # Look back 5 minutes
-
-        logger.info(f"Querying metric: {metric_name} from {namespace}")
-
-        response = cloudwatch.get_metric_statistics(
-            Namespace=namespace,
-            MetricName=metric_name,
-            Dimensions=dimensions,
-            StartTime=start_time,
-            EndTime=end_time,
-            Period=METRIC_PERIOD_SECONDS,
-            Statistics=[statistic]
+    return {
+        'Id': query_id,
+        'MetricStat': {
+            'Metric': {
+                'Namespace': namespace,
+                'MetricName': metric_name,
+                'Dimensions': dimensions
+            },
+            'Period': METRIC_PERIOD_SECONDS,
+            'Stat': statistic
+        },
+        'Unit': unit
+    }
+
+
+def build_expression_query(query_id, expression, unit):
+    """
+    Build a GetMetricData metric math query over other query IDs
+
+    Args:
+        query_id: Query ID (used as the metrics key)
+        expression: Metric math expression
+        unit: Unit reported with the value
+
+    Returns:
+        dict: Query definition
+    """
+    return {
+        'Id': query_id,
+        'Expression': expression,
+        'Label': query_id,
+        'Unit': unit
+    }
+
+
+def get_metric_data_batch(queries, use_cache=True):
+    """
+    Retrieve many CloudWatch metrics with batched GetMetricData requests
+
+    Series are kept in the warm container's metric window cache. When every
+    query has been fetched recently, only the datapoints since the last
+    fetch (plus a short overlap for late data) are requested and merged
+    into the cached window. The whole window is returned as a compact
+    columnar series: epoch-second timestamps and values in two parallel
+    arrays, oldest first. The latest value is the last point of the series.
+
+    Args:
+        queries: Query definitions from build_metric_query / build_expression_query
+        use_cache: If False, fetch the full window and refresh the cache
+
+    Returns:
+        dict: Metric data keyed by query ID, each including the latest value,
+              its timestamp and the windowed series
+    """
+    end_time = datetime.utcnow()
+    end_epoch = calendar.timegm(end_time.utctimetuple())
+    window_start = end_epoch - METRIC_LOOKBACK_MINUTES * 60
+
+    units = {query['Id']: query['Unit'] for query in queries}
+    keys = {query['Id']: query_key(query, queries) for query in queries}
+    series = {query_id: ([], []) for query_id in units}
+
+    # One StartTime per request: the earliest point any query still needs
+    if use_cache:
+        fetch_start = min(
+            metric_cache.fetch_start(keys[query_id], window_start, METRIC_PERIOD_SECONDS)
+            for query_id in units
         )
+    else:
+        fetch_start = window_start
 
-        datapoints = response.get('Datapoints', [])
+    try:
+        paginator = cloudwatch.get_paginator('get_metric_data')
+
+        for start in range(0, len(queries), MAX_METRIC_DATA_QUERIES):
+            batch = [
+                {key: value for key, value in query.items() if key != 'Unit'}
+                for query in queries[start:start + MAX_METRIC_DATA_QUERIES]
+            ]
 
-        if not datapoints:
-            logger.warning(f"No datapoints found for metric {metric_name}")
-            return {
+            logger.info(
+                f"Querying {len(batch)} metrics with GetMetricData "
+                f"({end_epoch - fetch_start}s of {METRIC_LOOKBACK_MINUTES * 60}s window)"
+            )
+
+            pages = paginator.paginate(
+                MetricDataQueries=batch,
+                StartTime=datetime.utcfromtimestamp(fetch_start),
+                EndTime=end_time,
+                ScanBy='TimestampDescending'
+            )
+
+            for page in pages:
+                for result in page.get('MetricDataResults', []):
+                    timestamps, values = series[result['Id']]
+                    timestamps.extend(calendar.timegm(point.utctimetuple()) for point in result.get('Timestamps', []))
+                    values.extend(result.get('Values', []))
+
+    except ClientError as e:
+        logger.error(f"Error retrieving metrics: {str(e)}")
+        return {
+            query_id: {
                 'value': None,
-                'timestamp': None,
+                'error': str(e),
+                'throttled': is_throttling_error(e),
                 'available': False
             }
+            for query_id in units
+        }
 
-        # Get the most recent datapoint
-        latest = sorted(datapoints, key=lambda x: x['Timestamp'], reverse=True)[0]
+    metrics = {}
 
-        value = latest.get(statistic, 0)
+    for query_id, unit in units.items():
+        timestamps, values = metric_cache.merge(
+            keys[query_id],
+            *series[query_id],
+            fetched_until=end_epoch,
+            window_start=window_start
+        )
 
-        logger.info(f"Metric {metric_name}: {value}")
+        if not values:
+            logger.warning(f"No datapoints found for metric {query_id}")
+            metrics[query_id] = {
+                'value': None,
+                'timestamp': None,
+                'available': False
+            }
+            continue
 
-        return {
+        value, timestamp = values[-1], timestamps[-1]
+        logger.info("Metric %s: %s", query_id, value, extra=verbose_fields(metric=query_id, value=value))
+
+        metrics[query_id] = {
             'value': value,
-            'timestamp': latest['Timestamp'].isoformat(),
+            'timestamp': datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat(),
             'available': True,
-            'unit': latest.get('Unit', 'None')
+            'unit': unit,
+            'series': {
+                'timestamps': timestamps,
+                'values': values
+            }
         }
 
-    except ClientError as e:
-        logger.error(f"Error retrieving metric {metric_name}: {str(e)}")
-        return {
-            'value': None,
-            'error': str(e),
-            'available': False
-        }
+    logger.info(f"Metric cache: {metric_cache.stats()}")
 
+    return metrics
 
-def evaluate_health(metrics, expected_healthy):
+
+def evaluate_health(metrics, expected_healthy, p99_fail_threshold_ms=None):
     """
     Evaluate overall system health based on collected metrics
 
     Args:
         metrics: Dictionary of collected metrics
         expected_healthy: Expected number of healthy hosts
+        p99_fail_threshold_ms: Peak p99 response time above which the
+                               check FAILs; without it, a peak above
+                               MAX_P99_RESPONSE_TIME_MS only WARNs
 
     Returns:
         dict: Evaluation results with healthy status and details
@@ -391,6 +1548,34 @@ def evaluate_health(metrics, expected_healthy):
             })
             issues.append(f"High response time: {rt_value:.2f}ms")
 
+    # Check 5: p99 response time over the whole window
+    response_time_p99 = metrics.get('responseTimeP99', {})
+    if response_time_p99.get('available'):
+        p99_values = response_time_p99.get('series', {}).get('values') or [response_time_p99.get('value', 0)]
+        p99_peak = max(p99_values) * 1000  # Convert to ms
+        p99_threshold = p99_fail_threshold_ms or MAX_P99_RESPONSE_TIME_MS
+        if p99_peak <= p99_threshold:
+            evaluation.append({
+                'check': 'P99 Response Time',
+                'status': 'PASS',
+                'details': f"Peak p99 {p99_peak:.2f}ms (threshold: {p99_threshold:g}ms)"
+            })
+        elif p99_fail_threshold_ms:
+            evaluation.append({
+                'check': 'P99 Response Time',
+                'status': 'FAIL',
+                'details': f"Peak p99 {p99_peak:.2f}ms exceeds threshold of {p99_threshold:g}ms"
+            })
+            is_healthy = False
+            issues.append(f"High p99 response time: {p99_peak:.2f}ms")
+        else:
+            evaluation.append({
+                'check': 'P99 Response Time',
+                'status': 'WARN',
+                'details': f"Peak p99 {p99_peak:.2f}ms exceeds threshold of {p99_threshold:g}ms"
+            })
+            issues.append(f"High p99 response time: {p99_peak:.2f}ms")
+
     # Generate summary
     if is_healthy:
         summary = f"System is HEALTHY: {healthy_count} targets healthy, all checks passed"
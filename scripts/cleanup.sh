@@ -72,6 +72,18 @@ echo -e "${YELLOW}Step 2: Deleting Lambda Functions...${NC}"
 LAMBDA_STACK_NAME="${PROJECT_NAME}-lambda-functions"
 
 if aws cloudformation describe-stacks --stack-name $LAMBDA_STACK_NAME --region $REGION &> /dev/null; then
+    # The payload bucket must be empty before the stack can delete it
+    PAYLOAD_BUCKET=$(aws cloudformation describe-stacks \
+        --stack-name $LAMBDA_STACK_NAME \
+        --region $REGION \
+        --query "Stacks[0].Outputs[?OutputKey=='PayloadBucketName'].OutputValue" \
+        --output text 2>/dev/null)
+
+    if [ -n "$PAYLOAD_BUCKET" ] && [ "$PAYLOAD_BUCKET" != "None" ]; then
+        echo -e "${YELLOW}Emptying payload bucket: $PAYLOAD_BUCKET${NC}"
+        aws s3 rm "s3://${PAYLOAD_BUCKET}" --recursive --region $REGION > /dev/null || true
+    fi
+
     echo -e "${YELLOW}Deleting stack: $LAMBDA_STACK_NAME${NC}"
     aws cloudformation delete-stack \
         --stack-name $LAMBDA_STACK_NAME \
@@ -55,8 +55,22 @@ package_function() {
 
     cd "$function_dir"
 
-    # Create deployment package
-    zip -q -r "${TEMP_DIR}/${function_name}.zip" lambda_function.py
+    # Create deployment package (handler plus any helper modules)
+    zip -q -r "${TEMP_DIR}/${function_name}.zip" *.py
+
+    # Bundle dependencies that the Lambda runtime does not provide
+    local extra_requirements
+    extra_requirements=$(grep -vE '^[[:space:]]*(#|$|boto3|botocore)' requirements.txt || true)
+    if [ -n "$extra_requirements" ]; then
+        local deps_dir="${TEMP_DIR}/${function_name}-deps"
+        echo "$extra_requirements" > "${deps_dir}.txt"
+        pip install -q -r "${deps_dir}.txt" -t "$deps_dir" \
+            --platform manylinux2014_x86_64 --only-binary=:all: --python-version 3.9
+        (cd "$deps_dir" && zip -q -r "${TEMP_DIR}/${function_name}.zip" . -x '*__pycache__*')
+    fi
+
+    # Bundle the shared helpers package next to the handler
+    (cd .. && zip -q -r "${TEMP_DIR}/${function_name}.zip" chaos_common -x '*__pycache__*')
 
     echo -e "${GREEN}✓ Packaged ${function_name}${NC}"
 
@@ -110,6 +124,17 @@ echo -e "${YELLOW}Step 2: Packaging Lambda Functions...${NC}\n"
 package_function "get-target-instance" "lambda-functions/get-target-instance"
 package_function "inject-failure" "lambda-functions/inject-failure"
 package_function "validate-system-health" "lambda-functions/validate-system-health"
+package_function "experiment-runner" "lambda-functions/experiment-runner"
+package_function "recovery-events" "lambda-functions/recovery-events"
+
+# The experiment runner imports the other handlers as modules
+RUNNER_MODULES_DIR="${TEMP_DIR}/experiment-runner-modules"
+mkdir -p "$RUNNER_MODULES_DIR"
+cp lambda-functions/get-target-instance/lambda_function.py "${RUNNER_MODULES_DIR}/get_target_instance.py"
+cp lambda-functions/inject-failure/lambda_function.py "${RUNNER_MODULES_DIR}/inject_failure.py"
+cp lambda-functions/validate-system-health/lambda_function.py "${RUNNER_MODULES_DIR}/validate_system_health.py"
+cp lambda-functions/validate-system-health/baseline_comparison.py "${RUNNER_MODULES_DIR}/"
+(cd "$RUNNER_MODULES_DIR" && zip -q "${TEMP_DIR}/experiment-runner.zip" *.py)
 
 echo ""
 
@@ -139,6 +164,8 @@ update_function() {
 update_function "get-target-instance" "${TEMP_DIR}/get-target-instance.zip"
 update_function "inject-failure" "${TEMP_DIR}/inject-failure.zip"
 update_function "validate-system-health" "${TEMP_DIR}/validate-system-health.zip"
+update_function "experiment-runner" "${TEMP_DIR}/experiment-runner.zip"
+update_function "recovery-events" "${TEMP_DIR}/recovery-events.zip"
 
 echo ""
 
@@ -165,6 +192,8 @@ verify_function() {
 verify_function "get-target-instance"
 verify_function "inject-failure"
 verify_function "validate-system-health"
+verify_function "experiment-runner"
+verify_function "recovery-events"
 
 echo ""
 
@@ -200,7 +229,14 @@ VALIDATE_HEALTH_ARN=$(aws cloudformation describe-stacks \
 
 echo -e "  Get-Target-Instance: ${GREEN}${GET_TARGET_ARN}${NC}"
 echo -e "  Inject-Failure: ${GREEN}${INJECT_FAILURE_ARN}${NC}"
-echo -e "  Validate-Health: ${GREEN}${VALIDATE_HEALTH_ARN}${NC}\n"
+EXPERIMENT_RUNNER_ARN=$(aws cloudformation describe-stacks \
+    --stack-name $LAMBDA_STACK_NAME \
+    --region $REGION \
+    --query 'Stacks[0].Outputs[?OutputKey==`ExperimentRunnerFunctionArn`].OutputValue' \
+    --output text)
+
+echo -e "  Validate-Health: ${GREEN}${VALIDATE_HEALTH_ARN}${NC}"
+echo -e "  Experiment-Runner: ${GREEN}${EXPERIMENT_RUNNER_ARN}${NC}\n"
 
 echo -e "${YELLOW}Testing Commands:${NC}"
 echo -e "  Test Get-Target: ${GREEN}./scripts/test-lambda-functions.sh get-target${NC}"
@@ -211,7 +247,9 @@ echo -e "  Test All: ${GREEN}./scripts/test-lambda-functions.sh all${NC}\n"
 echo -e "${YELLOW}View Logs:${NC}"
 echo -e "  Get-Target: ${GREEN}aws logs tail /aws/lambda/${PROJECT_NAME}-get-target-instance --follow${NC}"
 echo -e "  Inject-Failure: ${GREEN}aws logs tail /aws/lambda/${PROJECT_NAME}-inject-failure --follow${NC}"
-echo -e "  Validate-Health: ${GREEN}aws logs tail /aws/lambda/${PROJECT_NAME}-validate-system-health --follow${NC}\n"
+echo -e "  Validate-Health: ${GREEN}aws logs tail /aws/lambda/${PROJECT_NAME}-validate-system-health --follow${NC}"
+echo -e "  Experiment-Runner: ${GREEN}aws logs tail /aws/lambda/${PROJECT_NAME}-experiment-runner --follow${NC}"
+echo -e "  Recovery-Events: ${GREEN}aws logs tail /aws/lambda/${PROJECT_NAME}-recovery-events --follow${NC}\n"
 
 echo -e "${GREEN}Week 2 Lambda functions deployed successfully!${NC}"
 echo -e "${YELLOW}Next: Test individual functions before integrating with Step Functions${NC}\n"